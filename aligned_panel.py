@@ -0,0 +1,208 @@
+# aligned_panel.py
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+
+# --- Constants ---
+
+PANEL_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _as_slice(positions: list):
+    """The slice covering `positions` when they are consecutive and ascending, else the list itself."""
+    if positions and all(b == a + 1 for a, b in zip(positions, positions[1:])):
+        return slice(positions[0], positions[-1] + 1)
+    return positions
+
+
+# --- Panel ---
+
+class AlignedPanel(Mapping):
+    """OHLCV bars of many tickers on one trading calendar, held in a contiguous (field, ticker, date) array.
+
+    Cells without a bar are NaN and False in the (ticker, date) `valid` mask. Each ticker's field is a
+    contiguous series, and `field()`, `ticker()`, `series()` and `window()` return views, never copies.
+    The panel also reads as a {ticker: DataFrame} mapping, so code written for the per-symbol frames
+    the loader used to return keeps working; those frames are built on access from the views.
+    """
+
+    def __init__(self, array: np.ndarray, valid: np.ndarray, dates: np.ndarray, tickers: list, fields: list = PANEL_FIELDS):
+        self.array = array
+        self.valid = valid
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.fields = list(fields)
+        self._ticker_pos = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._field_pos = {field: f for f, field in enumerate(self.fields)}
+
+    @classmethod
+    def blank(cls, tickers: list, dates: np.ndarray, fields: list = PANEL_FIELDS) -> 'AlignedPanel':
+        """A panel with no bars yet: every cell NaN and invalid."""
+        array = np.full((len(fields), len(tickers), len(dates)), np.nan)
+        return cls(array, np.zeros((len(tickers), len(dates)), dtype=bool), dates, tickers, fields)
+
+    # --- Construction ---
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame, symbols: list = None) -> 'AlignedPanel':
+        """Scatters long-format rows (Date, Ticker, fields) into a panel in one pass.
+
+        Tickers keep the order of `symbols` (default: first appearance) and only those with rows are kept.
+        """
+        tickers = df['Ticker']
+        present = set(tickers.unique())
+        symbols = list(tickers.unique()) if symbols is None else symbols
+        panel_tickers = [symbol for symbol in dict.fromkeys(symbols) if symbol in present]
+
+        day_values = df['Date'].values.astype('datetime64[ns]')
+        dates = np.unique(day_values)
+        panel = cls.blank(panel_tickers, dates)
+        ticker_codes = pd.Categorical(tickers, categories=panel_tickers).codes
+        keep = ticker_codes >= 0
+        ticker_codes = ticker_codes[keep]
+        date_codes = np.searchsorted(dates, day_values[keep])
+        panel.array[:, ticker_codes, date_codes] = df[panel.fields].values[keep].astype(np.float64).T
+        panel.valid[ticker_codes, date_codes] = True
+        return panel
+
+    @classmethod
+    def from_frames(cls, stock_dfs: dict) -> 'AlignedPanel':
+        """Aligns Date-indexed per-ticker OHLCV frames on the union of their dates."""
+        frames = {symbol: stock_df for symbol, stock_df in stock_dfs.items() if stock_df is not None}
+        days = [stock_df.index.values.astype('datetime64[ns]') for stock_df in frames.values()]
+        dates = np.unique(np.concatenate(days)) if days else np.empty(0, dtype='datetime64[ns]')
+        panel = cls.blank(list(frames), dates)
+        for i, (stock_df, frame_days) in enumerate(zip(frames.values(), days)):
+            columns = np.searchsorted(dates, frame_days)
+            panel.array[:, i, columns] = stock_df[panel.fields].values.astype(np.float64).T
+            panel.valid[i, columns] = True
+        return panel
+
+    @classmethod
+    def from_download(cls, data: pd.DataFrame, tickers: list) -> 'AlignedPanel':
+        """Converts a yfinance-style frame with (ticker, field) columns, or flat columns for a single ticker."""
+        if not isinstance(data.columns, pd.MultiIndex):
+            return cls.from_frames({tickers[0]: data})
+        downloaded = set(data.columns.get_level_values(0))
+        return cls.from_frames({ticker: data[ticker] for ticker in tickers if ticker in downloaded})
+
+    @classmethod
+    def from_store(cls, store, symbols: list, start=None, end=None) -> 'AlignedPanel':
+        """Reads the symbols' windows from an OHLCVStore straight into the panel, without per-ticker frames."""
+        windows = {symbol: store.arrays(symbol, start, end) for symbol in symbols if symbol in store}
+        windows = {symbol: views for symbol, views in windows.items() if len(views['Date'])}
+        days = [np.asarray(views['Date']) for views in windows.values()]
+        dates = np.unique(np.concatenate(days)) if days else np.empty(0, dtype='datetime64[ns]')
+        panel = cls.blank(list(windows), dates)
+        for i, (views, window_days) in enumerate(zip(windows.values(), days)):
+            columns = np.searchsorted(dates, window_days)
+            for f, field in enumerate(panel.fields):
+                panel.array[f, i, columns] = views[field]
+            panel.valid[i, columns] = True
+        return panel
+
+    # --- Views ---
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.dates, name='Date')
+
+    @property
+    def empty(self) -> bool:
+        return not self.valid.any()
+
+    def field(self, field: str) -> np.ndarray:
+        """(ticker, date) view of one field."""
+        return self.array[self._field_pos[field]]
+
+    def ticker(self, ticker: str) -> np.ndarray:
+        """(field, date) view of one ticker."""
+        return self.array[:, self._ticker_pos[ticker]]
+
+    def series(self, ticker: str, field: str) -> np.ndarray:
+        """Contiguous view of one ticker's field over the whole calendar, NaN where it has no bar."""
+        return self.array[self._field_pos[field], self._ticker_pos[ticker]]
+
+    def stack(self, fields: list, tickers: list) -> np.ndarray:
+        """(field, ticker, date) array of the given fields and tickers; a view when both are contiguous runs."""
+        field_rows = _as_slice([self._field_pos[field] for field in fields])
+        ticker_rows = _as_slice([self._ticker_pos[ticker] for ticker in tickers])
+        return self.array[field_rows][:, ticker_rows]
+
+    def window(self, start=None, end=None) -> 'AlignedPanel':
+        """Panel view of the dates between start and end (inclusive), sharing this panel's memory."""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left'))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end), 'ns'), side='right'))
+        return AlignedPanel(self.array[:, :, lo:hi], self.valid[:, lo:hi], self.dates[lo:hi], self.tickers, self.fields)
+
+    def bar_count(self, ticker: str) -> int:
+        return int(self.valid[self._ticker_pos[ticker]].sum())
+
+    def incomplete_tickers(self) -> list:
+        """Tickers with a NaN field on a date they have a bar, which the loaders reject."""
+        missing = (np.isnan(self.array).any(axis=0) & self.valid).any(axis=1)
+        return [ticker for ticker, bad in zip(self.tickers, missing) if bad]
+
+    def drop(self, tickers: list) -> 'AlignedPanel':
+        """Panel without the given tickers (a copy, since the remaining rows are no longer contiguous)."""
+        dropped = set(tickers)
+        kept = [ticker for ticker in self.tickers if ticker not in dropped]
+        if len(kept) == len(self.tickers):
+            return self
+        rows = _as_slice([self._ticker_pos[ticker] for ticker in kept])
+        return AlignedPanel(self.array[:, rows], self.valid[rows], self.dates, kept, self.fields)
+
+    def bars(self, ticker: str, all_dates: bool = False) -> dict:
+        """{'Date': dates, field: values} of the ticker's bars; `all_dates` keeps NaN rows for dates it has no bar.
+
+        The arrays are views of the panel, and only copied where rows have to be dropped.
+        """
+        i = self._ticker_pos[ticker]
+        columns = self.array[:, i]
+        dates = self.dates
+        if not all_dates and not self.valid[i].all():
+            rows = self.valid[i]
+            columns = columns[:, rows]
+            dates = dates[rows]
+        bars = {'Date': dates}
+        bars.update({field: columns[f] for f, field in enumerate(self.fields)})
+        return bars
+
+    def frame(self, ticker: str, all_dates: bool = False) -> pd.DataFrame:
+        """The ticker's bars() as a Date-indexed DataFrame."""
+        bars = self.bars(ticker, all_dates)
+        return pd.DataFrame({field: bars[field] for field in self.fields},
+                            index=pd.DatetimeIndex(bars['Date'], name='Date'), copy=False)
+
+    # --- Mapping ---
+
+    def __getitem__(self, ticker: str) -> pd.DataFrame:
+        if ticker not in self._ticker_pos:
+            raise KeyError(ticker)
+        return self.frame(ticker)
+
+    def __iter__(self):
+        return iter(self.tickers)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker) -> bool:
+        return ticker in self._ticker_pos
+
+
+def validated_panel(panel: AlignedPanel) -> AlignedPanel:
+    """Drops the tickers with missing values on their bars, as every loader rejects them."""
+    incomplete = panel.incomplete_tickers()
+    for symbol in incomplete:
+        print(f"Warning: Invalid or missing data for symbol {symbol}")
+    return panel.drop(incomplete)
+
+def window_frames(stock_dfs, start, end) -> dict:
+    """{symbol: bars between start and end (inclusive)}, built from panel views or by masking per-symbol frames."""
+    if isinstance(stock_dfs, AlignedPanel):
+        return dict(stock_dfs.window(start, end).items())
+    return {
+        symbol: stock_df[(stock_df.index >= start) & (stock_df.index <= end)]
+        for symbol, stock_df in stock_dfs.items() if stock_df is not None
+    }
@@ -0,0 +1,83 @@
+# array_feed.py
+import array
+import numpy as np
+import pandas as pd
+import backtrader as bt
+
+# --- Constants ---
+
+EPOCH_ORDINAL = 719163      # date.toordinal() of 1970-01-01, the origin of backtrader's date numbers
+US_PER_DAY = 86_400_000_000
+LINE_COLUMNS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume', 'openinterest': 'OpenInterest'}
+
+
+def date_numbers(dates) -> np.ndarray:
+    """bt.date2num over a datetime64 array: the proleptic ordinal of each date plus the fraction of its day."""
+    micros = np.asarray(dates).astype('datetime64[us]').astype(np.int64)
+    days = micros // US_PER_DAY
+    return (days + EPOCH_ORDINAL) + (micros - days * US_PER_DAY) / US_PER_DAY
+
+def array_columns(dataname) -> dict:
+    """{'Date': datetime64 array, column: array} from a Date-indexed DataFrame or a mapping of arrays."""
+    if isinstance(dataname, pd.DataFrame):
+        columns = {column: dataname[column].values for column in dataname.columns}
+        columns['Date'] = dataname.index.values
+        return columns
+    return dict(dataname)
+
+
+# --- Feeds ---
+
+class ArrayData(bt.feed.DataBase):
+    """Feed over NumPy arrays or memory-mapped columns, in place of PandasData's per-row iloc reads.
+
+    `dataname` is a mapping with a sorted datetime64 'Date' array and one array per column, e.g.
+    AlignedPanel.bars() or OHLCVStore.arrays(), or a Date-indexed DataFrame whose columns are used
+    as is. The fromdate/todate window is found by binary search on the dates and preload copies each
+    column into its line buffer as one block, so nothing runs per bar. Lines with no column
+    (openinterest) stay NaN, as they do in PandasData.
+    """
+
+    def start(self):
+        super().start()
+        columns = array_columns(self.p.dataname)
+        self._datenums = date_numbers(columns['Date'])
+        self._sources = [
+            (line, self._datenums if alias == 'datetime' else columns.get(LINE_COLUMNS.get(alias, alias)))
+            for alias, line in zip(self.lines.getlinealiases(), self.lines.itersize())
+        ]
+        self._idx = None
+
+    def _window(self) -> tuple:
+        """Rows inside [fromdate, todate], which backtrader has converted to date numbers by now."""
+        lo = int(np.searchsorted(self._datenums, self.fromdate, side='left'))
+        hi = int(np.searchsorted(self._datenums, self.todate, side='right'))
+        return lo, hi
+
+    def preload(self):
+        if not isinstance(self.lines.datetime.array, array.array):
+            # Bounded (exactbars) buffers are deques, which are filled bar by bar instead
+            return super().preload()
+        lo, hi = self._window()
+        for line, values in self._sources:
+            block = np.full(hi - lo, np.nan) if values is None else np.ascontiguousarray(values[lo:hi], dtype=np.float64)
+            line.array.frombytes(block.tobytes())
+        self._last()
+        self.home()
+
+    def _load(self):
+        if self._idx is None:
+            lo, self._end = self._window()
+            self._idx = lo - 1
+        self._idx += 1
+        if self._idx >= self._end:
+            return False
+        for line, values in self._sources:
+            if values is not None:
+                line[0] = float(values[self._idx])
+        return True
+
+
+class ATRArrayData(ArrayData):
+    """ArrayData carrying an `atr` column precomputed over the full backtest window."""
+    lines = ('atr',)
@@ -4,21 +4,82 @@
 import backtrader as bt
 import pandas as pd
 import json
+import argparse
 from datetime import datetime
 from data_analysis import fetch_data
-from create_reports import create_reports
+from create_reports import report_data, write_reports
 from strategy import ShortRSIStrategy
+from screener_results import load_screener_results
+from numpy_engine import run_numpy_backtest
+from dynamic_universe import build_dynamic_feeds, with_atr, trading_start_date, ATRPandasData
+from indicator_cache import cache_from_config
+from memory_budget import report_peak_rss
+from equity_recorder import EquityRecorder
+from position_recorder import PositionRecorder, positions_frame
+from profiler import PROFILER
+from aligned_panel import AlignedPanel, window_frames
+from array_feed import ArrayData, ATRArrayData
+from results_store import store_from_config, run_key, RANKED_PATH
+
+
+class ProfiledBroker(bt.brokers.BackBroker):
+    """BackBroker timing its per-bar order matching as the 'broker' phase."""
+
+    def next(self):
+        with PROFILER.phase('broker'):
+            super().next()
+
+def profiled_feed(feed_class):
+    """Subclass of `feed_class` timing its preload as the 'feed_preload' phase."""
+    class ProfiledFeed(feed_class):
+        def preload(self):
+            with PROFILER.phase('feed_preload'):
+                super().preload()
+    return ProfiledFeed
 
 def run_backtest(cerebro, stock_dfs, ranked_stocks, config):
 
+    # The NumPy engine replays the same strategy without Cerebro
+    if config.get("engine", "backtrader") == "numpy":
+        with PROFILER.phase('backtest'):
+            return run_numpy_backtest(stock_dfs, ranked_stocks, config)
+
     # Set exact dates for backtest period
     fromdate = datetime.strptime(config["start_date"], "%Y-%m-%d")
     todate = datetime.strptime(config["end_date"], "%Y-%m-%d")
     
+    # Array feeds fill their line buffers from NumPy blocks; PandasData walks the frames row by row
+    array_feeds = config.get("array_feeds", True)
+    feed_class = ArrayData if array_feeds else bt.feeds.PandasData
+    atr_feed_class = ATRArrayData if array_feeds else ATRPandasData
+
+    # Optionally attach each ticker only around the dates it can be traded
+    trading_start = None
+    if config.get("dynamic_universe", False):
+        stock_dfs, trading_start = build_dynamic_feeds(stock_dfs, ranked_stocks, config)
+        feed_class = atr_feed_class
+    elif cache_from_config(config) is not None:
+        # ATR comes precomputed from the indicator cache instead of a bt.indicators.ATR per feed,
+        # so trading is held back until the bar the ATR warm-up would have released it
+        cache = cache_from_config(config)
+        windows = window_frames(stock_dfs, fromdate, todate)
+        trading_start = trading_start_date(windows, config['atr_period'] + 1)
+        stock_dfs = {symbol: with_atr(window, config['atr_period'], symbol, cache) for symbol, window in windows.items()}
+        feed_class = atr_feed_class
+    elif array_feeds and isinstance(stock_dfs, AlignedPanel):
+        # Each feed reads its ticker's bars straight from the panel and finds the window itself
+        stock_dfs = {symbol: stock_dfs.bars(symbol) for symbol in stock_dfs}
+    else:
+        # Each feed wraps its ticker's view of the loaded panel over the backtest window
+        stock_dfs = window_frames(stock_dfs, fromdate, todate)
+    if PROFILER.enabled:
+        feed_class = profiled_feed(feed_class)
+        cerebro.setbroker(ProfiledBroker())
+    
     # Add data feeds to Cerebro with explicit date range
     for symbol, stock_df in stock_dfs.items():
         if stock_df is not None:
-            data = bt.feeds.PandasData(
+            data = feed_class(
                 dataname=stock_df,
                 name=symbol,
                 fromdate=fromdate,  
@@ -26,39 +87,81 @@ def run_backtest(cerebro, stock_dfs, ranked_stocks, config):
             cerebro.adddata(data)
     
     # Add strategy and pass ranked_stocks data and config
-    cerebro.addstrategy(ShortRSIStrategy, ranked_stocks=ranked_stocks, config=config)
+    cerebro.addstrategy(ShortRSIStrategy, ranked_stocks=ranked_stocks, config=config, trading_start=trading_start)
     cerebro.broker.setcash(config["capital"])
     cerebro.broker.setcommission(commission=config["commission"])
     
-    # Add analyzers
-    cerebro.addanalyzer(bt.analyzers.PyFolio, _name="pyfolio")
+    # Add analyzers; the equity and position recorders feed the reports, PyFolio is only kept on request
+    cerebro.addanalyzer(EquityRecorder, _name="equity")
+    cerebro.addanalyzer(PositionRecorder, _name="positions")
     cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name="trades")
+    if config.get("pyfolio_analyzer", False):
+        cerebro.addanalyzer(bt.analyzers.PyFolio, _name="pyfolio")
     
-    return cerebro.run()
+    with PROFILER.phase('backtest'):
+        return cerebro.run()
+
+def run_or_replay(config, ranked_stocks, ranked_path=RANKED_PATH, rerun=False):
+    """Writes the reports of an identical run from the results store, or runs the backtest and stores it.
+
+    Returns True when the run was replayed from the store.
+    """
+    # An identical run (same config, strategy code and input data) is replayed from the results store
+    store = store_from_config(config)
+    key = run_key(config, ranked_path) if store is not None else None
+    stored = store.load(key) if key is not None and not rerun else None
+    if stored is not None:
+        print(f"Identical run found in the results store ({key}), skipping the backtest")
+        with PROFILER.phase('create_reports'):
+            write_reports(config, *stored)
+        return True
+
+    # Fetch data for all symbols
+    symbols = ranked_stocks['Ticker'].unique().tolist()     # Get unique tickers from ranked_stocks 
+    with PROFILER.phase('data_loading'):
+        stock_dfs = fetch_data(symbols, config)
+
+    # Run backtest with explicit date handling
+    print("\nRunning backtest ...\n")
+    results = run_backtest(bt.Cerebro(), stock_dfs, ranked_stocks, config)
+
+    # Create reports
+    with PROFILER.phase('create_reports'):
+        trades_df, equity, metrics = report_data(config, results[0])
+        positions = positions_frame(results[0])
+        write_reports(config, trades_df, equity, metrics, positions=positions)
+    if store is not None:
+        # Fetching can fill the download cache, so the run is stored under the data it actually read
+        key = run_key(config, ranked_path)
+        if key is not None:
+            store.save(key, config, trades_df, equity, metrics, positions)
+            print(f"Run saved to the results store {store.path}")
+    return False
 
 if __name__ == "__main__"   :
 
+    parser = argparse.ArgumentParser(description="Backtest the Short RSI strategy on the ranked stocks")
+    parser.add_argument("--profile", action="store_true", help="Time each phase and bar and save the profile next to the reports")
+    parser.add_argument("--rerun", action="store_true", help="Run the backtest even if the results store holds an identical run")
+    args = parser.parse_args()
+
     print("\nRunning backtest...\n")
     # Load configuration from config.json
     with open("source/config.json") as f:
         config = json.load(f)
-
-    cerebro = bt.Cerebro()  # Initialize Cerebro engine
+    PROFILER.enabled = args.profile or config.get("profile", False)
 
     # Load ranked stocks data
-    ranked_stocks = pd.read_csv("data/stocks_ranked.csv")
+    ranked_stocks = load_screener_results(RANKED_PATH, compact=True)     # Uses the Parquet copy when present
     ranked_stocks['Date'] = pd.to_datetime(ranked_stocks['Date']).dt.date    # Convert Date column to datetime
-    symbols = ranked_stocks['Ticker'].unique().tolist()     # Get unique tickers from ranked_stocks 
     
-    # Fetch data for all symbols
-    stock_dfs = fetch_data(symbols, config)
-
-    # Run backtest with explicit date handling
-    print("\nRunning backtest ...\n")
-    results = run_backtest(cerebro, stock_dfs, ranked_stocks, config)
-
-    # Create reports
-    create_reports(config,results, ranked_stocks)
+    run_or_replay(config, ranked_stocks, rerun=args.rerun)
+    if PROFILER.enabled:
+        profile_paths = PROFILER.save('reports', f"{config['start_date']}_to_{config['end_date']}")
+        print(f"Profile saved to {' and '.join(profile_paths)}")
 
     print("\nBacktest completed successfully!\n")
+    report_peak_rss("Backtest")
+    if cache_from_config(config) is not None:
+        cache_from_config(config).report()
     # cerebro.plot()  # Plot the strategy
@@ -0,0 +1,244 @@
+# benchmark.py
+import os
+import io
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+import numpy as np
+import pandas as pd
+import backtrader as bt
+from datetime import datetime
+from ranked_filtered_tickers import process_stock_data
+from data_analysis import load_data_from_csv, fetch_data
+from download_cache import DownloadCache
+from backtest import run_backtest
+from create_reports import create_reports
+from screener_results import SCREENER_SCHEMA
+from memory_budget import peak_rss_mb
+from aligned_panel import AlignedPanel
+
+# --- Constants ---
+
+DEFAULT_SCALES = "100x252,1000x252,5000x252,100x1260,1000x1260,5000x1260"   # tickers x trading days
+DEFAULT_RESULTS_PATH = "reports/benchmark_results.json"
+DEFAULT_BASELINE_PATH = "source/benchmark_baseline.json"
+DEFAULT_TOLERANCE = 0.25    # Allowed slowdown over the baseline before a stage counts as regressed
+RANKED_PER_DAY = 10         # Rows per date in the synthetic ranked file, like rank_candidates keeps
+SEED = 42
+
+BENCHMARK_CONFIG = {
+    "capital": 1000000,
+    "active_positions_cap": 10,
+    "daily_tickers_entry": 2,
+    "limit_order_percent": 4,
+    "exit_time_days": 5,
+    "profit_percent": 4,
+    "atr_period": 10,
+    "atr_multiplier": 3,
+    "profit_target_percent": 4,
+    "commission": 0.002
+}
+
+
+# --- Synthetic Data ---
+
+def generate_ohlcv(n_tickers: int, n_days: int, seed: int = SEED, start_date: str = "2020-01-01") -> pd.DataFrame:
+    """Builds deterministic random-walk bars in the long historical_data_*.csv format (Date, Ticker, OHLCV).
+
+    Prices, volatility and volume are drawn so that a realistic share of rows pass the screener's
+    price, dollar-volume and ATR % filters.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start=start_date, periods=n_days)
+    tickers = np.array([f"T{i:05d}" for i in range(n_tickers)])
+
+    start_price = rng.uniform(10, 200, n_tickers)
+    volatility = rng.uniform(0.01, 0.05, n_tickers)
+    log_returns = rng.normal(0.0, volatility, (n_days, n_tickers))
+    close = start_price * np.exp(np.cumsum(log_returns, axis=0))
+    open_ = close * np.exp(rng.normal(0.0, volatility / 2, (n_days, n_tickers)))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0.0, volatility / 2, (n_days, n_tickers))))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0.0, volatility / 2, (n_days, n_tickers))))
+    volume = np.round(rng.lognormal(np.log(2_000_000), 0.5, (n_days, n_tickers)))
+
+    # Ticker-major rows, as the historical CSV is laid out
+    return pd.DataFrame({
+        'Date': np.tile(dates.values, n_tickers),
+        'Ticker': np.repeat(tickers, n_days),
+        'Open': open_.T.ravel(),
+        'High': high.T.ravel(),
+        'Low': low.T.ravel(),
+        'Close': close.T.ravel(),
+        'Volume': volume.T.ravel()
+    })
+
+def generate_ranked(ohlcv: pd.DataFrame, per_day: int = RANKED_PER_DAY, seed: int = SEED) -> pd.DataFrame:
+    """Builds a stocks_ranked file for the synthetic bars: `per_day` random tickers per date passing every filter."""
+    rng = np.random.default_rng(seed + 1)
+    dates = np.sort(ohlcv['Date'].unique())
+    tickers = ohlcv['Ticker'].unique()
+    per_day = min(per_day, len(tickers))
+    picks = np.concatenate([rng.choice(len(tickers), per_day, replace=False) for _ in dates])
+    rows = len(picks)
+    return pd.DataFrame({
+        'Date': np.repeat(dates, per_day),
+        'Ticker': tickers[picks],
+        'Avg Price': rng.uniform(5, 200, rows),
+        'Avg Dollar Volume': rng.uniform(25_000_000, 500_000_000, rows),
+        'ATR %': rng.uniform(3, 10, rows),
+        '3-day RSI': rng.uniform(90, 100, rows),
+        'Higher Closes': True,
+        '7-day ADX': rng.uniform(10, 60, rows),
+        'Pass Base': True,
+        'Pass All': True
+    }, columns=list(SCREENER_SCHEMA))
+
+
+class PanelProvider:
+    """DownloadCache provider serving bars from an AlignedPanel, so the cache fills without the network."""
+
+    def __init__(self, panel: AlignedPanel):
+        self.panel = panel
+
+    def download(self, tickers: list, start: str, end: str) -> dict:
+        frames = {ticker: self.panel[ticker] for ticker in tickers if ticker in self.panel}
+        return {ticker: frame[(frame.index >= start) & (frame.index < end)] for ticker, frame in frames.items()}
+
+
+# --- Timing ---
+
+def timed(stage: str, work: float, unit: str, func, *args, **kwargs):
+    """Runs one stage with its output silenced; returns (result, stats) with seconds, throughput and peak RSS."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    stats = {
+        'seconds': seconds,
+        unit: work / seconds if seconds > 0 else float('inf'),
+        'peak_rss_mb': peak_rss_mb()    # Process peak so far, so it never decreases across stages
+    }
+    print(f"  {stage:<10} {seconds:8.2f} s  {stats[unit]:>14,.0f} {unit}")
+    return result, stats
+
+def run_scale(n_tickers: int, n_days: int, engine: str = 'numpy', workers: int = 1) -> dict:
+    """Generates one synthetic dataset and times the screener, loaders, backtest and report stages on it.
+
+    'loader' reads the historical CSV; 'fetch' runs fetch_data over a download cache filled beforehand.
+    """
+    print(f"\n{n_tickers} tickers x {n_days} days")
+    ohlcv = generate_ohlcv(n_tickers, n_days)
+    ranked = generate_ranked(ohlcv)
+    ranked['Date'] = pd.to_datetime(ranked['Date']).dt.date
+    ticker_days = len(ohlcv)
+    first_date = pd.Timestamp(ohlcv['Date'].min()).to_pydatetime()
+    last_date = pd.Timestamp(ohlcv['Date'].max()).to_pydatetime()
+    stages = {}
+
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as work_dir:
+        csv_path = os.path.join(work_dir, f"historical_data_{first_date:%Y-%m-%d}_{last_date:%Y-%m-%d}.csv")
+        ohlcv.to_csv(csv_path, index=False)
+        config = dict(BENCHMARK_CONFIG, start_date=f"{first_date:%Y-%m-%d}", end_date=f"{last_date:%Y-%m-%d}",
+                      engine=engine, use_csv_data=True, csv_data_path=csv_path,
+                      ohlcv_store_path=os.path.join(work_dir, "no.store"))
+
+        panel = AlignedPanel.from_long(ohlcv)
+        tickers = panel.tickers
+        # The screener needs 20 bars of history, so screening starts on the 21st bar
+        screen_start = pd.Timestamp(ohlcv['Date'].unique()[min(20, n_days - 1)]).to_pydatetime()
+        _, stages['screener'] = timed(
+            'screener', ticker_days, 'ticker_days_per_s', process_stock_data, tickers, screen_start, last_date,
+            os.path.join(work_dir, "all.csv"), os.path.join(work_dir, "ranked.csv"), panel, vectorized=True, workers=workers)
+
+        stock_dfs, stages['loader'] = timed('loader', ticker_days, 'ticker_days_per_s', load_data_from_csv,
+                                            ranked['Ticker'].unique().tolist(), config)
+        bars = int(stock_dfs.valid.sum())
+
+        # The download cache is filled untimed, so 'fetch' measures the cached path every backtest takes
+        cache_dir = os.path.join(work_dir, "cache")
+        symbols = ranked['Ticker'].unique().tolist()
+        with contextlib.redirect_stdout(io.StringIO()):
+            DownloadCache(cache_dir, provider=PanelProvider(panel)).get(symbols, first_date - pd.Timedelta(days=60),
+                                                                        last_date + pd.Timedelta(days=1))
+        fetch_config = dict(config, use_csv_data=False, use_download_cache=True, download_cache_dir=cache_dir, offline=True)
+        _, stages['fetch'] = timed('fetch', ticker_days, 'ticker_days_per_s', fetch_data, symbols, fetch_config)
+
+        results, stages['backtest'] = timed('backtest', bars, 'bars_per_s', run_backtest, bt.Cerebro(), stock_dfs, ranked, config)
+
+        # create_reports writes to ./reports, so it runs inside the scratch directory
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            _, stages['reports'] = timed('reports', bars, 'bars_per_s', create_reports, config, results, ranked)
+        finally:
+            os.chdir(cwd)
+
+    return {'tickers': n_tickers, 'days': n_days, 'ticker_days': ticker_days, 'bars': bars, 'stages': stages}
+
+
+# --- Baseline ---
+
+def scale_key(result: dict) -> str:
+    return f"{result['tickers']}x{result['days']}"
+
+def find_regressions(results: list, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """Lists the stages slower than their baseline seconds by more than `tolerance` (a fraction)."""
+    regressions = []
+    for result in results:
+        baseline_stages = baseline.get(scale_key(result), {})
+        for stage, stats in result['stages'].items():
+            if stage not in baseline_stages:
+                continue
+            limit = baseline_stages[stage] * (1 + tolerance)
+            if stats['seconds'] > limit:
+                regressions.append(f"{scale_key(result)} {stage}: {stats['seconds']:.2f} s > {limit:.2f} s allowed "
+                                   f"(baseline {baseline_stages[stage]:.2f} s)")
+    return regressions
+
+def baseline_from(results: list) -> dict:
+    """Baseline file contents: seconds per stage, keyed by scale."""
+    return {scale_key(result): {stage: stats['seconds'] for stage, stats in result['stages'].items()} for result in results}
+
+def parse_scales(scales: str) -> list:
+    return [tuple(int(part) for part in scale.lower().split('x')) for scale in scales.split(',') if scale]
+
+
+# --- Main Execution ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the screener, loader, backtest and reports on synthetic data")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="Comma-separated TICKERSxDAYS scales")
+    parser.add_argument("--engine", default="numpy", choices=["numpy", "backtrader"], help="Backtest engine to time")
+    parser.add_argument("--workers", type=int, default=1, help="Screener worker processes")
+    parser.add_argument("--output", default=DEFAULT_RESULTS_PATH, help="Where to write the JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown as a fraction of the baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run's timings")
+    args = parser.parse_args()
+
+    results = [run_scale(n_tickers, n_days, engine=args.engine, workers=args.workers)
+               for n_tickers, n_days in parse_scales(args.scales)]
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'run_at': datetime.now().isoformat(timespec='seconds'), 'engine': args.engine,
+                   'workers': args.workers, 'results': results}, f, indent=2)
+    print(f"\nBenchmark results saved to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline_from(results), f, indent=2)
+        print(f"Baseline updated at {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nPerformance regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            raise SystemExit(1)
+        print("No stage regressed past the baseline")
+    else:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
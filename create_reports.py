@@ -4,6 +4,8 @@ import numpy as np
 from datetime import datetime
 import backtrader as bt
 import json
+from equity_recorder import equity_frame
+from position_recorder import positions_frame
 
 def calculate_sharpe_ratio(returns, risk_free_rate=0.02):
     # Check if returns is empty or None
@@ -33,17 +35,28 @@ def calculate_sharpe_ratio(returns, risk_free_rate=0.02):
         print(f"Error calculating Sharpe Ratio: {e}")
         return 0.0
 
-def create_reports(config, results, ranked_stocks):
-    # Ensure reports directory exists
-    os.makedirs('reports', exist_ok=True)
-    
-    # Create report filename with date range
-    report_suffix = f"{config['start_date']}_to_{config['end_date']}"
-    
-    # Get strategy instance
-    strategy = results[0]
-    
-    # Collect and process trade data
+# --- Trades and Metrics ---
+
+METRIC_FORMATS = {
+    "Initial Capital": "${:,.2f}",
+    "Final Portfolio Value": "${:,.2f}",
+    "Total Portfolio P/L": "${:,.2f}",
+    "Total Gross Profit": "${:,.2f}",
+    "Win Rate": "{:.1f}%",
+    "Average Profit per Trade": "{:.2f}%",
+    "Best Trade": "{:.2f}%",
+    "Worst Trade": "{:.2f}%",
+    "Sharpe Ratio": "{:.2f}",
+    "Maximum Drawdown": "{:.2f}%",
+    "Average Gross Exposure": "{:.1f}%",
+    "Average Net Exposure": "{:.1f}%",
+    "Average Open Positions": "{:.2f}",
+    "Best Day": "${:,.2f}",
+    "Worst Day": "${:,.2f}"
+}
+
+def collect_trades(strategy):
+    """Builds the trades log from the strategy's closed trades, tracking info and exit details."""
     trades_data = []
     for trade in strategy.trades:
         # Get tracking and exit details
@@ -84,51 +97,136 @@ def create_reports(config, results, ranked_stocks):
         }
         trades_data.append(trade_info)
 
-    # Convert to DataFrame
-    trades_df = pd.DataFrame(trades_data)
-    
-    # Handle empty trades scenario
-    if trades_df.empty:
-        print("\nNo trades were completed during the backtest period")
-        return None, {}
+    return pd.DataFrame(trades_data)
 
-    # Save trades log
-    trades_csv_path = f'reports/trades_{report_suffix}.csv'
-    trades_df.to_csv(trades_csv_path, index=False)
-    print(f"\nTrades log saved to {trades_csv_path}")
+def daily_pnl(equity: pd.DataFrame) -> pd.DataFrame:
+    """Adds daily P&L and return columns to a recorded equity frame."""
+    values = equity['Value'].values
+    previous = np.r_[values[:1], values[:-1]]
+    pnl = values - previous
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = np.where(previous != 0, pnl / previous, 0.0)
+    return equity.assign(**{'Daily P/L': pnl, 'Daily Return': returns})
+
+def calculate_equity_metrics(equity: pd.DataFrame, risk_free_rate=0.02) -> dict:
+    """Sharpe, drawdown, exposure and daily P&L metrics from a per-bar equity frame, in one vectorized pass.
 
-    # Calculate portfolio metrics
+    Exposure columns are optional, so a bare 'Value' column (e.g. a stitched equity curve) also works.
+    """
+    values = equity['Value'].values
+    if len(values) < 2:
+        return {"Sharpe Ratio": 0.0, "Maximum Drawdown": 0.0}
+
+    daily = daily_pnl(equity)
+    returns = daily['Daily Return'].values[1:]
+    returns_std = returns.std()
+    sharpe_ratio = (returns.mean() - risk_free_rate/252) / returns_std * np.sqrt(252) if returns_std > 0 else 0.0
+    drawdown = 1 - values / np.maximum.accumulate(values)
+
+    metrics = {
+        "Sharpe Ratio": sharpe_ratio,
+        "Maximum Drawdown": drawdown.max() * 100,
+        "Best Day": daily['Daily P/L'].values[1:].max(),
+        "Worst Day": daily['Daily P/L'].values[1:].min()
+    }
+    if 'Gross Exposure' in equity:
+        metrics["Average Gross Exposure"] = (equity['Gross Exposure'].values / values).mean() * 100
+        metrics["Average Net Exposure"] = (equity['Net Exposure'].values / values).mean() * 100
+        metrics["Average Open Positions"] = equity['Open Positions'].values.mean()
+    return metrics
+
+def calculate_metrics(config, strategy, trades_df, final_value=None, equity=None):
+    """Returns the performance metrics as plain numbers (percentages in percent), keyed by report name.
+
+    `final_value` overrides the strategy's broker value, e.g. for stitched walk-forward results.
+    Sharpe ratio and drawdown come from the per-bar `equity` frame (by default the strategy's
+    recording); without one they fall back to the per-trade approximation.
+    """
     initial_capital = config["capital"]
-    final_value = strategy.broker.getvalue()
-    total_pnl = final_value - initial_capital
+    if final_value is None:
+        final_value = strategy.broker.getvalue()
+    if equity is None and strategy is not None:
+        equity = equity_frame(strategy)
     
     # Convert Profit % to numeric and handle potential conversion issues
     trade_returns = pd.to_numeric(trades_df['Profit %'], errors='coerce') / 100
 
-    # Performance Metrics Calculation
-    performance_metrics = {
-        "Initial Capital": f"${initial_capital:,.2f}",
-        "Final Portfolio Value": f"${final_value:,.2f}",
-        "Total Portfolio P/L": f"${total_pnl:,.2f}",
-        "Number of Trades": len(trades_data),
-        "Total Gross Profit": f"${trades_df['Net P/L'].sum():,.2f}",
+    metrics = {
+        "Initial Capital": initial_capital,
+        "Final Portfolio Value": final_value,
+        "Total Portfolio P/L": final_value - initial_capital,
+        "Number of Trades": len(trades_df),
+        "Total Gross Profit": trades_df['Net P/L'].sum(),
         
         # Profitability Metrics
-        "Win Rate": f"{(trades_df['Net P/L'] > 0).mean() * 100:.1f}%",
+        "Win Rate": (trades_df['Net P/L'] > 0).mean() * 100,
         "Profit Factor": (
             trades_df[trades_df['Net P/L'] > 0]['Net P/L'].sum() / 
             max(abs(trades_df[trades_df['Net P/L'] < 0]['Net P/L'].sum()), 1)
         ),
         
         # Trade Performance
-        "Average Profit per Trade": f"{trade_returns.mean() * 100:.2f}%" if not trade_returns.empty else "0.00%",
-        "Best Trade": f"{trade_returns.max() * 100:.2f}%" if not trade_returns.empty else "0.00%",
-        "Worst Trade": f"{trade_returns.min() * 100:.2f}%" if not trade_returns.empty else "0.00%",
+        "Average Profit per Trade": trade_returns.mean() * 100 if not trade_returns.empty else 0.0,
+        "Best Trade": trade_returns.max() * 100 if not trade_returns.empty else 0.0,
+        "Worst Trade": trade_returns.min() * 100 if not trade_returns.empty else 0.0,
         
         # Risk-Adjusted Metrics
-        "Sharpe Ratio": f"{calculate_sharpe_ratio(trade_returns):.2f}",
-        "Maximum Drawdown": f"{(max(np.cumsum(trade_returns)) - min(np.cumsum(trade_returns))):.2%}"
+        "Sharpe Ratio": calculate_sharpe_ratio(trade_returns),
+        "Maximum Drawdown": (max(np.cumsum(trade_returns)) - min(np.cumsum(trade_returns))) * 100
     }
+    if equity is not None and not equity.empty:
+        metrics.update(calculate_equity_metrics(equity))
+    return metrics
+
+def format_metrics(metrics):
+    """Formats numeric metrics for the performance report."""
+    return {
+        metric: METRIC_FORMATS[metric].format(value) if metric in METRIC_FORMATS else value
+        for metric, value in metrics.items()
+    }
+
+def report_data(config, strategy):
+    """Trades log, recorded daily equity and raw metrics of a finished backtest."""
+    trades_df = collect_trades(strategy)
+    equity = equity_frame(strategy)
+    metrics = calculate_metrics(config, strategy, trades_df, equity=equity) if not trades_df.empty else {}
+    return trades_df, equity, metrics
+
+def write_reports(config, trades_df, equity, metrics, positions=None):
+    """Writes the trades log, daily equity and performance report, from a fresh run or the results store.
+
+    `positions`, the per-bar open positions of a fresh run, is saved as Parquet for the risk dashboard.
+    """
+    # Ensure reports directory exists
+    os.makedirs('reports', exist_ok=True)
+    
+    # Create report filename with date range
+    report_suffix = f"{config['start_date']}_to_{config['end_date']}"
+
+    # Save the recorded per-bar open positions, also for runs that closed no trades
+    if positions is not None:
+        positions_path = f'reports/positions_{report_suffix}.parquet'
+        positions.to_parquet(positions_path, index=False)
+        print(f"Open positions by bar saved to {positions_path}")
+    
+    # Handle empty trades scenario
+    if trades_df is None or trades_df.empty:
+        print("\nNo trades were completed during the backtest period")
+        return None, {}
+
+    # Save trades log
+    trades_csv_path = f'reports/trades_{report_suffix}.csv'
+    trades_df.to_csv(trades_csv_path, index=False)
+    print(f"\nTrades log saved to {trades_csv_path}")
+
+    # Save the recorded daily portfolio state
+    if equity is not None:
+        equity_csv_path = f'reports/equity_{report_suffix}.csv'
+        daily_pnl(equity).to_csv(equity_csv_path)
+        print(f"Daily equity saved to {equity_csv_path}")
+
+    # Performance Metrics Calculation
+    performance_metrics = format_metrics(metrics)
 
     # Write detailed performance report
     report_path = f'reports/performance_report_{report_suffix}.txt'
@@ -146,3 +244,8 @@ def create_reports(config, results, ranked_stocks):
         print(f"{metric}: {value}")
 
     return trades_df, performance_metrics
+
+def create_reports(config, results, ranked_stocks):
+    # Get strategy instance
+    strategy = results[0]
+    return write_reports(config, *report_data(config, strategy), positions=positions_frame(strategy))
@@ -3,54 +3,53 @@ import yfinance as yf
 import pandas as pd
 import os
 from datetime import datetime, timedelta
+from ohlcv_store import load_data_from_store, store_path_for, store_is_current, convert_csv_to_store
+from download_cache import cache_from_config
+from memory_budget import chunks_needed, estimate_csv_bytes, CSV_CHUNK_ROWS
+from aligned_panel import AlignedPanel, validated_panel
 
 def load_data_from_csv(symbols, config):
 
     # Check for CSV data path in config, default to a standard location if not specified
     csv_path = config.get('csv_data_path', 'data/historical_data_2020-01-01_2025-01-01.csv')
     
+    # Prefer the memory-mapped store built by ohlcv_store.py when it exists, rebuilding it if the CSV changed since
+    store_path = config.get('ohlcv_store_path', store_path_for(csv_path))
+    if os.path.isdir(store_path):
+        if not store_is_current(store_path, csv_path):
+            print(f"{csv_path} changed since {store_path} was built, rebuilding the store...")
+            convert_csv_to_store(csv_path, store_path)
+        print(f"Loading data from OHLCV store {store_path}...")
+        return load_data_from_store(symbols, config, store_path)
+    
     # Validate file exists
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f"Historical data CSV not found at {csv_path}")
     
-    # Read the entire CSV
-    df = pd.read_csv(csv_path, parse_dates=['Date'])
-    
     # Convert start and end dates from config
     start_date = datetime.strptime(config["start_date"], "%Y-%m-%d")
     end_date = datetime.strptime(config["end_date"], "%Y-%m-%d")
     
-    # Filter for specified symbols and date range
-    stock_dfs = {}
-    for symbol in symbols:
-        symbol_data = df[(df['Ticker'] == symbol) & 
-                         (df['Date'] >= start_date) & 
-                         (df['Date'] <= end_date)].copy()
-        
-        if not symbol_data.empty:
-            # Rename columns to match yfinance format
-            symbol_data = symbol_data.rename(columns={
-                'Open': 'Open', 
-                'High': 'High', 
-                'Low': 'Low', 
-                'Close': 'Close', 
-                'Volume': 'Volume'
-            })
-            
-            # Set index to Date
-            symbol_data.set_index('Date', inplace=True)
-            
-            # Sort index
-            symbol_data.sort_index(inplace=True)
-            
-            # Validate data quality
-            if not symbol_data.isnull().any().any():
-                stock_dfs[symbol] = symbol_data
-            else:
-                print(f"Warning: Invalid or missing data for symbol {symbol}")
+    # Read the CSV with categorical tickers, in row chunks when the whole file would exceed the memory budget
+    read_options = dict(parse_dates=['Date'], dtype={'Ticker': 'category'})
+    if chunks_needed(estimate_csv_bytes(csv_path), config.get('memory_budget_mb')) > 1:
+        print(f"Reading {csv_path} in chunks to stay within {config['memory_budget_mb']} MB")
+        chunks = pd.read_csv(csv_path, chunksize=CSV_CHUNK_ROWS, **read_options)
+    else:
+        chunks = [pd.read_csv(csv_path, **read_options)]
     
-    return stock_dfs
-
+    # Keep only the requested symbols and date range, so the full file is never held alongside its slices
+    wanted = set(symbols)
+    kept = []
+    for chunk in chunks:
+        mask = chunk['Ticker'].isin(wanted).values & (chunk['Date'] >= start_date).values & (chunk['Date'] <= end_date).values
+        kept.append(chunk[mask])
+    df = pd.concat(kept, ignore_index=True)
+    df['Ticker'] = df['Ticker'].astype('category')  # Chunks with different categories concatenate to object
+    del kept, chunks
+    
+    # Scatter the rows into one aligned panel instead of splitting the frame per symbol
+    return validated_panel(AlignedPanel.from_long(df, symbols))
 
 
 def fetch_data(symbols, config):
@@ -70,8 +69,34 @@ def fetch_data(symbols, config):
     print(f"Fetching data from {start_date_str} to include lookback period for all Stocks ")
     print(f"Actual start date: {config['start_date']}")
     
+    if config.get('use_download_cache', True):
+        # Only ranges missing from the on-disk cache are downloaded
+        downloaded = cache_from_config(config).get(symbols, start_date_str, config["end_date"])
+        for symbol in symbols:
+            if symbol not in downloaded:
+                print(f"Warning: Invalid or missing data for symbol {symbol}")
+        stock_dfs = validated_panel(AlignedPanel.from_frames(downloaded))
+    else:
+        stock_dfs = AlignedPanel.from_frames(download_symbols(symbols, start_date_str, config["end_date"]))
+    
+    # Verify we have sufficient lookback data; nothing to check when no symbol came back
+    if stock_dfs.empty:
+        return stock_dfs
+    first_bars = stock_dfs.valid.argmax(axis=1)
+    for symbol, first_bar, has_bars in zip(stock_dfs.tickers, first_bars, stock_dfs.valid.any(axis=1)):
+        if not has_bars:
+            continue
+        data_start = pd.Timestamp(stock_dfs.dates[first_bar]).strftime("%Y-%m-%d")
+        if data_start > start_date_str:
+            print(f"Warning: {symbol} data starts from {data_start}, which may not provide sufficient lookback")
+    
+    return stock_dfs
+
+
+def download_symbols(symbols, start_date_str, end_date_str):
+
     try:
-        df = yf.download(symbols, start=start_date_str, end=config["end_date"])
+        df = yf.download(symbols, start=start_date_str, end=end_date_str)
         print(f"Stocks data downloaded successfully")
     except Exception as e:
         print(f"Error downloading data: {e}")
@@ -102,10 +127,4 @@ def fetch_data(symbols, config):
             print(f"Error processing {symbol}: {e}")
             continue
     
-    # Verify we have sufficient lookback data
-    for symbol, df in stock_dfs.items():
-        data_start = df.index.min().strftime("%Y-%m-%d")
-        if data_start > start_date_str:
-            print(f"Warning: {symbol} data starts from {data_start}, which may not provide sufficient lookback")
-    
     return stock_dfs
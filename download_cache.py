@@ -0,0 +1,205 @@
+# download_cache.py
+import os
+import json
+import threading
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# --- Constants ---
+
+DEFAULT_CACHE_DIR = "data/cache"
+COVERAGE_FILE = "coverage.json"
+OHLCV_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+DATE_FORMAT = "%Y-%m-%d"
+
+
+# --- Providers ---
+
+class YFinanceProvider:
+    """Downloads daily OHLCV bars from Yahoo Finance.
+
+    Any object with the same `download(tickers, start, end) -> {ticker: DataFrame}` method can be
+    passed to DownloadCache instead, e.g. a local fake in tests.
+    """
+
+    # yf.download collects results in module-level globals, so concurrent calls must not overlap;
+    # yfinance still fetches the tickers of one call on its own threads
+    _lock = threading.Lock()
+
+    def download(self, tickers: list, start: str, end: str) -> dict:
+        import yfinance as yf
+
+        with self._lock:
+            data = yf.download(tickers, start=start, end=end, group_by='ticker', progress=False, threads=True)
+        frames = {}
+        for ticker in tickers:
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                frame = data[ticker]
+            else:
+                frame = data
+            frame = frame[OHLCV_FIELDS].dropna(how='all')
+            if not frame.empty:
+                frames[ticker] = frame
+        return frames
+
+
+# --- Date Ranges ---
+
+def subtract_ranges(start: str, end: str, covered: list) -> list:
+    """Returns the parts of the half-open [start, end) date range not inside any covered range."""
+    missing = []
+    cursor = start
+    for covered_start, covered_end in sorted(covered):
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            missing.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+def merge_ranges(ranges: list) -> list:
+    """Merges overlapping or touching [start, end) ranges."""
+    merged = []
+    for range_start, range_end in sorted(ranges):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+        else:
+            merged.append((range_start, range_end))
+    return merged
+
+
+# --- Cache ---
+
+class DownloadCache:
+    """Per-ticker on-disk cache of daily bars that only downloads the date ranges it does not hold yet.
+
+    Each ticker's bars live in `<cache_dir>/<ticker>.parquet`; coverage.json records which requested
+    [start, end) ranges have been fetched, so holidays and missing bars are not re-requested. Missing
+    ranges are batched into `chunk_size`-ticker requests run on a thread pool. With `offline=True` the
+    provider is never called and only cached bars are returned.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, provider=None, chunk_size: int = 100,
+                 max_workers: int = 4, offline: bool = False):
+        self.cache_dir = cache_dir
+        self.provider = provider or YFinanceProvider()
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.offline = offline
+        os.makedirs(cache_dir, exist_ok=True)
+        self.coverage = self._load_coverage()
+
+    def _load_coverage(self) -> dict:
+        path = os.path.join(self.cache_dir, COVERAGE_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return {ticker: [tuple(r) for r in ranges] for ticker, ranges in json.load(f).items()}
+
+    def _save_coverage(self):
+        path = os.path.join(self.cache_dir, COVERAGE_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.coverage, f)
+        os.replace(path + '.tmp', path)
+
+    def _ticker_path(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, f"{ticker.replace(os.sep, '_')}.parquet")
+
+    def read(self, ticker: str) -> pd.DataFrame:
+        """Returns every cached bar for a ticker (empty frame when nothing is cached)."""
+        path = self._ticker_path(ticker)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=OHLCV_FIELDS, index=pd.DatetimeIndex([], name='Date'))
+        return pd.read_parquet(path)
+
+    def missing_ranges(self, ticker: str, start: str, end: str) -> list:
+        """Returns the [start, end) ranges of the request that the cache does not cover."""
+        return subtract_ranges(start, end, self.coverage.get(ticker, []))
+
+    def _store(self, ticker: str, frame: pd.DataFrame, fetched: tuple):
+        """Merges newly fetched bars into the ticker's file and marks the fetched range as covered."""
+        if fetched[0] >= fetched[1]:
+            fetched = None
+        if frame is not None and not frame.empty:
+            frame = frame[OHLCV_FIELDS].copy()
+            frame.index = pd.to_datetime(frame.index)
+            frame.index.name = 'Date'
+            merged = pd.concat([self.read(ticker), frame])
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            merged.to_parquet(self._ticker_path(ticker))
+        if fetched is not None:
+            self.coverage[ticker] = merge_ranges(self.coverage.get(ticker, []) + [fetched])
+
+    def fill(self, tickers: list, start: str, end: str):
+        """Downloads the uncovered parts of [start, end) for the tickers, in parallel bounded chunks."""
+        requests = {}
+        for ticker in tickers:
+            for gap in self.missing_ranges(ticker, start, end):
+                requests.setdefault(gap, []).append(ticker)
+        if not requests:
+            return
+        if self.offline:
+            gaps = sum(len(group) for group in requests.values())
+            print(f"Offline mode: {gaps} uncached ticker ranges were not downloaded")
+            return
+
+        batches = [
+            (gap, group[i:i + self.chunk_size])
+            for gap, group in requests.items()
+            for i in range(0, len(group), self.chunk_size)
+        ]
+        print(f"Downloading {len(batches)} missing range batches for {len(tickers)} tickers...")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.provider.download, batch, gap[0], gap[1]): (gap, batch) for gap, batch in batches}
+            for future in as_completed(futures):
+                gap, batch = futures[future]
+                try:
+                    frames = future.result()
+                except Exception as e:
+                    print(f"Error downloading {gap[0]} to {gap[1]} for {len(batch)} tickers: {e}")
+                    continue
+                # A successful request covers the gap even for tickers that returned no bars,
+                # except for today onwards, whose bars may not exist yet
+                covered = (gap[0], min(gap[1], datetime.now().strftime(DATE_FORMAT)))
+                for ticker in batch:
+                    self._store(ticker, frames.get(ticker), covered)
+        self._save_coverage()
+
+    def get(self, tickers: list, start, end) -> dict:
+        """Returns {ticker: OHLCV DataFrame} over [start, end), downloading only what is missing."""
+        start = _as_date_str(start)
+        end = _as_date_str(end)
+        self.fill(tickers, start, end)
+
+        frames = {}
+        for ticker in tickers:
+            frame = self.read(ticker)
+            frame = frame[(frame.index >= start) & (frame.index < end)]
+            if not frame.empty:
+                frames[ticker] = frame
+        return frames
+
+    def get_panel(self, tickers: list, start, end) -> pd.DataFrame:
+        """Returns the cached bars as a yfinance-style (ticker, field) column frame."""
+        frames = self.get(tickers, start, end)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1).sort_index()
+
+
+def _as_date_str(value) -> str:
+    return pd.Timestamp(value).strftime(DATE_FORMAT)
+
+
+def cache_from_config(config: dict) -> DownloadCache:
+    """Builds a DownloadCache from the backtest config ('download_cache_dir', 'offline')."""
+    return DownloadCache(config.get('download_cache_dir', DEFAULT_CACHE_DIR), offline=config.get('offline', False))
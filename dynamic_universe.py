@@ -0,0 +1,106 @@
+# dynamic_universe.py
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+import backtrader as bt
+from numpy_engine import backtrader_atr
+from indicator_cache import data_version, cache_from_config
+from aligned_panel import window_frames
+
+# --- Constants ---
+
+EXIT_BUFFER_BARS = 5    # Bars kept after the time exit so the closing market order can still fill
+
+
+class ATRPandasData(bt.feeds.PandasData):
+    """PandasData carrying an `atr` column precomputed over the full backtest window."""
+    lines = ('atr',)
+    params = (('atr', -1),)
+    datafields = bt.feeds.PandasData.datafields + ['atr']
+
+
+# --- Windows ---
+
+def with_atr(stock_df: pd.DataFrame, period: int, symbol: str = None, cache=None) -> pd.DataFrame:
+    """Returns the bars with the backtrader ATR of the whole frame added as an `atr` column.
+
+    With an IndicatorCache the ATR is shared with other runs over the same bars, e.g. sweeps.
+    """
+    high, low, close = (stock_df[field].values.astype(np.float64) for field in ('High', 'Low', 'Close'))
+    compute = lambda: backtrader_atr(high[:, None], low[:, None], close[:, None], period)[:, 0]
+    if cache is None:
+        return stock_df.assign(atr=compute())
+    return stock_df.assign(atr=cache.get_or_compute(symbol, 'bt_atr', (period,), data_version(high, low, close), compute))
+
+def trading_start_date(windows: dict, minperiod: int) -> date:
+    """First date on which every full feed has `minperiod` bars, when Cerebro would first call next().
+
+    Returns date.max when some feed never gets there, since Cerebro then never starts trading.
+    """
+    start = date.min
+    for stock_df in windows.values():
+        if len(stock_df) < minperiod:
+            return date.max
+        start = max(start, stock_df.index[minperiod - 1].date())
+    return start
+
+def candidate_dates(ranked_stocks: pd.DataFrame, top_n: int) -> dict:
+    """Maps each ticker to the dates it is among the top `top_n` ADX stocks, like the strategy's daily candidates."""
+    ranked_dates = pd.to_datetime(ranked_stocks['Date']).dt.date
+    dates = {}
+    for current_date, todays_stocks in ranked_stocks.groupby(ranked_dates, sort=False):
+        for ticker in set(todays_stocks.nlargest(top_n, '7-day ADX')['Ticker']):
+            dates.setdefault(ticker, []).append(current_date)
+    return dates
+
+def active_rows(index: pd.DatetimeIndex, dates: list, warmup_bars: int, hold_days: int) -> np.ndarray:
+    """Marks the bars from `warmup_bars` before each candidate date through its longest possible holding period."""
+    days = np.array(sorted(dates), dtype='datetime64[D]')
+    bar_days = index.values.astype('datetime64[D]')
+    starts = np.searchsorted(bar_days, days, side='right') - 1 - warmup_bars
+    ends = np.searchsorted(bar_days, days + np.timedelta64(hold_days, 'D'), side='right') + EXIT_BUFFER_BARS
+
+    # Mark window edges and sum them so overlapping windows merge
+    edges = np.zeros(len(index) + 1, dtype=np.int64)
+    np.add.at(edges, np.clip(starts, 0, len(index)), 1)
+    np.add.at(edges, np.clip(ends, 0, len(index)), -1)
+    return np.cumsum(edges[:-1]) > 0
+
+
+# --- Feeds ---
+
+def build_dynamic_feeds(stock_dfs, ranked_stocks: pd.DataFrame, config: dict) -> tuple:
+    """Trims each ticker's bars to the windows in which it can be entered or held.
+
+    A window runs from the ATR warm-up before a date the ticker is an entry candidate through the
+    limit order's extra day, `exit_time_days` and a few bars for the exit to fill. Tickers that are
+    never candidates get no feed. The first ticker keeps all its bars because the strategy reads the
+    current date from the first feed. ATR is computed on the untrimmed bars and passed as a column,
+    so stops match a full-universe run.
+
+    Returns ({symbol: trimmed frame with an `atr` column}, first trading date of the full universe).
+    """
+    fromdate = datetime.strptime(config["start_date"], "%Y-%m-%d")
+    todate = datetime.strptime(config["end_date"], "%Y-%m-%d")
+    atr_period = config['atr_period']
+    hold_days = 1 + config['exit_time_days']
+
+    windows = window_frames(stock_dfs, fromdate, todate)
+    trading_start = trading_start_date(windows, atr_period + 1)
+    candidates = candidate_dates(ranked_stocks, config["daily_tickers_entry"])
+    cache = cache_from_config(config)
+
+    feeds = {}
+    for i, (symbol, stock_df) in enumerate(windows.items()):
+        if i > 0 and symbol not in candidates:
+            continue
+        stock_df = with_atr(stock_df, atr_period, symbol, cache)
+        if i > 0:
+            stock_df = stock_df[active_rows(stock_df.index, candidates[symbol], atr_period + 1, hold_days)]
+        if not stock_df.empty:
+            feeds[symbol] = stock_df
+
+    total_bars = sum(len(stock_df) for stock_df in windows.values())
+    kept_bars = sum(len(stock_df) for stock_df in feeds.values())
+    print(f"Dynamic universe: {len(feeds)} of {len(windows)} feeds, {kept_bars} of {total_bars} bars")
+    return feeds, trading_start
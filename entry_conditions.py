@@ -4,17 +4,13 @@ import datetime
 def entry_logic(self, current_date):
 
     # Check current number of positions
-    current_positions = len([d for d in self.datas if self.getposition(d).size != 0])
+    current_positions = len(self.book)
     if current_positions >= self.config["active_positions_cap"]:
         return
 
-    # Get stocks for current date that passed all filters
-    todays_stocks = self.ranked_stocks[self.ranked_stocks['Date'] == current_date]
-    
-    # Sort by ADX (7-day ADX column) and get top stocks
-    if not todays_stocks.empty:
-        top_stocks = todays_stocks.nlargest(self.config["daily_tickers_entry"], '7-day ADX')['Ticker'].tolist()
-    else:
+    # Top ADX stocks for the current date, precomputed in ShortRSIStrategy.__init__
+    top_stocks = self.daily_candidates.get(current_date)
+    if not top_stocks:
         return  # No stocks for today
 
     # Calculate positions available
@@ -24,8 +20,8 @@ def entry_logic(self, current_date):
         return
 
     # Place orders for available positions
-    for i, d in enumerate(self.datas):
-        if d._name in top_stocks and not self.getposition(d).size:
+    for d in top_stocks:
+        if d._name not in self.book:
             if positions_available <= 0:
                 break
                 
@@ -0,0 +1,87 @@
+# equity_recorder.py
+import numpy as np
+import pandas as pd
+import backtrader as bt
+
+# --- Constants ---
+
+EQUITY_FIELDS = ['Value', 'Cash', 'Gross Exposure', 'Net Exposure', 'Open Positions']
+
+
+# --- Buffers ---
+
+class EquityBuffers:
+    """Preallocated per-bar columns of portfolio value, cash, exposure and open-position count.
+
+    Capacity doubles when a run has more bars than expected, so recording stays amortized O(1).
+    """
+
+    def __init__(self, capacity: int = 256):
+        capacity = max(int(capacity), 1)
+        self.dates = np.empty(capacity, dtype='datetime64[D]')
+        self.columns = {field: np.empty(capacity, dtype=np.float64) for field in EQUITY_FIELDS}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self):
+        capacity = 2 * len(self.dates)
+        self.dates = np.resize(self.dates, capacity)
+        self.columns = {field: np.resize(column, capacity) for field, column in self.columns.items()}
+
+    def record(self, day, value: float, cash: float, gross: float, net: float, open_positions: int):
+        """Appends one bar; `day` is anything np.datetime64 accepts (a date, or days since the epoch as int)."""
+        if self.size == len(self.dates):
+            self._grow()
+        i = self.size
+        self.dates[i] = np.datetime64(int(day), 'D') if isinstance(day, (int, np.integer)) else np.datetime64(day, 'D')
+        self.columns['Value'][i] = value
+        self.columns['Cash'][i] = cash
+        self.columns['Gross Exposure'][i] = gross
+        self.columns['Net Exposure'][i] = net
+        self.columns['Open Positions'][i] = open_positions
+        self.size += 1
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns the recorded bars as a Date-indexed DataFrame with one column per EQUITY_FIELDS entry."""
+        return pd.DataFrame(
+            {field: column[:self.size].copy() for field, column in self.columns.items()},
+            index=pd.DatetimeIndex(self.dates[:self.size].astype('datetime64[ns]'), name='Date')
+        )
+
+
+# --- Analyzer ---
+
+class EquityRecorder(bt.Analyzer):
+    """Records the portfolio into EquityBuffers on every bar, in place of the PyFolio analyzer.
+
+    Exposure is summed over the strategy's PositionBook, so each bar costs O(open positions).
+    """
+
+    def start(self):
+        # Preloaded feeds know their length, which is usually the number of bars in the run
+        self.buffers = EquityBuffers(max((data.buflen() for data in self.strategy.datas), default=0))
+
+    def next(self):
+        broker = self.strategy.broker
+        gross = net = 0.0
+        for position in self.strategy.book.positions.values():
+            exposure = self.strategy.getposition(position.data).size * position.data.close[0]
+            gross += abs(exposure)
+            net += exposure
+        self.buffers.record(self.strategy.datetime.date(0), broker.getvalue(), broker.getcash(),
+                            gross, net, len(self.strategy.book))
+
+    def get_analysis(self):
+        return self.buffers.to_frame()
+
+
+def equity_frame(strategy) -> pd.DataFrame:
+    """Recorded per-bar portfolio state of a finished backtest from either engine, or None if it was not recorded."""
+    if hasattr(strategy, 'recorder'):
+        return strategy.recorder.to_frame()
+    analyzers = getattr(strategy, 'analyzers', None)
+    if analyzers is not None and hasattr(analyzers, 'equity'):
+        return analyzers.equity.get_analysis()
+    return None
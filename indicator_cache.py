@@ -0,0 +1,140 @@
+# indicator_cache.py
+import os
+import hashlib
+import tempfile
+import numpy as np
+from collections import OrderedDict
+
+# --- Constants ---
+
+DEFAULT_CACHE_DIR = "data/indicator_cache"
+DEFAULT_MAX_MB = 512
+
+
+def data_version(*arrays) -> str:
+    """Hash of the input bars an indicator is computed from, so edited or extended data gets new entries."""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str(array.dtype).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+# --- Cache ---
+
+class IndicatorCache:
+    """Indicator arrays keyed by (ticker, indicator, params, data version), kept in memory and on disk.
+
+    Both layers evict least-recently-used entries once they hold more than `max_mb`; on disk the
+    file modification time records the last use. Files are written atomically, so worker processes
+    can share one cache directory. `cache_dir=None` keeps the cache in memory only.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_mb: float = DEFAULT_MAX_MB):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 2**20)
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(ticker: str, indicator: str, params: tuple, version: str) -> str:
+        raw = f"{ticker}|{indicator}|{params!r}|{version}"
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def get_or_compute(self, ticker: str, indicator: str, params: tuple, version: str, compute) -> np.ndarray:
+        """Returns the cached array for the key, calling `compute()` and storing its result on a miss."""
+        key = self.key(ticker, indicator, params, version)
+        values = self._get(key)
+        if values is not None:
+            self.hits += 1
+            return values
+        self.misses += 1
+        values = np.asarray(compute())
+        self._put(key, values)
+        return values
+
+    # --- Layers ---
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def _get(self, key: str):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            values = np.load(path)
+            os.utime(path)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        self._remember(key, values)
+        return values
+
+    def _put(self, key: str, values: np.ndarray):
+        self._remember(key, values)
+        if not self.cache_dir:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, values)
+        os.replace(tmp_path, self._path(key))
+        self._evict_disk()
+
+    def _remember(self, key: str, values: np.ndarray):
+        values.setflags(write=False)    # Shared by every reader, so nobody may modify it in place
+        self._memory[key] = values
+        self._memory_bytes += values.nbytes
+        while self._memory_bytes > self.max_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+
+    def _evict_disk(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.npy'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    # --- Stats ---
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    def report(self, label: str = "Indicator cache"):
+        """Prints the hit and miss counts since the cache was opened."""
+        stats = self.stats()
+        print(f"{label}: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate)")
+
+
+_caches = {}
+
+def cache_from_config(config: dict):
+    """Returns the process' IndicatorCache for the config ('indicator_cache_dir', 'indicator_cache_mb'),
+    or None when 'indicator_cache' is off. Repeated calls share one instance, so its stats add up."""
+    if not config.get('indicator_cache', False):
+        return None
+    cache_dir = config.get('indicator_cache_dir', DEFAULT_CACHE_DIR)
+    if cache_dir not in _caches:
+        _caches[cache_dir] = IndicatorCache(cache_dir, config.get('indicator_cache_mb', DEFAULT_MAX_MB))
+    return _caches[cache_dir]
@@ -0,0 +1,48 @@
+# memory_budget.py
+import os
+import sys
+import math
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# --- Constants ---
+
+CSV_EXPANSION_FACTOR = 4    # In-memory DataFrame size relative to the CSV file size, for parsed numbers plus object tickers
+CSV_CHUNK_ROWS = 1_000_000  # Rows parsed per chunk when a CSV is read under a memory budget
+
+
+# --- Peak RSS ---
+
+def peak_rss_mb() -> float:
+    """Returns the process' peak resident set size in MB, or None when the platform does not report it."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in KB on Linux
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().peak_wset / 2**20
+
+def report_peak_rss(label: str):
+    """Prints the peak RSS of the run so far."""
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"{label} peak RSS: {peak:.0f} MB")
+
+
+# --- Budgeting ---
+
+def chunks_needed(estimated_bytes: float, budget_mb: float) -> int:
+    """Number of chunks that keeps each one within `budget_mb`; 1 when there is no budget or it already fits."""
+    if not budget_mb or estimated_bytes <= budget_mb * 2**20:
+        return 1
+    return math.ceil(estimated_bytes / (budget_mb * 2**20))
+
+def estimate_csv_bytes(csv_path: str) -> int:
+    """Rough in-memory size of a CSV once parsed into a DataFrame."""
+    return os.path.getsize(csv_path) * CSV_EXPANSION_FACTOR
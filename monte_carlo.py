@@ -0,0 +1,150 @@
+# monte_carlo.py
+import os
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+# --- Constants ---
+
+DEFAULT_PATHS = 20000
+DEFAULT_BLOCK_SIZE = 5      # Days per block when resampling daily returns, to keep short-run autocorrelation
+DEFAULT_CHUNK_MB = 256      # Memory for the resample matrices of one chunk of paths
+DEFAULT_LEVELS = [0.90, 0.95, 0.99]
+MATRICES_PER_CHUNK = 4      # Indices, samples, equity and running peak are alive at the same time
+SEED = 42
+
+
+# --- Resampling ---
+
+def resample_indices(rng: np.random.Generator, n: int, paths: int, block_size: int = 1) -> np.ndarray:
+    """(paths, n) sample indices; block_size > 1 draws circular blocks of consecutive indices (block bootstrap)."""
+    if block_size <= 1:
+        return rng.integers(0, n, size=(paths, n))
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(paths, n_blocks, 1))
+    indices = (starts + np.arange(block_size)) % n
+    return indices.reshape(paths, n_blocks * block_size)[:, :n]
+
+def paths_per_chunk(n: int, chunk_mb: float = DEFAULT_CHUNK_MB) -> int:
+    """Paths whose float64/int64 resample matrices fit in `chunk_mb`."""
+    return max(int(chunk_mb * 2**20 // (MATRICES_PER_CHUNK * 8 * max(n, 1))), 1)
+
+
+# --- Path Metrics ---
+
+def max_drawdown(equity: np.ndarray) -> np.ndarray:
+    """Largest peak-to-trough fall of each row of an equity matrix, in percent."""
+    peaks = np.maximum.accumulate(equity, axis=1)
+    return (1 - equity / peaks).max(axis=1) * 100
+
+def trade_path_metrics(pnl: np.ndarray, capital: float) -> dict:
+    """Final P/L and drawdown of each row of a (paths, trades) matrix of resampled trade P/L."""
+    equity = capital + np.cumsum(pnl, axis=1)
+    # Prepend the starting capital so a losing first trade counts as drawdown
+    equity = np.concatenate([np.full((len(equity), 1), float(capital)), equity], axis=1)
+    return {"Total Portfolio P/L": equity[:, -1] - capital, "Maximum Drawdown": max_drawdown(equity)}
+
+def return_path_metrics(returns: np.ndarray, capital: float, risk_free_rate: float = 0.02) -> dict:
+    """Final P/L, drawdown and Sharpe ratio of each row of a (paths, days) matrix of resampled daily returns.
+
+    Sharpe is annualized the same way as create_reports.calculate_equity_metrics.
+    """
+    growth = np.cumprod(1 + returns, axis=1)
+    returns_std = returns.std(axis=1)
+    excess = returns.mean(axis=1) - risk_free_rate/252
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe_ratio = np.where(returns_std > 0, excess / returns_std * np.sqrt(252), 0.0)
+    growth = np.concatenate([np.ones((len(growth), 1)), growth], axis=1)
+    return {
+        "Total Portfolio P/L": capital * (growth[:, -1] - 1),
+        "Maximum Drawdown": max_drawdown(growth),
+        "Sharpe Ratio": sharpe_ratio
+    }
+
+def bootstrap(samples: np.ndarray, path_metrics, n_paths: int = DEFAULT_PATHS, block_size: int = 1,
+              chunk_mb: float = DEFAULT_CHUNK_MB, seed: int = SEED, **kwargs) -> dict:
+    """Runs `n_paths` resamples of `samples` through `path_metrics`, a chunk of paths at a time.
+
+    Each chunk is one (paths, len(samples)) matrix, so only the per-path metrics outlive it.
+    Returns one array of length n_paths per metric.
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    chunk = paths_per_chunk(len(samples), chunk_mb)
+    results = {}
+    for start in range(0, n_paths, chunk):
+        paths = min(chunk, n_paths - start)
+        indices = resample_indices(rng, len(samples), paths, block_size)
+        for metric, values in path_metrics(samples[indices], **kwargs).items():
+            results.setdefault(metric, []).append(values)
+    return {metric: np.concatenate(values) for metric, values in results.items()}
+
+
+# --- Summary ---
+
+def confidence_intervals(results: dict, observed: dict = None, levels: list = DEFAULT_LEVELS) -> pd.DataFrame:
+    """Median and two-sided percentile intervals per metric, next to the observed single-path value."""
+    rows = {}
+    for metric, values in results.items():
+        row = {"Observed": (observed or {}).get(metric, np.nan), "Mean": values.mean(), "Median": np.median(values)}
+        for level in levels:
+            tail = (1 - level) / 2 * 100
+            low, high = np.percentile(values, [tail, 100 - tail])
+            row[f"{level:.0%} Low"] = low
+            row[f"{level:.0%} High"] = high
+        row["Share Positive"] = (values > 0).mean()
+        rows[metric] = row
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+def monte_carlo_report(trades_df: pd.DataFrame, equity: pd.DataFrame, capital: float, n_paths: int = DEFAULT_PATHS,
+                       block_size: int = DEFAULT_BLOCK_SIZE, chunk_mb: float = DEFAULT_CHUNK_MB, seed: int = SEED) -> pd.DataFrame:
+    """Confidence intervals from resampling the trade list (i.i.d.) and the daily returns (block bootstrap).
+
+    Either input may be None or empty; its section is then left out.
+    """
+    sections = []
+    if trades_df is not None and not trades_df.empty:
+        pnl = trades_df['Net P/L'].values
+        results = bootstrap(pnl, trade_path_metrics, n_paths, 1, chunk_mb, seed, capital=capital)
+        observed = {metric: values[0] for metric, values in trade_path_metrics(pnl[None, :], capital).items()}
+        sections.append(confidence_intervals(results, observed).rename(index=lambda metric: f"Trades: {metric}"))
+    if equity is not None and len(equity) > 2:
+        values = equity['Value'].values
+        returns = values[1:] / values[:-1] - 1
+        results = bootstrap(returns, return_path_metrics, n_paths, block_size, chunk_mb, seed + 1, capital=values[0])
+        observed = {metric: metric_values[0] for metric, metric_values in return_path_metrics(returns[None, :], values[0]).items()}
+        sections.append(confidence_intervals(results, observed).rename(index=lambda metric: f"Daily: {metric}"))
+    return pd.concat(sections) if sections else pd.DataFrame()
+
+
+# --- Main Execution ---
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Bootstrap confidence intervals for a finished backtest's P/L, drawdown and Sharpe")
+    parser.add_argument("--paths", type=int, default=DEFAULT_PATHS, help="Number of resampled paths")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="Days per block for the daily returns (1 = i.i.d.)")
+    parser.add_argument("--chunk-mb", type=float, default=DEFAULT_CHUNK_MB, help="Memory for the resample matrices of one chunk")
+    parser.add_argument("--seed", type=int, default=SEED, help="Random seed")
+    parser.add_argument("--suffix", default=None, help="Report suffix to read (defaults to the config date range)")
+    args = parser.parse_args()
+
+    with open("source/config.json") as f:
+        config = json.load(f)
+
+    # Read the trades log and equity curve create_reports saved for this run
+    report_suffix = args.suffix or f"{config['start_date']}_to_{config['end_date']}"
+    trades_path = f'reports/trades_{report_suffix}.csv'
+    equity_path = f'reports/equity_{report_suffix}.csv'
+    trades_df = pd.read_csv(trades_path) if os.path.exists(trades_path) else None
+    equity = pd.read_csv(equity_path, index_col='Date', parse_dates=True) if os.path.exists(equity_path) else None
+    if trades_df is None and equity is None:
+        raise SystemExit(f"No {trades_path} or {equity_path}; run backtest.py first")
+
+    summary = monte_carlo_report(trades_df, equity, config["capital"], n_paths=args.paths, block_size=args.block_size,
+                                 chunk_mb=args.chunk_mb, seed=args.seed)
+    summary_path = f'reports/monte_carlo_{report_suffix}.csv'
+    summary.to_csv(summary_path)
+    print(f"\nMonte Carlo confidence intervals ({args.paths} paths) saved to {summary_path}")
+    print(summary.to_string(float_format=lambda value: f"{value:,.2f}"))
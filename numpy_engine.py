@@ -0,0 +1,560 @@
+# numpy_engine.py
+import math
+import numpy as np
+import pandas as pd
+from datetime import datetime, date, timedelta
+from position_book import PositionBook
+from equity_recorder import EquityBuffers
+from position_recorder import PositionBuffers
+from profiler import PROFILER
+from indicator_cache import data_version, cache_from_config
+from aligned_panel import AlignedPanel
+
+# --- Constants ---
+
+OHLC_FIELDS = ['Open', 'High', 'Low', 'Close']
+POSITION_FRACTION = 0.10    # Share of portfolio value put into each entry, as in entry_logic
+EPOCH = date(1970, 1, 1)
+MARKET_KEYS = ('start_date', 'end_date', 'atr_period', 'daily_tickers_entry')   # Config values prepare_market depends on
+
+
+# --- Aligned Arrays ---
+
+def build_aligned_arrays(stock_dfs, fromdate: datetime, todate: datetime) -> dict:
+    """Aligns every feed's bars inside [fromdate, todate] on the union of their dates.
+
+    `stock_dfs` is the loader's AlignedPanel (a {symbol: frame} dict is aligned into one first).
+    Returns (dates x feeds) arrays forward-filled the way backtrader presents a feed with no bar
+    on a date (its last bar stays current), the per-feed bar count and the calendar index of each
+    feed's current bar, plus left-aligned (bars x feeds) arrays of each feed's own bars.
+    """
+    panel = stock_dfs if isinstance(stock_dfs, AlignedPanel) else AlignedPanel.from_frames(stock_dfs)
+    window = panel.window(fromdate, todate)
+    names = window.tickers
+
+    # Dates on which no feed has a bar are not part of the calendar
+    traded = window.valid.any(axis=0)
+    valid = window.valid[:, traded].T
+    calendar = window.dates[traded].astype('datetime64[D]').astype(np.int64)
+    n_dates, n_feeds = valid.shape
+    lengths = valid.sum(axis=0)
+    max_length = int(lengths.max()) if n_feeds else 0
+
+    # Calendar index of each feed's current bar, -1 before its first bar
+    current_bar = np.cumsum(valid, axis=0, dtype=np.int64) - 1
+    bar_index = np.maximum.accumulate(np.where(valid, np.arange(n_dates)[:, None], -1), axis=0)
+
+    own = {field: np.full((max_length, n_feeds), np.nan) for field in OHLC_FIELDS}
+    for i, name in enumerate(names):
+        bars = window.valid[i]
+        for field in OHLC_FIELDS:
+            own[field][:lengths[i], i] = window.series(name, field)[bars]
+
+    rows = np.maximum(current_bar, 0)
+    feeds = np.arange(n_feeds)
+    aligned = {}
+    for field in OHLC_FIELDS:
+        values = own[field][rows, feeds] if max_length else np.full((n_dates, n_feeds), np.nan)
+        aligned[field] = np.where(current_bar >= 0, values, np.nan)
+
+    return {
+        'names': names,
+        'calendar': calendar,
+        'bar_count': current_bar + 1,
+        'bar_index': bar_index,
+        'current_bar': current_bar,
+        'own': own,
+        'aligned': aligned
+    }
+
+def backtrader_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """ATR over left-aligned (bars x feeds) arrays, reproducing bt.indicators.ATR value for value.
+
+    True range starts on each feed's second bar; the first ATR is the fsum mean of `period` true
+    ranges and later values follow the smoothed moving average recurrence.
+    """
+    atr = np.full(high.shape, np.nan)
+    if len(high) <= period:
+        return atr
+    prev_close = close[:-1]
+    true_range = np.maximum(high[1:], prev_close) - np.minimum(low[1:], prev_close)
+
+    alpha = 1.0 / period
+    alpha1 = 1.0 - alpha
+    prev = np.array([math.fsum(true_range[:period, i]) / period for i in range(high.shape[1])])
+    atr[period] = prev
+    for k in range(period + 1, len(high)):
+        prev = prev * alpha1 + true_range[k - 1] * alpha
+        atr[k] = prev
+    return atr
+
+
+def cached_atr(arrays: dict, period: int, cache=None) -> np.ndarray:
+    """backtrader_atr over every feed's own bars, reading per-ticker columns from an IndicatorCache when given."""
+    own = arrays['own']
+    if cache is None:
+        return backtrader_atr(own['High'], own['Low'], own['Close'], period)
+
+    atr = np.full(own['Close'].shape, np.nan)
+    for i, name in enumerate(arrays['names']):
+        length = int(arrays['bar_count'][-1, i]) if len(arrays['bar_count']) else 0
+        high, low, close = (own[field][:length, i] for field in ('High', 'Low', 'Close'))
+        compute = lambda: backtrader_atr(high[:, None], low[:, None], close[:, None], period)[:, 0]
+        atr[:length, i] = cache.get_or_compute(name, 'bt_atr', (period,), data_version(high, low, close), compute)
+    return atr
+
+def prepare_market(stock_dfs: dict, ranked_stocks: pd.DataFrame, config: dict) -> dict:
+    """Builds the aligned arrays, ATR and daily entry candidates a NumpyBacktest reads.
+
+    Only the MARKET_KEYS config values shape the result, so one market can be shared read-only by
+    every backtest that differs in other parameters.
+    """
+    fromdate = datetime.strptime(config["start_date"], "%Y-%m-%d")
+    todate = datetime.strptime(config["end_date"], "%Y-%m-%d")
+    arrays = build_aligned_arrays(stock_dfs, fromdate, todate)
+
+    names = arrays['names']
+    current_bar = arrays['current_bar']
+    atr_own = cached_atr(arrays, config['atr_period'], cache_from_config(config))
+    atr = np.where(current_bar >= 0, atr_own[np.maximum(current_bar, 0), np.arange(len(names))], np.nan) \
+        if len(atr_own) else np.full(current_bar.shape, np.nan)
+
+    # Each ranked date's top `daily_tickers_entry` ADX stocks, as feed indices in feed order
+    feed_order = {name: i for i, name in enumerate(names)}
+    ranked_dates = pd.to_datetime(ranked_stocks['Date']).dt.date
+    daily_candidates = {}
+    for current_date, todays_stocks in ranked_stocks.groupby(ranked_dates, sort=False):
+        top_stocks = todays_stocks.nlargest(config["daily_tickers_entry"], '7-day ADX')['Ticker']
+        daily_candidates[current_date] = sorted(feed_order[name] for name in set(top_stocks) if name in feed_order)
+
+    return {
+        'arrays': arrays,
+        'atr': atr,
+        'dates': [EPOCH + timedelta(days=int(day)) for day in arrays['calendar']],
+        'daily_candidates': daily_candidates
+    }
+
+
+# --- Positions, Orders and Trades ---
+
+def update_position(size: int, price: float, trade_size: int, trade_price: float) -> tuple:
+    """Returns (size, price, opened, closed) after trading `trade_size` units, as backtrader's Position.update."""
+    new_size = size + trade_size
+    if not new_size:
+        return 0, 0.0, 0, trade_size
+    if not size:
+        return new_size, trade_price, trade_size, 0
+    if (size > 0) == (trade_size > 0):
+        return new_size, (price * size + trade_size * trade_price) / new_size, trade_size, 0
+    if (new_size > 0) == (size > 0):
+        return new_size, price, 0, trade_size
+    return new_size, trade_price, new_size, -size
+
+
+class EngineFeed:
+    """Stands in for a backtrader feed in results, so reports can read `trade.data._name`."""
+    __slots__ = ('_name', 'index')
+
+    def __init__(self, name, index):
+        self._name = name
+        self.index = index
+
+
+class EngineOrder:
+    """A submitted limit or market order; `valid_day` is the last day a limit order may fill."""
+    __slots__ = ('feed', 'size', 'market', 'price', 'created_bar', 'valid_day')
+
+    def __init__(self, feed, size, market, price, created_bar, valid_day=None):
+        self.feed = feed
+        self.size = size
+        self.market = market
+        self.price = price
+        self.created_bar = created_bar
+        self.valid_day = valid_day
+
+
+class EngineTrade:
+    """Round trip on one feed, accumulating P&L and commission like backtrader's Trade."""
+    __slots__ = ('data', 'size', 'price', 'pnl', 'commission', 'pnlcomm', 'isclosed', 'dtopen', 'dtclose')
+
+    def __init__(self, data):
+        self.data = data
+        self.size = 0
+        self.price = 0.0
+        self.pnl = 0.0
+        self.commission = 0.0
+        self.pnlcomm = 0.0
+        self.isclosed = False
+        self.dtopen = None
+        self.dtclose = None
+
+    def update(self, size, price, commission, bar_date):
+        self.commission += commission
+        oldsize = self.size
+        self.size += size
+        if not oldsize and size:
+            self.dtopen = bar_date
+        self.isclosed = bool(oldsize and not self.size)
+        if self.isclosed:
+            self.dtclose = bar_date
+
+        if abs(self.size) > abs(oldsize):
+            self.price = (oldsize * self.price + size * price) / self.size
+            pnl = 0.0
+        else:
+            pnl = -size * (price - self.price)
+        self.pnl += pnl
+        self.pnlcomm = self.pnl - self.commission
+
+
+class ArrayBroker:
+    """Cash and positions of the NumPy engine, following backtrader's BackBroker arithmetic.
+
+    Short sales credit their value to cash, commission is a percentage of traded value and the
+    portfolio value is cash plus every position marked to its feed's close.
+    """
+
+    def __init__(self, cash: float, commission: float, n_feeds: int):
+        self.cash = float(cash)
+        self.value = self.cash
+        self.commission = commission
+        self.sizes = [0] * n_feeds
+        self.prices = [0.0] * n_feeds
+        self.open_feeds = set()
+
+    def getvalue(self):
+        return self.value
+
+    def getcash(self):
+        return self.cash
+
+    def settle(self, cash, price, position_price, opened, closed, pnl):
+        """Applies the cash flows of closing then opening units at `price`.
+
+        Returns (cash, committed cash, opened, closed commission, opened commission); an opening
+        that would leave negative cash is dropped, as backtrader rejects it with a margin call.
+        """
+        committed = cash
+        closed_comm = opened_comm = 0.0
+        if closed:
+            cash += -closed * position_price + pnl
+            closed_comm = abs(closed) * self.commission * price
+            cash -= closed_comm
+            committed = cash
+        if opened:
+            cash -= opened * price
+            opened_comm = abs(opened) * self.commission * price
+            cash -= opened_comm
+            if cash < 0.0:
+                opened, opened_comm = 0, 0.0
+            else:
+                committed = cash
+        return cash, committed, opened, closed_comm, opened_comm
+
+    def mark(self, close_row: np.ndarray):
+        """Recomputes the portfolio value from the bar's closes."""
+        positions_value = 0.0
+        for i in sorted(self.open_feeds):
+            size = self.sizes[i]
+            close = float(close_row[i])
+            value = size * close
+            if value > 0:
+                unrealized = size * (close - self.prices[i])
+                positions_value += value - unrealized
+                positions_value += unrealized
+            else:
+                positions_value += value
+        self.value = self.cash + positions_value
+
+    def exposure(self, close_row: np.ndarray) -> tuple:
+        """Returns the (gross, net) market value of the open positions at the bar's closes."""
+        gross = net = 0.0
+        for i in self.open_feeds:
+            value = self.sizes[i] * float(close_row[i])
+            gross += abs(value)
+            net += value
+        return gross, net
+
+
+# --- Engine ---
+
+class NumpyBacktest:
+    """Runs ShortRSIStrategy's entry and exit rules over aligned arrays instead of backtrader feeds.
+
+    Fills, commissions, order expiry and the ATR warm-up follow backtrader's defaults, so the trades,
+    `trade_tracking`, `exit_details` and `broker.getvalue()` read by create_reports match a Cerebro
+    run on the same data.
+    """
+
+    def __init__(self, stock_dfs: dict, ranked_stocks: pd.DataFrame, config: dict, market: dict = None):
+        for param in ['exit_time_days', 'atr_period', 'atr_multiplier', 'profit_target_percent']:
+            if param not in config:
+                raise ValueError(f"Missing required parameter in config: {param}")
+
+        self.config = config
+        self.start_date = datetime.strptime(config["start_date"], "%Y-%m-%d").date()
+        market = market or prepare_market(stock_dfs, ranked_stocks, config)
+        self.arrays = market['arrays']
+        self.atr = market['atr']
+        self.dates = market['dates']
+        self.daily_candidates = market['daily_candidates']
+
+        names = self.arrays['names']
+        self.feeds = [EngineFeed(name, i) for i, name in enumerate(names)]
+        self.broker = ArrayBroker(config["capital"], config["commission"], len(names))
+        self.book = PositionBook(self.feeds)
+        self.trades = []
+        self.trade_tracking = {}
+        self.exit_details = {}
+        self.open_trades = {}
+        self.rejected = False
+        self.recorder = EquityBuffers(len(self.dates))
+        self.position_recorder = PositionBuffers(names)
+
+    def run(self, max_drawdown: float = None, verbose: bool = True):
+        """Replays every bar; with `max_drawdown` (a fraction) the run stops early and is flagged
+        `rejected` once the portfolio value falls that far below its peak."""
+        minperiod = self.config['atr_period'] + 1   # ATR needs a previous close plus `atr_period` true ranges
+        bar_count = self.arrays['bar_count']
+        ready = (bar_count >= minperiod).all(axis=1) if self.feeds else np.zeros(len(bar_count), dtype=bool)
+
+        submitted, pending = [], []
+        peak_value = self.broker.getvalue()
+        for t in range(len(self.dates)):
+            current_date = self.dates[self.arrays['bar_index'][t, 0]] if self.feeds else self.dates[t]
+            with PROFILER.phase('broker'):
+                pending = self.broker_next(t, submitted, pending, current_date)
+            submitted = []
+            self.record(t)
+            if max_drawdown is not None:
+                peak_value = max(peak_value, self.broker.getvalue())
+                if self.broker.getvalue() < peak_value * (1 - max_drawdown):
+                    self.rejected = True
+                    break
+            if ready[t] and current_date >= self.start_date:
+                with PROFILER.phase('next'):
+                    with PROFILER.phase('entry_logic'):
+                        self.entry_logic(t, current_date, submitted)
+                    with PROFILER.phase('exit_logic'):
+                        self.exit_logic(t, current_date, submitted)
+                PROFILER.bar(current_date, len(self.book))
+
+        if verbose:
+            self.stop()
+        return self
+
+    def record(self, t):
+        """Records the portfolio and its open positions after bar `t`'s fills, as EquityRecorder and
+        PositionRecorder do for a Cerebro run."""
+        broker = self.broker
+        close_row = self.arrays['aligned']['Close'][t]
+        day = self.arrays['calendar'][t]
+        gross, net = broker.exposure(close_row)
+        self.recorder.record(day, broker.getvalue(), broker.getcash(), gross, net, len(self.book))
+        multiplier = self.config['atr_multiplier']
+        for position in self.book.positions.values():
+            i = position.feed_index
+            self.position_recorder.record(day, i, position.entry_date, broker.sizes[i], position.entry_price,
+                                          float(close_row[i]), position.entry_price + multiplier * float(self.atr[t, i]),
+                                          position.profit_target_price)
+
+    def equity_curve(self) -> pd.Series:
+        """Portfolio value after each bar's fills, indexed by date (cut short if the run was rejected)."""
+        return self.recorder.to_frame()['Value'].rename('Equity')
+
+    # --- Broker Step ---
+
+    def broker_next(self, t, submitted, pending, current_date):
+        """Accepts the orders submitted on the previous bar, tries every pending order and marks the portfolio."""
+        broker = self.broker
+        aligned = self.arrays['aligned']
+        bar_index = self.arrays['bar_index']
+
+        # Orders are accepted only if the cash left after pseudo-executing them in turn is not negative
+        cash = broker.cash
+        positions = {}
+        for order in submitted:
+            i = order.feed.index
+            size, price = positions.get(i, (broker.sizes[i], broker.prices[i]))
+            new_size, new_price, opened, closed = update_position(size, price, order.size, order.price)
+            positions[i] = (new_size, new_price)
+            cash = broker.settle(cash, order.price, order.price, opened, closed, 0.0)[0]
+            if cash >= 0.0:
+                pending.append(order)
+
+        executed, closed_trades, alive = [], [], []
+        for order in pending:
+            i = order.feed.index
+            if not order.market and self.arrays['calendar'][bar_index[t, i]] > order.valid_day:
+                continue  # limit order expired
+
+            bar_open = float(aligned['Open'][t, i])
+            fill_price = None
+            if order.market:
+                if bar_index[t, i] > order.created_bar:
+                    fill_price = bar_open
+            elif order.size < 0:
+                if order.price <= bar_open:
+                    fill_price = bar_open
+                elif order.price <= aligned['High'][t, i]:
+                    fill_price = order.price
+            else:
+                if order.price >= bar_open:
+                    fill_price = bar_open
+                elif order.price >= aligned['Low'][t, i]:
+                    fill_price = order.price
+
+            if fill_price is None:
+                alive.append(order)
+                continue
+            executed_size = self.execute(order, fill_price, self.dates[bar_index[t, i]], closed_trades)
+            if executed_size == order.size:
+                # Reported like backtrader's order.executed, which averages the fills into a price
+                executed.append((order, (0.0 + executed_size * fill_price) / executed_size))
+
+        broker.mark(aligned['Close'][t])
+
+        for order, fill_price in executed:
+            self.notify_order(order, fill_price, current_date)
+        for trade in closed_trades:
+            self.notify_trade(trade)
+        return alive
+
+    def execute(self, order, price, bar_date, closed_trades):
+        """Fills an order at `price`; returns the executed size, short of the order's when its opening part is rejected for lack of cash."""
+        broker = self.broker
+        i = order.feed.index
+        size, position_price = broker.sizes[i], broker.prices[i]
+        _, _, opened, closed = update_position(size, position_price, order.size, price)
+        pnl = -closed * (price - position_price)
+        _, broker.cash, opened, closed_comm, opened_comm = broker.settle(broker.cash, price, position_price, opened, closed, pnl)
+
+        if closed + opened:
+            broker.sizes[i], broker.prices[i], _, _ = update_position(size, position_price, closed + opened, price)
+            if broker.sizes[i]:
+                broker.open_feeds.add(i)
+            else:
+                broker.open_feeds.discard(i)
+
+            trade = self.open_trades.get(i)
+            if closed:
+                trade.update(closed, price, closed_comm, bar_date)
+                if trade.isclosed:
+                    closed_trades.append(trade)
+            if opened:
+                if trade is None or trade.isclosed:
+                    trade = self.open_trades[i] = EngineTrade(order.feed)
+                trade.update(opened, price, opened_comm, bar_date)
+        return closed + opened
+
+    # --- Strategy Step ---
+
+    def notify_order(self, order, price, current_date):
+        name = order.feed._name
+        if order.size < 0:  # Short entry
+            self.book.open(
+                order.feed,
+                entry_date=current_date,
+                entry_price=price,
+                size=abs(order.size),
+                time_exit_date=current_date + timedelta(days=self.config["exit_time_days"]),
+                profit_target_price=price * (1 - self.config['profit_target_percent']/100)
+            )
+            self.trade_tracking[name] = {
+                'entry_date': current_date,
+                'entry_price': price,
+                'symbol': name,
+                'shares': abs(order.size),
+                'size': abs(order.size)
+            }
+        elif name in self.trade_tracking:  # Buy to cover (exit)
+            self.trade_tracking[name].update({'exit_date': current_date, 'exit_price': price})
+
+    def notify_trade(self, trade):
+        name = trade.data._name
+        self.trades.append(trade)
+        self.book.close(name)
+        if name in self.trade_tracking:
+            trade_info = self.trade_tracking[name]
+            trade_info['net_pnl'] = trade.pnlcomm
+            trade_info['symbol'] = name
+            trade_info.setdefault('exit_date', trade.dtclose)
+            trade_info.setdefault('exit_price', trade.price)
+
+    def entry_logic(self, t, current_date, submitted):
+        cap = self.config["active_positions_cap"]
+        current_positions = len(self.book)
+        if current_positions >= cap:
+            return
+        top_stocks = self.daily_candidates.get(current_date)
+        if not top_stocks:
+            return
+
+        positions_available = min(cap - current_positions, len(top_stocks))
+        close = self.arrays['aligned']['Close']
+        valid_day = (current_date + timedelta(days=1) - EPOCH).days
+        for i in top_stocks:
+            if self.feeds[i]._name in self.book:
+                continue
+            if positions_available <= 0:
+                break
+            position_size = self.broker.getvalue() * POSITION_FRACTION
+            entry_price = float(close[t, i]) * (1 + self.config["limit_order_percent"]/100)
+            num_shares = int(position_size / entry_price)
+            if num_shares > 0:
+                submitted.append(EngineOrder(
+                    self.feeds[i], -num_shares, False, entry_price, self.arrays['bar_index'][t, i], valid_day
+                ))
+                positions_available -= 1
+
+    def exit_logic(self, t, current_date, submitted):
+        close = self.arrays['aligned']['Close']
+        for position in self.book.in_feed_order():
+            i = position.feed_index
+            entry_price = position.entry_price
+            current_price = float(close[t, i])
+            days_held = (current_date - position.entry_date).days
+            stop_loss_price = entry_price + (self.config['atr_multiplier'] * float(self.atr[t, i]))
+            profit_target_price = position.profit_target_price
+
+            if days_held >= self.config["exit_time_days"]:
+                exit_criterion = 'Time-based'
+                exit_value = position.time_exit_date.strftime("%Y-%m-%d")
+            elif current_price >= stop_loss_price:
+                exit_criterion = 'Stop Loss'
+                exit_value = stop_loss_price
+            elif (entry_price - current_price) / entry_price * 100 >= self.config['profit_target_percent']:
+                exit_criterion = 'Profit Target'
+                exit_value = profit_target_price
+            else:
+                continue
+
+            self.exit_details[position.data._name] = {
+                'time_exit_date': position.time_exit_date.strftime("%Y-%m-%d"),
+                'stop_loss_price': stop_loss_price,
+                'profit_target_price': profit_target_price,
+                'entry_price': entry_price,
+                'current_price': current_price,
+                'days_held': days_held,
+                'target_exit_days': self.config["exit_time_days"],
+                'atr_multiplier': self.config.get('atr_multiplier'),
+                'profit_target_percent': self.config.get('profit_target_percent'),
+                'exit_criterion': exit_criterion,
+                'exit_value': exit_value
+            }
+            # Close the position at the next bar's open
+            size = self.broker.sizes[i]
+            if size:
+                submitted.append(EngineOrder(position.data, -size, True, current_price, self.arrays['bar_index'][t, i]))
+
+    def stop(self):
+        if self.trades:
+            total_net_profit = sum(trade.pnlcomm for trade in self.trades)
+            print(f"Total Net Profit: ${total_net_profit:.2f}")
+            win_rate = len([t for t in self.trades if t.pnlcomm > 0]) / len(self.trades) * 100
+            print(f"Win Rate: {win_rate:.1f}%")
+
+
+def run_numpy_backtest(stock_dfs: dict, ranked_stocks: pd.DataFrame, config: dict) -> list:
+    """Runs the backtest on the NumPy engine; returns a one-element list like cerebro.run()."""
+    return [NumpyBacktest(stock_dfs, ranked_stocks, config).run()]
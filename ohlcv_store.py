@@ -0,0 +1,135 @@
+# ohlcv_store.py
+import os
+import json
+import argparse
+import numpy as np
+import pandas as pd
+from aligned_panel import AlignedPanel, validated_panel
+
+# --- Constants ---
+
+STORE_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+INDEX_FILE = "index.json"
+DATES_FILE = "dates.npy"
+
+
+def store_path_for(csv_path: str) -> str:
+    """Returns the default store directory for a historical CSV (data/historical_x.csv -> data/historical_x.store)."""
+    return os.path.splitext(csv_path)[0] + '.store'
+
+def csv_stamp(csv_path: str) -> dict:
+    """Size and modification time of the source CSV, recorded in index.json to detect a regenerated CSV."""
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def store_is_current(store_path: str, csv_path: str) -> bool:
+    """True when the store exists and was built from the CSV as it is now (or the CSV is gone)."""
+    index_path = os.path.join(store_path, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    with open(index_path) as f:
+        return json.load(f).get('source') == csv_stamp(csv_path)
+
+
+# --- Conversion ---
+
+def convert_csv_to_store(csv_path: str, store_path: str = None) -> str:
+    """Converts a long-format historical_data_*.csv (Date, Ticker, OHLCV) into a memory-mappable store.
+
+    Rows are grouped per ticker into contiguous float64 columns plus a datetime64 date column, and
+    index.json records each ticker's offset, length and first/last date, plus the CSV's size and mtime.
+    """
+    store_path = store_path or store_path_for(csv_path)
+    df = pd.read_csv(csv_path, parse_dates=['Date'], usecols=['Date', 'Ticker'] + STORE_FIELDS)
+    df = df.sort_values(['Ticker', 'Date'], kind='stable', ignore_index=True)
+
+    os.makedirs(store_path, exist_ok=True)
+    np.save(os.path.join(store_path, DATES_FILE), df['Date'].values.astype('datetime64[ns]'))
+    for field in STORE_FIELDS:
+        np.save(os.path.join(store_path, f"{field.lower()}.npy"), df[field].values.astype(np.float64))
+
+    tickers = df['Ticker'].values
+    starts = np.flatnonzero(np.r_[True, tickers[1:] != tickers[:-1]])
+    ends = np.r_[starts[1:], len(df)]
+    dates = df['Date']
+    index = {
+        str(tickers[start]): {
+            'offset': int(start),
+            'length': int(end - start),
+            'first_date': dates.iloc[start].strftime("%Y-%m-%d"),
+            'last_date': dates.iloc[end - 1].strftime("%Y-%m-%d")
+        }
+        for start, end in zip(starts, ends)
+    }
+    with open(os.path.join(store_path, INDEX_FILE), 'w') as f:
+        json.dump({'fields': STORE_FIELDS, 'tickers': index, 'source': csv_stamp(csv_path)}, f)
+
+    print(f"Converted {len(df)} rows for {len(index)} tickers into {store_path}")
+    return store_path
+
+
+# --- Reading ---
+
+class OHLCVStore:
+    """Read-only view of a converted store; columns are memory-mapped so only requested ranges are read."""
+
+    def __init__(self, store_path: str):
+        self.path = store_path
+        with open(os.path.join(store_path, INDEX_FILE)) as f:
+            meta = json.load(f)
+        self.index = meta['tickers']
+        self.fields = meta['fields']
+        self.dates = np.load(os.path.join(store_path, DATES_FILE), mmap_mode='r')
+        self.columns = {
+            field: np.load(os.path.join(store_path, f"{field.lower()}.npy"), mmap_mode='r')
+            for field in self.fields
+        }
+
+    @property
+    def tickers(self) -> list:
+        return list(self.index)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.index
+
+    def window(self, ticker: str, start=None, end=None) -> slice:
+        """Returns the row slice of `ticker` between start and end (inclusive), found by binary search."""
+        entry = self.index[ticker]
+        offset, length = entry['offset'], entry['length']
+        dates = self.dates[offset:offset + length]
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left'))
+        hi = length if end is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(end), 'ns'), side='right'))
+        return slice(offset + lo, offset + hi)
+
+    def arrays(self, ticker: str, start=None, end=None) -> dict:
+        """Returns zero-copy memory-mapped views of the ticker's dates and fields over the window."""
+        rows = self.window(ticker, start, end)
+        views = {'Date': self.dates[rows]}
+        views.update({field: column[rows] for field, column in self.columns.items()})
+        return views
+
+    def frame(self, ticker: str, start=None, end=None) -> pd.DataFrame:
+        """Returns the ticker's OHLCV window as a Date-indexed DataFrame."""
+        views = self.arrays(ticker, start, end)
+        return pd.DataFrame(
+            {field: np.asarray(views[field]) for field in self.fields},
+            index=pd.DatetimeIndex(np.asarray(views['Date']), name='Date')
+        )
+
+
+def load_data_from_store(symbols, config, store_path: str):
+    """Loads the symbols' date windows from an OHLCVStore into an AlignedPanel, mirroring load_data_from_csv's output."""
+    store = OHLCVStore(store_path)
+    return validated_panel(AlignedPanel.from_store(store, symbols, config["start_date"], config["end_date"]))
+
+
+# --- Main Execution ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a historical_data_*.csv file into a memory-mapped OHLCV store")
+    parser.add_argument("csv_path", help="Long-format CSV with Date, Ticker, Open, High, Low, Close, Volume columns")
+    parser.add_argument("--store", default=None, help="Output store directory (defaults to the CSV path with a .store suffix)")
+    args = parser.parse_args()
+    convert_csv_to_store(args.csv_path, args.store)
@@ -0,0 +1,174 @@
+# parameter_sweep.py
+import io
+import os
+import json
+import argparse
+import itertools
+import contextlib
+import numpy as np
+import pandas as pd
+import backtrader as bt
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
+from backtest import run_backtest
+from data_analysis import fetch_data
+from create_reports import collect_trades, calculate_metrics
+from numpy_engine import NumpyBacktest, prepare_market, MARKET_KEYS
+from screener_results import load_screener_results
+from indicator_cache import cache_from_config
+
+# --- Constants ---
+
+DEFAULT_GRID_PATH = "source/sweep_grid.json"
+DEFAULT_RESULTS_PATH = "reports/sweep_results.csv"
+MARKET_CACHE_SIZE = 4   # Prepared markets a worker keeps for combinations that change a market key
+
+
+# --- Grid ---
+
+def expand_values(spec) -> list:
+    """Expands one grid entry: a list, a single value, or a {"start", "stop", "step"} range including stop."""
+    if isinstance(spec, dict):
+        values = np.arange(spec['start'], spec['stop'] + spec['step'] / 2, spec['step'])
+        if all(isinstance(spec[key], int) for key in ('start', 'stop', 'step')):
+            return [int(value) for value in values]
+        return [round(float(value), 10) for value in values]
+    if isinstance(spec, list):
+        return spec
+    return [spec]
+
+def expand_grid(grid: dict) -> list:
+    """Returns every combination of the grid as a list of {parameter: value} dicts."""
+    names = list(grid)
+    values = [expand_values(grid[name]) for name in names]
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+def is_feasible(config: dict) -> bool:
+    """Cheap check that rejects combinations the strategy cannot trade sensibly, before any backtest runs."""
+    return (
+        config['atr_multiplier'] > 0
+        and config['profit_target_percent'] > 0
+        and config['exit_time_days'] >= 1
+        and config['active_positions_cap'] >= 1
+        and config['limit_order_percent'] > -100
+    )
+
+
+# --- Workers ---
+
+# Read-only inputs shared by every combination a process runs, set by init_worker
+_shared = {}
+
+def init_worker(stock_dfs: dict, ranked_stocks: pd.DataFrame, config: dict, market: dict = None):
+    """Pool initializer; with the default fork start method the data is inherited rather than copied."""
+    _shared['stock_dfs'] = stock_dfs
+    _shared['ranked_stocks'] = ranked_stocks
+    _shared['config'] = config
+    _shared['markets'] = {}
+    if market is not None:
+        _shared['markets'][tuple(config[key] for key in MARKET_KEYS)] = market
+
+def backtest_combination(params: dict, engine: str = 'numpy', max_drawdown: float = None) -> tuple:
+    """Backtests the shared data with `params` overriding the base config; returns (config, strategy)."""
+    config = dict(_shared['config'], engine=engine, **params)
+
+    if engine == 'numpy':
+        # Combinations that change a market key (e.g. atr_period) get their own market, built once per worker
+        key = tuple(config[name] for name in MARKET_KEYS)
+        if key not in _shared['markets']:
+            if len(_shared['markets']) >= MARKET_CACHE_SIZE:
+                del _shared['markets'][next(iter(_shared['markets']))]
+            _shared['markets'][key] = prepare_market(_shared['stock_dfs'], _shared['ranked_stocks'], config)
+        strategy = NumpyBacktest(None, None, config, market=_shared['markets'][key]).run(max_drawdown, verbose=False)
+    else:
+        with contextlib.redirect_stdout(io.StringIO()):
+            strategy = run_backtest(bt.Cerebro(), _shared['stock_dfs'], _shared['ranked_stocks'].copy(), config)[0]
+    return config, strategy
+
+def results_row(params: dict, config: dict, strategy, trades_df: pd.DataFrame) -> dict:
+    """Builds a results table row from a finished backtest."""
+    if trades_df.empty:
+        final_value = strategy.broker.getvalue()
+        metrics = {
+            "Final Portfolio Value": final_value,
+            "Total Portfolio P/L": final_value - config["capital"],
+            "Number of Trades": 0
+        }
+    else:
+        metrics = calculate_metrics(config, strategy, trades_df)
+        del metrics["Initial Capital"]
+    return {**params, "Rejected": getattr(strategy, 'rejected', False), **metrics}
+
+def run_combination(params: dict, engine: str = 'numpy', max_drawdown: float = None) -> dict:
+    """Backtests one parameter combination and returns its results row."""
+    config, strategy = backtest_combination(params, engine, max_drawdown)
+    return results_row(params, config, strategy, collect_trades(strategy))
+
+
+# --- Sweep ---
+
+def run_sweep(stock_dfs: dict, ranked_stocks: pd.DataFrame, config: dict, grid: dict, workers: int = 1,
+              engine: str = 'numpy', max_drawdown: float = None) -> pd.DataFrame:
+    """Backtests every feasible grid combination, on a process pool when workers > 1.
+
+    With the NumPy engine the aligned market arrays are built once and shared by all workers, and
+    `max_drawdown` stops a run early (flagged Rejected) once its value falls that far below its peak.
+    """
+    unknown = [name for name in grid if name not in config]
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {unknown}")
+
+    combinations = expand_grid(grid)
+    feasible = [params for params in combinations if is_feasible(dict(config, **params))]
+    print(f"Sweeping {len(feasible)} combinations ({len(combinations) - len(feasible)} skipped as infeasible) on {workers} worker(s)")
+
+    market = prepare_market(stock_dfs, ranked_stocks, config) if engine == 'numpy' else None
+    initargs = (stock_dfs, ranked_stocks, config, market)
+    rows = [None] * len(feasible)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs) as executor:
+            futures = {executor.submit(run_combination, params, engine, max_drawdown): i for i, params in enumerate(feasible)}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Sweeping"):
+                rows[futures[future]] = future.result()
+    else:
+        init_worker(*initargs)
+        for i, params in enumerate(tqdm(feasible, desc="Sweeping")):
+            rows[i] = run_combination(params, engine, max_drawdown)
+
+    results = pd.DataFrame(rows)
+    if results.empty:
+        return results
+    return results.sort_values("Total Portfolio P/L", ascending=False, kind='stable', ignore_index=True)
+
+
+# --- Main Execution ---
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Backtest a grid of strategy parameters in parallel")
+    parser.add_argument("--grid", default=DEFAULT_GRID_PATH, help="JSON file mapping config keys to value lists or {start, stop, step} ranges")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--engine", default="numpy", choices=["numpy", "backtrader"], help="Backtest engine for each combination")
+    parser.add_argument("--max-drawdown", type=float, default=None, help="Stop a run once value falls this fraction below its peak (NumPy engine only)")
+    parser.add_argument("--output", default=DEFAULT_RESULTS_PATH, help="CSV file for the results table")
+    args = parser.parse_args()
+
+    with open("source/config.json") as f:
+        config = json.load(f)
+    with open(args.grid) as f:
+        grid = json.load(f)
+
+    # Load the ranked stocks and price data once for every combination
+    ranked_stocks = load_screener_results("data/stocks_ranked.csv")
+    ranked_stocks['Date'] = pd.to_datetime(ranked_stocks['Date']).dt.date
+    symbols = ranked_stocks['Ticker'].unique().tolist()
+    stock_dfs = fetch_data(symbols, config)
+
+    results = run_sweep(stock_dfs, ranked_stocks, config, grid, workers=args.workers,
+                        engine=args.engine, max_drawdown=args.max_drawdown)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    results.to_csv(args.output, index=False)
+    print(f"\nSweep results saved to {args.output}")
+    print(results.head(10).to_string(index=False))
+    if cache_from_config(config) is not None:
+        cache_from_config(config).report("Indicator cache (main process)")
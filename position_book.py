@@ -0,0 +1,47 @@
+# position_book.py
+
+
+class OpenPosition:
+    """Entry state of one open short position."""
+    __slots__ = ('data', 'feed_index', 'entry_date', 'entry_price', 'size', 'time_exit_date', 'profit_target_price')
+
+    def __init__(self, data, feed_index, entry_date, entry_price, size, time_exit_date, profit_target_price):
+        self.data = data
+        self.feed_index = feed_index
+        self.entry_date = entry_date
+        self.entry_price = entry_price
+        self.size = size
+        self.time_exit_date = time_exit_date
+        self.profit_target_price = profit_target_price
+
+
+class PositionBook:
+    """Open positions keyed by feed name, maintained from the strategy's order and trade notifications.
+
+    Entry and exit checks walk only the open positions instead of every feed in the strategy.
+    """
+
+    def __init__(self, datas):
+        self.feed_index = {data._name: i for i, data in enumerate(datas)}
+        self.positions = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, name):
+        return name in self.positions
+
+    def get(self, name):
+        return self.positions.get(name)
+
+    def open(self, data, entry_date, entry_price, size, time_exit_date, profit_target_price):
+        self.positions[data._name] = OpenPosition(
+            data, self.feed_index[data._name], entry_date, entry_price, size, time_exit_date, profit_target_price
+        )
+
+    def close(self, name):
+        self.positions.pop(name, None)
+
+    def in_feed_order(self):
+        """Open positions ordered like the strategy's feeds, matching a scan over self.datas."""
+        return sorted(self.positions.values(), key=lambda position: position.feed_index)
@@ -0,0 +1,121 @@
+# position_recorder.py
+import numpy as np
+import pandas as pd
+import backtrader as bt
+
+# --- Constants ---
+
+DEFAULT_CHUNK_ROWS = 16384
+PRICE_FIELDS = ['Size', 'Entry Price', 'Mark Price', 'Stop Loss Price', 'Profit Target Price']
+
+
+# --- Buffers ---
+
+class PositionBuffers:
+    """Preallocated columns with one row per open position per bar, filled a fixed-size chunk at a time.
+
+    A full chunk is kept as is and a new one allocated, so nothing is copied while recording and a
+    row costs a few scalar stores. Tickers are stored as feed indices; P&L, distances and days held
+    are derived once per column in to_frame().
+    """
+
+    def __init__(self, tickers: list, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.tickers = list(tickers)
+        self.chunk_rows = max(int(chunk_rows), 1)
+        self.chunks = []
+        self._new_chunk()
+
+    def __len__(self):
+        return len(self.chunks) * self.chunk_rows + self.fill
+
+    def _new_chunk(self):
+        self.dates = np.empty(self.chunk_rows, dtype='datetime64[D]')
+        self.entry_dates = np.empty(self.chunk_rows, dtype='datetime64[D]')
+        self.codes = np.empty(self.chunk_rows, dtype=np.int32)
+        self.columns = {field: np.empty(self.chunk_rows, dtype=np.float64) for field in PRICE_FIELDS}
+        self.fill = 0
+
+    def _current(self) -> tuple:
+        return (self.dates[:self.fill], self.entry_dates[:self.fill], self.codes[:self.fill],
+                {field: column[:self.fill] for field, column in self.columns.items()})
+
+    def record(self, day, feed_index: int, entry_date, size: float, entry_price: float, mark_price: float,
+               stop_loss_price: float, profit_target_price: float):
+        """Appends one open position on one bar; dates are anything np.datetime64 accepts."""
+        if self.fill == self.chunk_rows:
+            self.chunks.append(self._current())
+            self._new_chunk()
+        i = self.fill
+        self.dates[i] = day
+        self.entry_dates[i] = entry_date
+        self.codes[i] = feed_index
+        self.columns['Size'][i] = size
+        self.columns['Entry Price'][i] = entry_price
+        self.columns['Mark Price'][i] = mark_price
+        self.columns['Stop Loss Price'][i] = stop_loss_price
+        self.columns['Profit Target Price'][i] = profit_target_price
+        self.fill += 1
+
+    def to_frame(self) -> pd.DataFrame:
+        """All recorded rows with unrealized P&L, distances to stop and target (% of mark) and days held."""
+        chunks = self.chunks + [self._current()]
+        dates = np.concatenate([chunk[0] for chunk in chunks])
+        entry_dates = np.concatenate([chunk[1] for chunk in chunks])
+        codes = np.concatenate([chunk[2] for chunk in chunks])
+        columns = {field: np.concatenate([chunk[3][field] for chunk in chunks]) for field in PRICE_FIELDS}
+
+        size, mark = columns['Size'], columns['Mark Price']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Shorts: the stop sits above the mark and the target below it, so both distances are positive while open
+            stop_distance = (columns['Stop Loss Price'] - mark) / mark * 100
+            target_distance = (mark - columns['Profit Target Price']) / mark * 100
+        return pd.DataFrame({
+            'Date': dates.astype('datetime64[ns]'),
+            'Ticker': pd.Categorical.from_codes(codes, categories=self.tickers),
+            'Entry Date': entry_dates.astype('datetime64[ns]'),
+            'Size': size,
+            'Entry Price': columns['Entry Price'],
+            'Mark Price': mark,
+            'Unrealized P/L': size * (mark - columns['Entry Price']),
+            'Stop Loss Price': columns['Stop Loss Price'],
+            'Stop Distance %': stop_distance,
+            'Profit Target Price': columns['Profit Target Price'],
+            'Target Distance %': target_distance,
+            'Days Held': (dates - entry_dates).astype(np.int64)
+        })
+
+
+# --- Analyzer ---
+
+class PositionRecorder(bt.Analyzer):
+    """Records every open position of the strategy's PositionBook into PositionBuffers on every bar.
+
+    The stop is the same ATR stop exit_logic checks, at the bar's ATR; each bar costs O(open positions).
+    """
+
+    def start(self):
+        self.buffers = PositionBuffers([data._name for data in self.strategy.datas])
+
+    def next(self):
+        strategy = self.strategy
+        day = strategy.datetime.date(0)
+        multiplier = strategy.config['atr_multiplier']
+        for position in strategy.book.positions.values():
+            data = position.data
+            self.buffers.record(day, position.feed_index, position.entry_date, strategy.getposition(data).size,
+                                position.entry_price, data.close[0],
+                                position.entry_price + multiplier * strategy.atrs[data._name][0],
+                                position.profit_target_price)
+
+    def get_analysis(self):
+        return self.buffers.to_frame()
+
+
+def positions_frame(strategy) -> pd.DataFrame:
+    """Recorded per-bar open positions of a finished backtest from either engine, or None if they were not recorded."""
+    if hasattr(strategy, 'position_recorder'):
+        return strategy.position_recorder.to_frame()
+    analyzers = getattr(strategy, 'analyzers', None)
+    if analyzers is not None and hasattr(analyzers, 'positions'):
+        return analyzers.positions.get_analysis()
+    return None
@@ -0,0 +1,140 @@
+# profiler.py
+import os
+import json
+import heapq
+import time
+import numpy as np
+
+# --- Constants ---
+
+SLOW_BAR_SAMPLES = 20   # Slowest bars kept with their date and open-position count
+HISTOGRAM_EDGES_MS = [0, 0.01, 0.03, 0.1, 0.3, 1, 3, 10, 30, 100, 300, 1000, float('inf')]
+
+
+class _NullPhase:
+    """Shared do-nothing context returned while profiling is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    """Times one entry into a named phase, nested under whichever phase is currently open."""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = self.profiler._stack
+        totals = self.profiler.totals
+        path = tuple(stack)
+        entry = totals.setdefault(path, [0.0, 0, 0.0])
+        entry[0] += elapsed
+        entry[1] += 1
+        stack.pop()
+        if stack:
+            totals.setdefault(tuple(stack), [0.0, 0, 0.0])[2] += elapsed
+        return False
+
+
+class Profiler:
+    """Wall-clock and call counts per phase, plus per-bar timings, for a single backtest run.
+
+    Phases nest by the order they are entered, so `backtest;next;entry_logic` is entry_logic
+    called from the strategy's next() during the backtest. While disabled, `phase()` returns a
+    shared no-op context and `bar()` returns immediately.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.totals = {}    # phase path -> [seconds, calls, seconds spent in child phases]
+        self._stack = []
+        self.bar_seconds = []
+        self.slow_bars = []
+        self._last_bar = None
+
+    def phase(self, name: str):
+        """Context manager timing one call of the named phase."""
+        return _Phase(self, name) if self.enabled else NULL_PHASE
+
+    def bar(self, current_date, open_positions: int):
+        """Marks the end of a bar; its time is the wall-clock since the previous bar ended."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._last_bar is not None:
+            seconds = now - self._last_bar
+            self.bar_seconds.append(seconds)
+            sample = (seconds, str(current_date), open_positions)
+            if len(self.slow_bars) < SLOW_BAR_SAMPLES:
+                heapq.heappush(self.slow_bars, sample)
+            elif seconds > self.slow_bars[0][0]:
+                heapq.heapreplace(self.slow_bars, sample)
+        self._last_bar = now
+
+    # --- Output ---
+
+    def summary(self) -> dict:
+        """Phase totals, per-bar statistics and the slowest bars as plain JSON-ready values."""
+        phases = [
+            {'phase': ';'.join(path), 'seconds': seconds, 'calls': calls, 'self_seconds': seconds - child_seconds}
+            for path, (seconds, calls, child_seconds) in sorted(self.totals.items())
+        ]
+        bar_ms = np.array(self.bar_seconds) * 1000
+        bars = {'count': len(bar_ms)}
+        if len(bar_ms):
+            counts, _ = np.histogram(bar_ms, bins=HISTOGRAM_EDGES_MS)
+            bars.update({
+                'total_seconds': float(bar_ms.sum() / 1000),
+                'mean_ms': float(bar_ms.mean()),
+                'p50_ms': float(np.percentile(bar_ms, 50)),
+                'p90_ms': float(np.percentile(bar_ms, 90)),
+                'p99_ms': float(np.percentile(bar_ms, 99)),
+                'max_ms': float(bar_ms.max()),
+                'histogram': {'edges_ms': HISTOGRAM_EDGES_MS[:-1] + ['inf'], 'counts': counts.tolist()}
+            })
+        slow_bars = [
+            {'date': current_date, 'ms': seconds * 1000, 'open_positions': open_positions}
+            for seconds, current_date, open_positions in sorted(self.slow_bars, reverse=True)
+        ]
+        return {'phases': phases, 'bars': bars, 'slow_bars': slow_bars}
+
+    def folded(self) -> str:
+        """Self time per phase stack in the collapsed format flamegraph.pl and speedscope read, in microseconds."""
+        lines = []
+        for path, (seconds, _, child_seconds) in sorted(self.totals.items()):
+            micros = int(round((seconds - child_seconds) * 1e6))
+            if micros > 0:
+                lines.append(f"{';'.join(path)} {micros}")
+        return '\n'.join(lines) + '\n'
+
+    def save(self, reports_dir: str, suffix: str) -> tuple:
+        """Writes profile_<suffix>.json and profile_<suffix>.folded; returns their paths."""
+        os.makedirs(reports_dir, exist_ok=True)
+        json_path = os.path.join(reports_dir, f"profile_{suffix}.json")
+        folded_path = os.path.join(reports_dir, f"profile_{suffix}.folded")
+        with open(json_path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        with open(folded_path, 'w') as f:
+            f.write(self.folded())
+        return json_path, folded_path
+
+
+# Process-wide profiler the backtest modules report into; backtest.py enables it on request
+PROFILER = Profiler()
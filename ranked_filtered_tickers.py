@@ -1,9 +1,24 @@
-import yfinance as yf
+import os
+import argparse
+import math
+import heapq
+import tempfile
 import pandas as pd
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 from tqdm import tqdm
-import talib
-import pandas as pd
+try:
+    import talib
+except ImportError:  # The vectorized screener falls back to the streaming kernels
+    talib = None
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from screener_results import ColumnarBuffer, CompactColumnarBuffer, CsvSink, SCREENER_SCHEMA, DEFAULT_BATCH_SIZE, make_sinks
+from streaming_indicators import ScreenerState, INDICATOR_NAMES, streaming_indicator_arrays
+from download_cache import DownloadCache
+from memory_budget import chunks_needed, report_peak_rss
+from aligned_panel import AlignedPanel
+from indicator_cache import IndicatorCache, data_version, DEFAULT_CACHE_DIR as INDICATOR_CACHE_DIR, DEFAULT_MAX_MB as INDICATOR_CACHE_MB
 
 # --- Indicator Calculation ---
 
@@ -52,30 +67,120 @@ def calculate_indicators(data: pd.DataFrame) -> dict:
     }
 
 
+# --- Whole-Series Indicator Calculation ---
+
+def rolling_nanmean(values: np.ndarray, period: int = 20) -> np.ndarray:
+    """Trailing mean over `period` rows ignoring NaNs, matching Series.tail(period).mean() at every row."""
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if len(values) < period:
+        return result
+    missing = np.isnan(values)
+    sums = sliding_window_view(np.where(missing, 0.0, values), period).sum(axis=1)
+    counts = sliding_window_view(~missing, period).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result[period - 1:] = np.where(counts > 0, sums / counts, np.nan)
+    return result
+
+def calculate_indicator_arrays(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                               ticker: str = None, cache: IndicatorCache = None, version: str = None) -> dict:
+    """Calculates all technical indicators once over a stock's full history, one value per bar.
+
+    With a cache, each indicator is read from it when `ticker`'s bars (identified by `version`)
+    were seen before, and computed and stored otherwise.
+    """
+    if talib is None:
+        return streaming_indicator_arrays(high, low, close, volume)
+
+    def indicator(name, params, compute):
+        if cache is None:
+            return compute()
+        return cache.get_or_compute(ticker, name, params, version, compute)
+
+    atr = indicator('talib_atr', (10,), lambda: talib.ATR(high, low, close, timeperiod=10))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        atr_pct = np.where(close != 0, (atr / close) * 100, 0)
+
+    higher_closes = np.zeros(len(close), dtype=bool)
+    if len(close) >= 3:
+        higher_closes[2:] = (close[1:-1] > close[:-2]) & (close[2:] > close[1:-1])
+
+    return {
+        'Avg Price': indicator('avg_price', (20,), lambda: rolling_nanmean(close, 20)),
+        'Avg Dollar Volume': indicator('avg_dollar_volume', (20,), lambda: rolling_nanmean(close * volume, 20)),
+        'ATR %': atr_pct,
+        '3-day RSI': indicator('talib_rsi', (3,), lambda: talib.RSI(close, timeperiod=3)),
+        'Higher Closes': higher_closes,
+        '7-day ADX': indicator('talib_adx', (7,), lambda: talib.ADX(high, low, close, timeperiod=7))
+    }
+
+def calculate_indicator_series(data: pd.DataFrame) -> pd.DataFrame:
+    """Calculates all technical indicators once over a stock's full history, one row per bar."""
+    indicators = calculate_indicator_arrays(data['High'].values, data['Low'].values,
+                                            data['Close'].values, data['Volume'].values)
+    return pd.DataFrame(indicators, index=data.index)
+
+def screen_ticker_arrays(index: pd.DatetimeIndex, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                         volume: np.ndarray, ticker: str, dates: pd.DatetimeIndex, cache: IndicatorCache = None) -> pd.DataFrame:
+    """Builds the screener rows for one ticker on every date, reading values from whole-series indicators."""
+    # Number of bars visible on each date, i.e. len(hist.loc[:date])
+    visible = index.searchsorted(dates + pd.Timedelta(days=1), side='left')
+    usable = visible >= 20
+    if not usable.any():
+        return pd.DataFrame(columns=SCREENER_COLUMNS)
+
+    positions = visible[usable] - 1
+    version = data_version(high, low, close, volume) if cache is not None else None
+    indicators = calculate_indicator_arrays(high, low, close, volume, ticker=ticker, cache=cache, version=version)
+    rows = pd.DataFrame({name: values[positions] for name, values in indicators.items()})
+    rows.insert(0, 'Ticker', ticker)
+    rows.insert(0, 'Date', dates[usable])
+    return add_filter_columns(rows)
+
+def screen_ticker_series(hist: pd.DataFrame, ticker: str, dates: pd.DatetimeIndex, cache: IndicatorCache = None) -> pd.DataFrame:
+    """Builds the screener rows for one ticker from its OHLCV DataFrame."""
+    return screen_ticker_arrays(hist.index, hist['High'].values, hist['Low'].values,
+                                hist['Close'].values, hist['Volume'].values, ticker, dates, cache=cache)
+
+
 # --- Constants ---
 DATE_FORMAT = "%Y-%m-%d"
 LOOKBACK_PERIOD = 50  # Lookback period for indicator calculations (in calendar days)
+SCREENER_COLUMNS = list(SCREENER_SCHEMA)
+CHECKPOINT_PATH = "data/screener_checkpoint.npz"
+ROW_BYTES = 200  # Approximate in-memory size of one screener row, including the object Ticker and index overhead
+DEFAULT_CHUNK_TICKERS = 250  # Tickers downloaded and screened together by the out-of-core screener
+SPILL_READ_ROWS = 100_000  # Rows read at a time from each spill file while merging
 
 
 
 # --- Data Fetching ---
 
-def download_stock_data(tickers: list, start_date: datetime, end_date: datetime) -> pd.DataFrame:
-    """Downloads historical stock data for all tickers, considering the lookback period."""
+def download_stock_data(tickers: list, start_date: datetime, end_date: datetime, cache: DownloadCache = None) -> AlignedPanel:
+    """Downloads historical stock data for all tickers, considering the lookback period.
+
+    Bars come from the on-disk DownloadCache, so only date ranges not fetched before hit the network,
+    and are aligned into one AlignedPanel the screening paths read views of.
+    """
     print("Downloading stock data...")
     
     # Calculate the actual start date for data download
     actual_start_date = start_date - timedelta(days=LOOKBACK_PERIOD)
     
     tickers = [str(ticker).strip().upper() for ticker in tickers if pd.notna(ticker)]
+    cache = cache or DownloadCache()
     try:
-        data = yf.download(tickers, start=actual_start_date, end=end_date, group_by='ticker')
+        data = AlignedPanel.from_frames(cache.get(tickers, actual_start_date, end_date))
         if data.empty:
             print("No data found from yfinance.")
         return data
     except Exception as e:
         print(f"Error downloading data: {e}")
-        return pd.DataFrame()
+        return AlignedPanel.from_frames({})
+
+def as_panel(data, tickers: list) -> AlignedPanel:
+    """The screener input as an AlignedPanel, converting a yfinance-style (ticker, field) frame once."""
+    return data if isinstance(data, AlignedPanel) else AlignedPanel.from_download(data, tickers)
 
 
 
@@ -99,22 +204,233 @@ def apply_entry_filters(row: pd.Series) -> bool:
 
 
 
-# --- Processing and Saving ---
+def add_filter_columns(rows: pd.DataFrame) -> pd.DataFrame:
+    """Adds the 'Pass Base' and 'Pass All' columns to a frame of indicator rows in one vectorized pass."""
+    rows['Pass Base'] = (
+        (rows['Avg Price'] >= 5.0) &
+        (rows['Avg Dollar Volume'] >= 25_000_000) &
+        (rows['ATR %'] >= 3.0)
+    )
+    rows['Pass All'] = rows['Pass Base'] & (rows['3-day RSI'] >= 90) & rows['Higher Closes']
+    return rows
+
 
-def process_stock_data(tickers: list, start_date: datetime, end_date: datetime, all_data_path: str, ranked_data_path: str, data: pd.DataFrame):
 
-    all_data_df = pd.DataFrame(columns=['Date', 'Ticker', 'Avg Price', 'Avg Dollar Volume', 'ATR %', '3-day RSI', 'Higher Closes', '7-day ADX', 'Pass Base', 'Pass All'])
-    ranked_data_df = pd.DataFrame(columns=['Date', 'Ticker', 'Avg Price', 'Avg Dollar Volume', 'ATR %', '3-day RSI', 'Higher Closes', '7-day ADX', 'Pass Base', 'Pass All'])
+# --- Processing and Saving ---
+
+def process_stock_data_vectorized(tickers: list, start_date: datetime, end_date: datetime, data: AlignedPanel,
+                                  all_buffer: ColumnarBuffer, ranked_buffer: ColumnarBuffer, cache: IndicatorCache = None):
+    """Screens every ticker with indicators computed once per ticker, appending rows to the result buffers."""
+    dates = pd.date_range(start=start_date, end=end_date)
+    index = data.index
+    frames = []
+
+    for ticker in tqdm(panel_tickers(tickers, data), desc="Processing Tickers"):
+        try:
+            # Indicators read the panel's contiguous per-ticker series directly
+            high, low, close, volume = (data.series(ticker, field) for field in PANEL_FIELDS)
+            rows = screen_ticker_arrays(index, high, low, close, volume, ticker, dates, cache=cache)
+            if not rows.empty:
+                frames.append(rows)
+        except Exception as e:
+            print(f"Error processing {ticker}: {e}")
+
+    if not frames:
+        return
+
+    # Tickers were appended in order, so a stable sort on Date restores the date-major row order
+    rows = pd.concat(frames, ignore_index=True).sort_values('Date', kind='stable', ignore_index=True)
+    all_buffer.extend(rows)
+    ranked_buffer.extend(rows[rows['Pass All'].values])
+
+# --- Parallel Screening ---
+
+PANEL_FIELDS = ['High', 'Low', 'Close', 'Volume']
+
+def panel_tickers(tickers: list, data: AlignedPanel) -> list:
+    """Returns the tickers that have bars in the downloaded data, reporting the rest."""
+    present = []
+    for ticker in tickers:
+        if ticker in data:
+            present.append(ticker)
+        else:
+            print(f"Error processing {ticker}: no data downloaded")
+    return present
+
+def write_price_panel(tickers: list, data: AlignedPanel, path: str) -> list:
+    """Writes the tickers' OHLCV columns to a (field, ticker, bar) float64 .npy file, returning the tickers written."""
+    present = panel_tickers(tickers, data)
+    panel = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64,
+                                      shape=(len(PANEL_FIELDS), len(present), len(data.dates)))
+    panel[:] = data.stack(PANEL_FIELDS, present)
+    panel.flush()
+    del panel
+    return present
+
+def screen_panel_shard(panel_path: str, index_values: np.ndarray, shard: list, start_date: datetime, end_date: datetime,
+                       cache_settings: tuple = None) -> tuple:
+    """Worker entry point: screens a shard of (panel row, ticker) pairs read from the memory-mapped panel.
+
+    `cache_settings` is the (directory, size in MB) of an indicator cache to open in the worker.
+    Returns the rows and the worker cache's (hits, misses).
+    """
+    cache = IndicatorCache(*cache_settings) if cache_settings else None
+    panel = np.load(panel_path, mmap_mode='r')
+    index = pd.DatetimeIndex(index_values)
+    dates = pd.date_range(start=start_date, end=end_date)
+    frames = []
+    for row, ticker in shard:
+        try:
+            high, low, close, volume = (np.ascontiguousarray(panel[f, row]) for f in range(len(PANEL_FIELDS)))
+            rows = screen_ticker_arrays(index, high, low, close, volume, ticker, dates, cache=cache)
+            if not rows.empty:
+                frames.append(rows)
+        except Exception as e:
+            print(f"Error processing {ticker}: {e}")
+    del panel
+    rows = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=SCREENER_COLUMNS)
+    return rows, (cache.hits, cache.misses) if cache is not None else (0, 0)
+
+def process_stock_data_parallel(tickers: list, start_date: datetime, end_date: datetime, data: AlignedPanel,
+                                all_buffer: ColumnarBuffer, ranked_buffer: ColumnarBuffer, workers: int,
+                                cache: IndicatorCache = None):
+    """Screens ticker shards on a process pool, sharing the OHLCV panel through a memory-mapped file."""
+    with tempfile.TemporaryDirectory(prefix="screener_panel_") as tmp_dir:
+        panel_path = os.path.join(tmp_dir, "panel.npy")
+        present = write_price_panel(tickers, data, panel_path)
+        index_values = data.dates
+
+        # A few shards per worker keeps the pool busy when tickers have uneven history lengths
+        shard_count = max(1, min(len(present), workers * 4))
+        pairs = list(enumerate(present))
+        shards = [pairs[i::shard_count] for i in range(shard_count)]
+
+        # Workers open the same cache directory and their hit counts are added to the parent's
+        cache_settings = (cache.cache_dir, cache.max_bytes / 2**20) if cache is not None else None
+        results = [None] * shard_count
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(screen_panel_shard, panel_path, index_values, shard, start_date, end_date, cache_settings): i
+                for i, shard in enumerate(shards)
+            }
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Processing Shards"):
+                results[futures[future]], (hits, misses) = future.result()
+                if cache is not None:
+                    cache.hits += hits
+                    cache.misses += misses
+
+    frames = [frame for frame in results if frame is not None and not frame.empty]
+    if not frames:
+        return
+
+    # Restore ticker order before the stable Date sort so rows match the single-process output
+    rows = pd.concat(frames, ignore_index=True)
+    ticker_order = pd.Categorical(rows['Ticker'], categories=present, ordered=True)
+    rows = rows.iloc[np.lexsort((ticker_order.codes, rows['Date'].values))].reset_index(drop=True)
+    all_buffer.extend(rows)
+    ranked_buffer.extend(rows[rows['Pass All'].values])
+
+# --- Incremental Screening ---
+
+def load_checkpoint_date(checkpoint_path: str):
+    """Returns the last screened date stored in a checkpoint, or None when there is no checkpoint."""
+    if not os.path.exists(checkpoint_path):
+        return None
+    _, metadata = ScreenerState.load(checkpoint_path)
+    return pd.Timestamp(metadata['last_date']).to_pydatetime()
+
+def process_stock_data_incremental(tickers: list, start_date: datetime, end_date: datetime, all_data_path: str, ranked_data_path: str,
+                                   data, checkpoint_path: str = CHECKPOINT_PATH, output_format: str = 'csv',
+                                   chunk_days: int = 30):
+    """Screens only the dates after the checkpoint, appending the new rows to the existing outputs.
+
+    Indicators are advanced bar by bar from the persisted ScreenerState, so bars already folded into
+    the checkpoint are never recomputed. Without a checkpoint the state is warmed on the bars before
+    `start_date` and outputs start fresh. The checkpoint is rewritten after every `chunk_days` dates,
+    so an interrupted run resumes from the last completed chunk. Tickers new to the checkpoint are
+    warmed on their whole download but only emit rows from the resume date on.
+    """
+    data = as_panel(data, tickers)
+    present = panel_tickers(tickers, data)
+    panel = data.stack(PANEL_FIELDS, present)
+
+    resuming = os.path.exists(checkpoint_path)
+    if resuming:
+        state, metadata = ScreenerState.load(checkpoint_path)
+        state.add_tickers(present)
+        first_date = pd.Timestamp(metadata['last_date']) + pd.Timedelta(days=1)
+    else:
+        state = ScreenerState(present)
+        first_date = pd.Timestamp(start_date)
+
+    dates = pd.date_range(start=first_date, end=end_date)
+    if dates.empty:
+        print(f"Screener is already up to date through {first_date - pd.Timedelta(days=1):%Y-%m-%d}")
+        return
+
+    rows = state.rows_for(present)
+    ticker_names = np.array(present, dtype=object)
+    bar_times = data.dates
+    next_bar = 0
+
+    def advance_until(limit: pd.Timestamp):
+        """Feeds every bar before `limit` to the tickers that have not seen it yet."""
+        nonlocal next_bar
+        while next_bar < len(bar_times) and bar_times[next_bar] < limit.to_datetime64():
+            last_bar = state.state['last_bar'][rows]
+            fresh = np.isnat(last_bar) | (last_bar < bar_times[next_bar])
+            if fresh.any():
+                high, low, close, volume = panel[:, fresh, next_bar]
+                state.update(high, low, close, volume, timestamp=bar_times[next_bar], rows=rows[fresh])
+            next_bar += 1
+
+    all_sinks = make_sinks(all_data_path, output_format, append=resuming)
+    ranked_sinks = make_sinks(ranked_data_path, output_format, append=resuming)
+
+    advance_until(dates[0])
+    for chunk_start in tqdm(range(0, len(dates), chunk_days), desc="Processing Date Chunks"):
+        chunk_dates = dates[chunk_start:chunk_start + chunk_days]
+        frames = []
+        for current_date in chunk_dates:
+            advance_until(current_date + pd.Timedelta(days=1))
+            eligible = state.state['bars'][rows] >= 20
+            if not eligible.any():
+                continue
+            frame = pd.DataFrame({'Date': current_date, 'Ticker': ticker_names[eligible]})
+            for name in INDICATOR_NAMES:
+                frame[name] = state.values[name][rows][eligible]
+            frames.append(add_filter_columns(frame))
+
+        if frames:
+            chunk_rows = pd.concat(frames, ignore_index=True)
+            ranked_rows = rank_candidates(chunk_rows[chunk_rows['Pass All'].values].reset_index(drop=True))
+            for sink in all_sinks:
+                sink.write(chunk_rows)
+            if not ranked_rows.empty:
+                for sink in ranked_sinks:
+                    sink.write(ranked_rows)
+
+        # Outputs for the chunk are on disk, so it is safe to move the resume point past it
+        state.save(checkpoint_path, last_date=chunk_dates[-1].to_datetime64())
+
+    for sink in all_sinks + ranked_sinks:
+        sink.close()
+
+    print(f"Screened {dates[0]:%Y-%m-%d} to {dates[-1]:%Y-%m-%d}; checkpoint saved to {checkpoint_path}")
+    print(f"All data appended to {all_data_path} ({output_format})")
+    print(f"Ranked data appended to {ranked_data_path} ({output_format})")
+
+def process_stock_data_by_date(tickers: list, start_date: datetime, end_date: datetime, data: AlignedPanel,
+                               all_buffer: ColumnarBuffer, ranked_buffer: ColumnarBuffer):
+    """Screens every ticker by recomputing indicators on each date's history, appending rows to the result buffers."""
+    histories = {ticker: data.frame(ticker, all_dates=True) for ticker in panel_tickers(tickers, data)}
 
     for current_date in tqdm(pd.date_range(start=start_date, end=end_date), desc="Processing Dates"):
         current_date_str = current_date.strftime(DATE_FORMAT)
 
         for ticker in tickers:
             try:
-                if len(tickers) == 1:
-                    hist = data.loc[:current_date_str]
-                else:
-                    hist = data[ticker].loc[:current_date_str]
+                hist = histories[ticker].loc[:current_date_str]
 
                 # Check for sufficient data, considering the lookback period
                 if len(hist) < 20:  # 20 is the minimum for some indicators
@@ -126,49 +442,257 @@ def process_stock_data(tickers: list, start_date: datetime, end_date: datetime,
                     continue
 
                 row = {
-                    'Date': current_date_str,
+                    'Date': current_date,
                     'Ticker': ticker,
                     **indicators
                 }
-                row_df = pd.DataFrame([row])
-                row_df['Pass Base'] = row_df.apply(apply_base_filters, axis=1)
-                row_df['Pass All'] = row_df.apply(apply_entry_filters, axis=1)
+                row['Pass Base'] = apply_base_filters(row)
+                row['Pass All'] = apply_entry_filters(row)
 
-                all_data_df = pd.concat([all_data_df, row_df], ignore_index=True)
+                all_buffer.append(row)
 
-                if row_df['Pass All'].iloc[0]:
-                    ranked_data_df = pd.concat([ranked_data_df, row_df], ignore_index=True)
+                if row['Pass All']:
+                    ranked_buffer.append(row)
 
             except Exception as e:
                 print(f"Error processing {ticker} on {current_date_str}: {e}")
 
-    if not ranked_data_df.empty:
-        ranked_data_df = ranked_data_df.groupby('Date').apply(
-            lambda x: x.nlargest(10, '7-day ADX')
-        ).reset_index(drop=True)
-
-    all_data_df.to_csv(all_data_path, index=False)
-    ranked_data_df.to_csv(ranked_data_path, index=False)
-
-    print(f"All data saved to {all_data_path}")
-    print(f"Ranked data saved to {ranked_data_path}")
+def rank_candidates(ranked_data_df: pd.DataFrame) -> pd.DataFrame:
+    """Keeps the top 10 candidates by 7-day ADX on each date."""
+    if ranked_data_df.empty:
+        return ranked_data_df
+    # A stable sort keeps nlargest's tie order, and unlike groupby().apply it keeps the Date column on pandas 2.2+
+    ordered = ranked_data_df.dropna(subset=['7-day ADX']).sort_values(['Date', '7-day ADX'], ascending=[True, False], kind='stable')
+    return ordered.groupby('Date', observed=True).head(10).reset_index(drop=True)
+
+def process_stock_data(tickers: list, start_date: datetime, end_date: datetime, all_data_path: str, ranked_data_path: str, data,
+                       vectorized: bool = False, output_format: str = 'csv', batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1,
+                       memory_budget_mb: float = None, cache: IndicatorCache = None):
+
+    # Every path reads views of one aligned panel; a yfinance-style frame is converted once here
+    data = as_panel(data, tickers)
+
+    # All rows stream out to disk in batches; passing rows stay in memory, compacted, for the daily ranking
+    all_buffer = ColumnarBuffer(SCREENER_SCHEMA, sinks=make_sinks(all_data_path, output_format), batch_size=batch_size)
+    ranked_buffer = CompactColumnarBuffer(batch_size=batch_size)
+    screen_period(tickers, start_date, end_date, data, all_buffer, ranked_buffer, vectorized=vectorized, workers=workers,
+                  memory_budget_mb=memory_budget_mb, cache=cache)
+
+    all_buffer.close()
+    ranked_data_df = rank_candidates(ranked_buffer.to_frame())
+
+    ranked_sinks = make_sinks(ranked_data_path, output_format)
+    for sink in ranked_sinks:
+        sink.write(ranked_data_df)
+        sink.close()
+
+    print(f"All data saved to {all_data_path} ({output_format})")
+    print(f"Ranked data saved to {ranked_data_path} ({output_format})")
+
+def screen_period(tickers: list, start_date: datetime, end_date: datetime, data: AlignedPanel, all_buffer: ColumnarBuffer,
+                  ranked_buffer: ColumnarBuffer, vectorized: bool = False, workers: int = 1, memory_budget_mb: float = None,
+                  cache: IndicatorCache = None):
+    """Screens the tickers over the period on the chosen path, appending all rows and passing rows to the buffers."""
+    if workers > 1 or vectorized:
+        # These paths hold a whole period's rows at once, so the tickers are split when they would exceed the budget
+        period_days = (end_date - start_date).days + 1
+        chunk_count = chunks_needed(len(tickers) * period_days * ROW_BYTES, memory_budget_mb)
+        if chunk_count > 1:
+            print(f"Screening in {chunk_count} ticker chunks to stay within {memory_budget_mb} MB")
+            screen_ticker_chunks(tickers, start_date, end_date, data, all_buffer, ranked_buffer, chunk_count,
+                                 workers=workers, cache=cache)
+        elif workers > 1:
+            process_stock_data_parallel(tickers, start_date, end_date, data, all_buffer, ranked_buffer, workers, cache=cache)
+        else:
+            process_stock_data_vectorized(tickers, start_date, end_date, data, all_buffer, ranked_buffer, cache=cache)
+    else:
+        process_stock_data_by_date(tickers, start_date, end_date, data, all_buffer, ranked_buffer)
+
+# --- Out-of-Core Screening ---
+
+def ticker_chunks(tickers: list, chunk_size: int) -> list:
+    return [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+
+def spill_groups(path: str, read_rows: int = SPILL_READ_ROWS):
+    """Yields (date, rows) for each date of a date-sorted spill CSV, reading `read_rows` rows at a time."""
+    pending = None
+    for chunk in pd.read_csv(path, parse_dates=['Date'], chunksize=read_rows):
+        if chunk.empty:
+            continue
+        if pending is not None:
+            chunk = pd.concat([pending, chunk], ignore_index=True)
+        # The last date may continue in the next read, so it is held back
+        complete = chunk['Date'].values != chunk['Date'].values[-1]
+        for current_date, rows in chunk[complete].groupby('Date', sort=False):
+            yield current_date, rows
+        pending = chunk[~complete]
+    if pending is not None:
+        for current_date, rows in pending.groupby('Date', sort=False):
+            yield current_date, rows
+
+def merged_dates(spill_paths: list):
+    """K-way merges date-sorted spill files, yielding each date's rows from all spills as one frame.
+
+    Only one date's rows from each spill are held at a time. Rows of a date keep the order of the
+    spill files, i.e. the ticker chunk order, so the output matches a single in-memory pass.
+    """
+    merged = heapq.merge(*(spill_groups(path) for path in spill_paths), key=lambda group: group[0])
+    current_date, frames = None, []
+    for group_date, rows in merged:
+        if frames and group_date != current_date:
+            yield pd.concat(frames, ignore_index=True)
+            frames = []
+        current_date = group_date
+        frames.append(rows)
+    if frames:
+        yield pd.concat(frames, ignore_index=True)
+
+def merge_spills(spill_paths: list, sinks: list, rank: bool = False, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Merges date-sorted spill files by date into the sinks, optionally ranking each date's rows."""
+    buffer = ColumnarBuffer(SCREENER_SCHEMA, sinks=sinks, batch_size=batch_size)
+    for rows in merged_dates(spill_paths):
+        buffer.extend(rank_candidates(rows) if rank else rows)
+    buffer.close()
+    return len(buffer)
+
+def screen_ticker_chunks(tickers: list, start_date: datetime, end_date: datetime, data: AlignedPanel, all_buffer: ColumnarBuffer,
+                         ranked_buffer: ColumnarBuffer, chunk_count: int, workers: int = 1, cache: IndicatorCache = None,
+                         spill_dir: str = None):
+    """Screens the tickers of an in-memory panel in `chunk_count` ticker chunks over the whole period.
+
+    Each ticker's indicators are computed once and only one chunk's rows are held at a time: they are
+    spilled to a date-sorted file and released, and the spills are merged by date into the buffers.
+    """
+    chunk_size = math.ceil(len(tickers) / chunk_count)
+    with tempfile.TemporaryDirectory(prefix="screener_spill_", dir=spill_dir) as tmp_dir:
+        spills = []
+        for i, chunk in enumerate(ticker_chunks(tickers, chunk_size)):
+            spill = os.path.join(tmp_dir, f"all_{i:05d}.csv")
+            spill_buffer = ColumnarBuffer(SCREENER_SCHEMA, sinks=[CsvSink(spill, SCREENER_COLUMNS)])
+            # Passing rows are taken from the merged spills, so the chunk's own copy is dropped
+            passing = ColumnarBuffer(SCREENER_SCHEMA)
+            if workers > 1:
+                process_stock_data_parallel(chunk, start_date, end_date, data, spill_buffer, passing, workers, cache=cache)
+            else:
+                process_stock_data_vectorized(chunk, start_date, end_date, data, spill_buffer, passing, cache=cache)
+            spill_buffer.close()
+            if len(spill_buffer):
+                spills.append(spill)
+            del spill_buffer, passing
+
+        for rows in merged_dates(spills):
+            all_buffer.extend(rows)
+            ranked_buffer.extend(rows[rows['Pass All'].values])
+
+def process_stock_data_chunked(tickers: list, start_date: datetime, end_date: datetime, all_data_path: str, ranked_data_path: str,
+                               chunk_size: int = DEFAULT_CHUNK_TICKERS, output_format: str = 'csv', batch_size: int = DEFAULT_BATCH_SIZE,
+                               workers: int = 1, memory_budget_mb: float = None, cache: IndicatorCache = None,
+                               download_cache: DownloadCache = None, spill_dir: str = None):
+    """Screens the universe `chunk_size` tickers at a time, so peak memory follows the chunk rather than the universe.
+
+    Each chunk is downloaded, screened and written to date-sorted spill files (all rows, and the
+    chunk's own top candidates per date), then released. The global top-N per date is always among
+    the chunks' top-N, so a final external merge of the spills by date produces the same outputs
+    as screening every ticker at once.
+    """
+    with tempfile.TemporaryDirectory(prefix="screener_spill_", dir=spill_dir) as tmp_dir:
+        all_spills, ranked_spills = [], []
+        for i, chunk in enumerate(ticker_chunks(tickers, chunk_size)):
+            print(f"\nTicker chunk {i + 1}: {chunk[0]} to {chunk[-1]} ({len(chunk)} tickers)")
+            chunk = [str(ticker).strip().upper() for ticker in chunk if pd.notna(ticker)]
+            data = download_stock_data(chunk, start_date, end_date, cache=download_cache)
+            if data.empty:
+                continue
+
+            all_spill = os.path.join(tmp_dir, f"all_{i:05d}.csv")
+            ranked_spill = os.path.join(tmp_dir, f"ranked_{i:05d}.csv")
+            all_buffer = ColumnarBuffer(SCREENER_SCHEMA, sinks=[CsvSink(all_spill, SCREENER_COLUMNS)], batch_size=batch_size)
+            ranked_buffer = CompactColumnarBuffer(batch_size=batch_size)
+            screen_period(chunk, start_date, end_date, data, all_buffer, ranked_buffer, vectorized=True,
+                          workers=workers, memory_budget_mb=memory_budget_mb, cache=cache)
+            all_buffer.close()
+            rank_candidates(ranked_buffer.to_frame()).to_csv(ranked_spill, index=False)
+            all_spills.append(all_spill)
+            ranked_spills.append(ranked_spill)
+            del data, all_buffer, ranked_buffer
+
+        print("\nMerging ticker chunks by date...")
+        all_rows = merge_spills(all_spills, make_sinks(all_data_path, output_format), batch_size=batch_size)
+        ranked_rows = merge_spills(ranked_spills, make_sinks(ranked_data_path, output_format), rank=True, batch_size=batch_size)
+
+    print(f"All data saved to {all_data_path} ({output_format}, {all_rows} rows)")
+    print(f"Ranked data saved to {ranked_data_path} ({output_format}, {ranked_rows} rows)")
 
 
 
 # --- Main Execution ---
 
 if __name__ == "__main__" : 
+
+    parser = argparse.ArgumentParser(description="Screen and ADX-rank stocks for the Short RSI strategy")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes to shard tickers across")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only screen dates after the saved checkpoint and append to the outputs; without --end-date "
+                             "the run downloads up to today (UTC) and screens through the last bar date it got")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH, help="Checkpoint file used by --incremental")
+    parser.add_argument("--end-date", default=None,
+                        help="Last date to screen, YYYY-MM-DD (defaults to the last bar date with --incremental, else 2025-01-01)")
+    parser.add_argument("--offline", action="store_true", help="Only use cached downloads, never touch the network")
+    parser.add_argument("--indicator-cache", nargs='?', const=INDICATOR_CACHE_DIR, default=None,
+                        help="Reuse indicators computed by earlier runs from this cache directory")
+    parser.add_argument("--indicator-cache-mb", type=float, default=INDICATOR_CACHE_MB, help="Size cap of the indicator cache")
+    parser.add_argument("--memory-budget-mb", type=float, default=None, help="Screen in ticker chunks when the results would exceed this many MB")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Screen the whole ticker list this many tickers at a time, merging the results on disk")
+    args = parser.parse_args()
     
-    # Example usage
-    tickers = pd.read_csv("source/tickers.csv")["Ticker"].head(100).tolist()
+    # Example usage; chunked runs can take the full universe since only one chunk is held in memory
+    tickers = pd.read_csv("source/tickers.csv")["Ticker"]
+    tickers = tickers.tolist() if args.chunk_size else tickers.head(100).tolist()
     start_date = datetime(2020, 1, 1)
-    end_date = datetime(2025, 1, 1)
+    # Incremental runs without --end-date take everything published so far and end on the last bar date, so the
+    # checkpoint never moves past a date whose bars are not out yet
+    if args.end_date:
+        end_date = datetime.strptime(args.end_date, "%Y-%m-%d")
+    elif args.incremental:
+        end_date = None
+    else:
+        end_date = datetime(2025, 1, 1)
+    # Downloads cover [start, end), so the open-ended request runs through today's date in UTC
+    download_end = end_date or datetime.now(timezone.utc) + timedelta(days=1)
     all_data_path = "data/all_stocks_data_final_1.csv"
     ranked_data_path = "data/ranked_stocks_final_1.csv"
 
-    # Download data with lookback period
-    all_data = download_stock_data(tickers, start_date, end_date)
-
-    if not all_data.empty:
+    # Incremental runs only need history from the last checkpointed date onwards
+    download_start = start_date
+    if args.incremental:
+        download_start = load_checkpoint_date(args.checkpoint) or start_date
+
+    indicator_cache = IndicatorCache(args.indicator_cache, args.indicator_cache_mb) if args.indicator_cache else None
+
+    download_cache = DownloadCache(offline=args.offline)
+    if args.chunk_size and not args.incremental:
+        # Each chunk is downloaded, screened and released before the next
+        process_stock_data_chunked(tickers, start_date, end_date, all_data_path, ranked_data_path, chunk_size=args.chunk_size,
+                                   output_format='both', workers=args.workers, memory_budget_mb=args.memory_budget_mb,
+                                   cache=indicator_cache, download_cache=download_cache)
+        all_data = None
+    else:
+        # Download data with lookback period
+        all_data = download_stock_data(tickers, download_start, download_end, cache=download_cache)
+        if end_date is None and not all_data.empty:
+            end_date = pd.Timestamp(all_data.dates[-1]).to_pydatetime()
+
+    if all_data is not None and not all_data.empty:
         # Process the downloaded data
-        process_stock_data(tickers, start_date, end_date, all_data_path, ranked_data_path, all_data)
\ No newline at end of file
+        if args.incremental:
+            process_stock_data_incremental(tickers, start_date, end_date, all_data_path, ranked_data_path, all_data,
+                                           checkpoint_path=args.checkpoint, output_format='both')
+        else:
+            process_stock_data(tickers, start_date, end_date, all_data_path, ranked_data_path, all_data,
+                               vectorized=True, output_format='both', workers=args.workers,
+                               memory_budget_mb=args.memory_budget_mb, cache=indicator_cache)
+
+    if indicator_cache is not None:
+        indicator_cache.report()
+    report_peak_rss("Screener")
@@ -0,0 +1,231 @@
+# results_store.py
+import os
+import json
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime
+import pandas as pd
+from position_recorder import PositionBuffers
+from ohlcv_store import store_path_for
+from screener_results import parquet_path_for
+from download_cache import DEFAULT_CACHE_DIR, COVERAGE_FILE
+
+# --- Constants ---
+
+DEFAULT_STORE_PATH = "data/results_store.sqlite"
+RANKED_PATH = "data/stocks_ranked.csv"
+DEFAULT_CSV_PATH = 'data/historical_data_2020-01-01_2025-01-01.csv'
+# Modules whose source decides what a backtest trades and reports
+CODE_MODULES = [
+    'backtest.py', 'strategy.py', 'entry_conditions.py', 'exit_conditions.py', 'position_book.py',
+    'numpy_engine.py', 'dynamic_universe.py', 'array_feed.py', 'aligned_panel.py', 'data_analysis.py',
+    'equity_recorder.py', 'position_recorder.py', 'create_reports.py'
+]
+# Config keys that change how a run is executed or profiled, never its trades or metrics
+NON_RESULT_KEYS = {
+    'profile', 'pyfolio_analyzer', 'memory_budget_mb', 'array_feeds', 'indicator_cache', 'indicator_cache_dir',
+    'indicator_cache_mb', 'offline', 'results_store', 'results_store_path'
+}
+HASH_BLOCK = 1 << 20
+
+
+# --- Run Keys ---
+
+def _digest(*parts) -> str:
+    return hashlib.blake2b('\x1f'.join(parts).encode(), digest_size=16).hexdigest()
+
+def _file_hash(path: str) -> str:
+    """Content hash of a file, or of every file under a directory (a Parquet dataset)."""
+    hasher = hashlib.blake2b(digest_size=16)
+    paths = [path] if os.path.isfile(path) else sorted(
+        os.path.join(root, name) for root, _, names in os.walk(path) for name in names
+    )
+    for file_path in paths:
+        hasher.update(os.path.relpath(file_path, path).encode())
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b''):
+                hasher.update(block)
+    return hasher.hexdigest()
+
+def _file_stamp(path: str) -> str:
+    """Size and mtime of a file, or of every file under a directory; cheap enough for multi-GB price data."""
+    paths = [path] if os.path.isfile(path) else sorted(
+        os.path.join(root, name) for root, _, names in os.walk(path) for name in names
+    )
+    return ';'.join(f"{os.path.relpath(p, path)}:{os.stat(p).st_size}:{os.stat(p).st_mtime_ns}" for p in paths)
+
+def result_config(config: dict) -> dict:
+    """The config without the keys that cannot change a run's results."""
+    return {key: value for key, value in config.items() if key not in NON_RESULT_KEYS}
+
+def code_version(modules: list = CODE_MODULES) -> str:
+    """Hash of the strategy and engine sources, so editing any of them invalidates stored runs."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    return _digest(*(_file_hash(os.path.join(here, module)) for module in modules))
+
+def data_version(config: dict, ranked_path: str = RANKED_PATH):
+    """Version of the run's inputs: the ranked stocks by content, the price data by size and mtime.
+
+    The download cache is versioned by the content of its coverage file, which fetch_data rewrites on
+    every run even when nothing new was fetched. Returns None when prices are downloaded without the
+    cache, as nothing on disk pins them.
+    """
+    parquet_path = parquet_path_for(ranked_path)
+    ranked = _file_hash(parquet_path if os.path.exists(parquet_path) else ranked_path)
+    if config.get('use_csv_data', False):
+        csv_path = config.get('csv_data_path', DEFAULT_CSV_PATH)
+        store_path = config.get('ohlcv_store_path', store_path_for(csv_path))
+        prices = _file_stamp(store_path if os.path.isdir(store_path) else csv_path)
+    elif config.get('use_download_cache', True):
+        coverage_path = os.path.join(config.get('download_cache_dir', DEFAULT_CACHE_DIR), COVERAGE_FILE)
+        prices = _file_hash(coverage_path) if os.path.exists(coverage_path) else ''
+    else:
+        return None
+    return _digest(ranked, prices)
+
+def run_key(config: dict, ranked_path: str = RANKED_PATH):
+    """Key of a run: hash of its result config, code version and data version (None if not reproducible)."""
+    data = data_version(config, ranked_path)
+    if data is None:
+        return None
+    return _digest(json.dumps(result_config(config), sort_keys=True), code_version(), data)
+
+
+# --- Store ---
+
+class ResultsStore:
+    """SQLite store of finished runs: one row per run in `runs`, plus its metrics, trades, daily equity and
+    per-bar open positions.
+
+    The config is kept as JSON, so runs can also be queried in SQL with json_extract(config, '$.key').
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                key TEXT PRIMARY KEY, created_at TEXT, start_date TEXT, end_date TEXT,
+                config TEXT, code_version TEXT, data_version TEXT
+            );
+            CREATE TABLE IF NOT EXISTS metrics (key TEXT, metric TEXT, value NUMERIC, PRIMARY KEY (key, metric));
+        """)
+
+    def _tables(self) -> set:
+        return {name for (name,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    def has(self, key: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM runs WHERE key = ?", (key,)).fetchone() is not None
+
+    def save(self, key: str, config: dict, trades_df, equity, metrics: dict, positions=None):
+        """Stores a run under `key`, replacing an earlier run with the same key."""
+        tables = self._tables()
+        with self.conn:
+            for table in ('runs', 'metrics', 'trades', 'equity', 'positions'):
+                if table in tables:
+                    self.conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+            self.conn.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, datetime.now().isoformat(timespec='seconds'), config['start_date'], config['end_date'],
+                 json.dumps(config, sort_keys=True), code_version(), data_version(config))
+            )
+            self.conn.executemany(
+                "INSERT INTO metrics VALUES (?, ?, ?)",
+                [(key, metric, value if isinstance(value, int) else float(value)) for metric, value in metrics.items()]
+            )
+            if trades_df is not None and not trades_df.empty:
+                trades_df.assign(key=key).to_sql('trades', self.conn, if_exists='append', index=False)
+            if equity is not None and not equity.empty:
+                equity.reset_index().assign(key=key).to_sql('equity', self.conn, if_exists='append', index=False)
+            if positions is not None and not positions.empty:
+                positions.assign(key=key, Ticker=positions['Ticker'].astype(str)).to_sql(
+                    'positions', self.conn, if_exists='append', index=False)
+
+    def load(self, key: str):
+        """(trades_df, equity, metrics, positions) of a stored run, or None if the key is not stored."""
+        if not self.has(key):
+            return None
+        tables = self._tables()
+        rows = self.conn.execute("SELECT metric, value FROM metrics WHERE key = ? ORDER BY rowid", (key,)).fetchall()
+        # SQLite keeps NaN as NULL
+        metrics = {metric: float('nan') if value is None else value for metric, value in rows}
+        trades_df = pd.DataFrame()
+        if 'trades' in tables:
+            trades_df = pd.read_sql("SELECT * FROM trades WHERE key = ?", self.conn, params=(key,)).drop(columns='key')
+        equity = None
+        if 'equity' in tables:
+            equity = pd.read_sql("SELECT * FROM equity WHERE key = ?", self.conn, params=(key,), parse_dates=['Date'])
+            equity = equity.drop(columns='key').astype({'Date': 'datetime64[ns]'}).set_index('Date') if not equity.empty else None
+        positions = PositionBuffers([]).to_frame()
+        if 'positions' in tables:
+            rows = pd.read_sql("SELECT * FROM positions WHERE key = ?", self.conn, params=(key,),
+                               parse_dates=['Date', 'Entry Date'])
+            if not rows.empty:
+                positions = rows.drop(columns='key').astype(
+                    {'Date': 'datetime64[ns]', 'Entry Date': 'datetime64[ns]', 'Ticker': 'category'})
+        return trades_df, equity, metrics, positions
+
+    # --- Queries ---
+
+    def runs_frame(self) -> pd.DataFrame:
+        """One row per stored run: its config parameters followed by its metrics."""
+        runs = pd.read_sql("SELECT key, created_at, config FROM runs", self.conn)
+        params = pd.DataFrame([json.loads(config) for config in runs['config']], index=runs['key'])
+        metrics = pd.read_sql("SELECT key, metric, value FROM metrics", self.conn).pivot(index='key', columns='metric', values='value')
+        frame = params.join(metrics)
+        frame.insert(0, 'created_at', runs.set_index('key')['created_at'])
+        return frame
+
+    def best_runs(self, metric: str, filters: dict = None, top: int = 1, ascending: bool = False) -> pd.DataFrame:
+        """Stored runs matching every config `filters` value, ranked by `metric`; nothing is re-executed."""
+        frame = self.runs_frame()
+        for param, value in (filters or {}).items():
+            if param not in frame.columns:
+                return frame.iloc[:0]
+            frame = frame[frame[param] == value]
+        if metric not in frame.columns:
+            return frame.iloc[:0]
+        return frame.dropna(subset=[metric]).sort_values(metric, ascending=ascending).head(top)
+
+    def close(self):
+        self.conn.close()
+
+
+def store_from_config(config: dict):
+    """ResultsStore at 'results_store_path', or None when 'results_store' is disabled."""
+    if not config.get('results_store', True):
+        return None
+    return ResultsStore(config.get('results_store_path', DEFAULT_STORE_PATH))
+
+def parse_filter(text: str) -> tuple:
+    """'exit_time_days=5' -> ('exit_time_days', 5); values are read as JSON, falling back to the raw string."""
+    param, _, value = text.partition('=')
+    try:
+        return param, json.loads(value)
+    except json.JSONDecodeError:
+        return param, value
+
+
+# --- Main Execution ---
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Query the stored backtest runs without re-executing them")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Results store to query")
+    parser.add_argument("--best", default="Sharpe Ratio", help="Metric to rank runs by")
+    parser.add_argument("--where", nargs='*', default=[], help="Config filters such as exit_time_days=5")
+    parser.add_argument("--top", type=int, default=5, help="Number of runs to show")
+    parser.add_argument("--ascending", action="store_true", help="Rank lowest first (e.g. for Maximum Drawdown)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.store):
+        raise SystemExit(f"No results store at {args.store}; run backtest.py first")
+    store = ResultsStore(args.store)
+    best = store.best_runs(args.best, dict(parse_filter(text) for text in args.where), args.top, args.ascending)
+    store.close()
+    if best.empty:
+        print(f"No stored runs with {args.best} match {' '.join(args.where) or 'any filter'}")
+    else:
+        print(best.to_string())
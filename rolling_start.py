@@ -0,0 +1,117 @@
+# rolling_start.py
+import os
+import json
+import argparse
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
+from data_analysis import fetch_data
+from create_reports import collect_trades, calculate_equity_metrics
+from parameter_sweep import init_worker, backtest_combination, results_row
+from screener_results import load_screener_results
+from equity_recorder import equity_frame
+
+# --- Constants ---
+
+DATE_FORMAT = "%Y-%m-%d"
+REPORTS_DIR = "reports"
+DISTRIBUTION_METRICS = ["Total Portfolio P/L", "Sharpe Ratio", "Maximum Drawdown"]
+PERCENTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+# --- Start Dates ---
+
+def trading_days(stock_dfs: dict, first_start: str, last_start: str) -> list:
+    """Dates between first_start and last_start (inclusive) on which any loaded ticker has a bar."""
+    first, last = pd.Timestamp(first_start), pd.Timestamp(last_start)
+    days = set()
+    for stock_df in stock_dfs.values():
+        if stock_df is not None:
+            index = stock_df.index
+            days.update(index[(index >= first) & (index <= last)].normalize())
+    return sorted(days)
+
+def make_runs(start_days: list, horizon_months: int, step: int = 1) -> list:
+    """One {start_date, end_date} per `step`-th start day, each covering `horizon_months` months."""
+    runs = []
+    for start in start_days[::step]:
+        end = start + pd.DateOffset(months=horizon_months) - pd.Timedelta(days=1)
+        runs.append({'start_date': start.strftime(DATE_FORMAT), 'end_date': end.strftime(DATE_FORMAT)})
+    return runs
+
+
+# --- Runs ---
+
+def run_start(params: dict, engine: str = 'numpy') -> dict:
+    """Worker entry point: backtests one start date; Sharpe and drawdown come from the equity curve even without trades."""
+    config, strategy = backtest_combination(params, engine)
+    row = results_row(params, config, strategy, collect_trades(strategy))
+    if "Sharpe Ratio" not in row:
+        equity = equity_frame(strategy)
+        metrics = calculate_equity_metrics(equity) if equity is not None and not equity.empty else {}
+        row["Sharpe Ratio"] = metrics.get("Sharpe Ratio", 0.0)
+        row["Maximum Drawdown"] = metrics.get("Maximum Drawdown", 0.0)
+    return row
+
+def run_rolling_starts(stock_dfs: dict, ranked_stocks: pd.DataFrame, config: dict, runs: list, workers: int = 1,
+                       engine: str = 'numpy') -> pd.DataFrame:
+    """Backtests every run on the already-loaded data, fanned out over a process pool when workers > 1."""
+    print(f"Backtesting {len(runs)} start dates on {workers} worker(s)")
+    rows = [None] * len(runs)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(stock_dfs, ranked_stocks, config)) as executor:
+            futures = {executor.submit(run_start, params, engine): i for i, params in enumerate(runs)}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Start dates"):
+                rows[futures[future]] = future.result()
+    else:
+        init_worker(stock_dfs, ranked_stocks, config)
+        for i, params in enumerate(tqdm(runs, desc="Start dates")):
+            rows[i] = run_start(params, engine)
+    return pd.DataFrame(rows)
+
+def summarize_runs(runs_df: pd.DataFrame) -> pd.DataFrame:
+    """Distribution of final P/L, Sharpe ratio and drawdown across the start dates."""
+    metrics = [metric for metric in DISTRIBUTION_METRICS if metric in runs_df]
+    summary = runs_df[metrics].describe(percentiles=PERCENTILES).T
+    summary["Share Positive"] = [(runs_df[metric] > 0).mean() for metric in metrics]
+    return summary
+
+
+# --- Main Execution ---
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Backtest many staggered start dates over a fixed horizon")
+    parser.add_argument("--first-start", default=None, help="First start date (defaults to the config start_date)")
+    parser.add_argument("--last-start", default=None, help="Last start date (defaults to three months after the first)")
+    parser.add_argument("--horizon-months", type=int, default=12, help="Length of every run")
+    parser.add_argument("--step", type=int, default=1, help="Use every n-th trading day as a start date")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--engine", default="numpy", choices=["numpy", "backtrader"], help="Backtest engine for each run")
+    args = parser.parse_args()
+
+    with open("source/config.json") as f:
+        config = json.load(f)
+
+    first_start = pd.Timestamp(args.first_start or config["start_date"])
+    last_start = pd.Timestamp(args.last_start) if args.last_start else first_start + pd.DateOffset(months=3) - pd.Timedelta(days=1)
+    last_end = last_start + pd.DateOffset(months=args.horizon_months)
+
+    # Load the ranked stocks and price data once, covering every run's dates
+    data_config = dict(config, start_date=first_start.strftime(DATE_FORMAT), end_date=last_end.strftime(DATE_FORMAT))
+    ranked_stocks = load_screener_results("data/stocks_ranked.csv")
+    ranked_stocks['Date'] = pd.to_datetime(ranked_stocks['Date']).dt.date
+    symbols = ranked_stocks['Ticker'].unique().tolist()
+    stock_dfs = fetch_data(symbols, data_config)
+
+    start_days = trading_days(stock_dfs, first_start, last_start)
+    runs = make_runs(start_days, args.horizon_months, args.step)
+    runs_df = run_rolling_starts(stock_dfs, ranked_stocks, config, runs, workers=args.workers, engine=args.engine)
+    summary = summarize_runs(runs_df)
+
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    runs_df.to_csv(os.path.join(REPORTS_DIR, "rolling_start_runs.csv"), index=False)
+    summary.to_csv(os.path.join(REPORTS_DIR, "rolling_start_summary.csv"))
+    print(f"\nRolling-start results saved to {REPORTS_DIR}/rolling_start_*.csv")
+    print(summary.to_string(float_format=lambda value: f"{value:,.2f}"))
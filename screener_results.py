@@ -0,0 +1,233 @@
+# screener_results.py
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+# --- Schema ---
+
+SCREENER_SCHEMA = {
+    'Date': 'datetime64[ns]',
+    'Ticker': object,
+    'Avg Price': np.float64,
+    'Avg Dollar Volume': np.float64,
+    'ATR %': np.float64,
+    '3-day RSI': np.float64,
+    'Higher Closes': bool,
+    '7-day ADX': np.float64,
+    'Pass Base': bool,
+    'Pass All': bool
+}
+
+# In-memory layout of screener rows loaded for a backtest: day ordinals, ticker codes and float32 indicators.
+# 7-day ADX stays float64 because it is the ranking key and float32 rounding could reorder ties.
+COMPACT_SCREENER_SCHEMA = {
+    'Date': np.int32,
+    'Ticker': np.int32,
+    'Avg Price': np.float32,
+    'Avg Dollar Volume': np.float32,
+    'ATR %': np.float32,
+    '3-day RSI': np.float32,
+    'Higher Closes': bool,
+    '7-day ADX': np.float64,
+    'Pass Base': bool,
+    'Pass All': bool
+}
+
+# Layout of retained rows that are written out again: coded dates and tickers, indicators kept at full precision
+CODED_SCREENER_SCHEMA = dict(SCREENER_SCHEMA, Date=np.int32, Ticker=np.int32)
+
+DEFAULT_BATCH_SIZE = 100_000
+
+
+def parquet_path_for(path: str) -> str:
+    """Returns the Parquet counterpart of a screener output path (e.g. data/stocks_ranked.csv -> .parquet)."""
+    return os.path.splitext(path)[0] + '.parquet'
+
+
+# --- Sinks ---
+
+class CsvSink:
+    """Appends flushed batches to a single CSV file, writing the header once."""
+
+    def __init__(self, path: str, columns: list, append: bool = False):
+        self.path = path
+        self.columns = columns
+        self._header_written = append and os.path.exists(path)
+        if not self._header_written and os.path.exists(path):
+            os.remove(path)
+
+    def write(self, frame: pd.DataFrame):
+        frame.to_csv(self.path, mode='a', header=not self._header_written, index=False)
+        self._header_written = True
+
+    def close(self):
+        if not self._header_written:
+            pd.DataFrame(columns=self.columns).to_csv(self.path, index=False)
+            self._header_written = True
+
+
+class ParquetDatasetSink:
+    """Writes each flushed batch as one part file of a Parquet dataset directory."""
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        if not append and os.path.exists(path):
+            shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+        os.makedirs(path, exist_ok=True)
+        self._part = len([f for f in os.listdir(path) if f.endswith('.parquet')])
+
+    def write(self, frame: pd.DataFrame):
+        part_path = os.path.join(self.path, f"part-{self._part:05d}.parquet")
+        frame.to_parquet(part_path, index=False, compression='snappy')
+        self._part += 1
+
+    def close(self):
+        pass
+
+
+def make_sinks(path: str, output_format: str = 'csv', append: bool = False) -> list:
+    """Builds the sinks for a screener output: 'csv', 'parquet' or 'both'.
+
+    A CSV-only output removes the Parquet copy left by an earlier run, which loaders would otherwise
+    prefer over the newer CSV.
+    """
+    if output_format not in ('csv', 'parquet', 'both'):
+        raise ValueError(f"Unknown output format: {output_format}")
+    stale_parquet = parquet_path_for(path)
+    if output_format == 'csv' and os.path.exists(stale_parquet):
+        shutil.rmtree(stale_parquet) if os.path.isdir(stale_parquet) else os.remove(stale_parquet)
+    sinks = []
+    if output_format in ('parquet', 'both'):
+        sinks.append(ParquetDatasetSink(parquet_path_for(path), append=append))
+    if output_format in ('csv', 'both'):
+        sinks.append(CsvSink(path, list(SCREENER_SCHEMA), append=append))
+    return sinks
+
+
+# --- Columnar Buffer ---
+
+class ColumnarBuffer:
+    """Append-only buffer of preallocated NumPy columns, flushed to sinks every `batch_size` rows.
+
+    Without sinks, flushed batches are retained so `to_frame()` can return every row appended.
+    """
+
+    def __init__(self, schema: dict = None, sinks: list = None, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.schema = schema or SCREENER_SCHEMA
+        self.sinks = sinks or []
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._batches = []
+        self._columns = {name: np.empty(batch_size, dtype=dtype) for name, dtype in self.schema.items()}
+        self._size = 0
+
+    def __len__(self):
+        return self.rows_written + self._size
+
+    def append(self, row: dict):
+        """Appends a single row given as a column -> value mapping."""
+        for name, column in self._columns.items():
+            column[self._size] = self.encode(name, [row[name]])[0]
+        self._size += 1
+        if self._size == self.batch_size:
+            self.flush()
+
+    def extend(self, frame: pd.DataFrame):
+        """Appends every row of a DataFrame holding the schema columns."""
+        start = 0
+        while start < len(frame):
+            count = min(self.batch_size - self._size, len(frame) - start)
+            for name, column in self._columns.items():
+                column[self._size:self._size + count] = self.encode(name, frame[name].values[start:start + count])
+            self._size += count
+            start += count
+            if self._size == self.batch_size:
+                self.flush()
+
+    def encode(self, name: str, values) -> np.ndarray:
+        """Converts incoming column values to the buffer's storage representation."""
+        return values
+
+    def decode(self, columns: dict) -> pd.DataFrame:
+        """Builds the output DataFrame from stored columns."""
+        return pd.DataFrame(columns)
+
+    def flush(self):
+        """Hands the buffered rows to the sinks as one DataFrame and resets the buffer."""
+        if self._size == 0:
+            return
+        columns = {name: column[:self._size].copy() for name, column in self._columns.items()}
+        if self.sinks:
+            batch = self.decode(columns)
+            for sink in self.sinks:
+                sink.write(batch)
+        else:
+            self._batches.append(columns)
+        self.rows_written += self._size
+        self._size = 0
+
+    def close(self):
+        """Flushes any remaining rows and finalizes the sinks."""
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns all retained rows (only meaningful for a buffer without sinks)."""
+        self.flush()
+        if not self._batches:
+            return self.decode({name: np.empty(0, dtype=dtype) for name, dtype in self.schema.items()})
+        return self.decode({name: np.concatenate([batch[name] for batch in self._batches]) for name in self.schema})
+
+
+class CompactColumnarBuffer(ColumnarBuffer):
+    """ColumnarBuffer storing rows with coded dates and tickers, for results retained in memory.
+
+    Dates are kept as int32 day ordinals and tickers as int32 codes, and both are decoded back to a
+    datetime Date column and a categorical Ticker column on output. The default CODED_SCREENER_SCHEMA
+    keeps indicators in float64, so rows that are written out again match the other screener paths;
+    COMPACT_SCREENER_SCHEMA stores them as float32. Output columns are float64 either way.
+    """
+
+    def __init__(self, schema: dict = None, sinks: list = None, batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(schema or CODED_SCREENER_SCHEMA, sinks=sinks, batch_size=batch_size)
+        self.tickers = []
+        self._ticker_codes = {}
+
+    def encode(self, name: str, values) -> np.ndarray:
+        if name == 'Date':
+            return np.asarray(values, dtype='datetime64[D]').astype(np.int32)
+        if name == 'Ticker':
+            for ticker in values:
+                if ticker not in self._ticker_codes:
+                    self._ticker_codes[ticker] = len(self.tickers)
+                    self.tickers.append(ticker)
+            return np.fromiter((self._ticker_codes[ticker] for ticker in values), dtype=np.int32, count=len(values))
+        return values
+
+    def decode(self, columns: dict) -> pd.DataFrame:
+        frame = pd.DataFrame(columns).astype({name: SCREENER_SCHEMA[name] for name in columns if name not in ('Date', 'Ticker')})
+        frame['Date'] = columns['Date'].astype('datetime64[D]').astype('datetime64[ns]')
+        frame['Ticker'] = pd.Categorical.from_codes(columns['Ticker'], categories=list(self.tickers))
+        return frame
+
+
+# --- Loading ---
+
+def compact_screener_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Converts screener rows to categorical tickers, float32 indicators and boolean filter columns."""
+    dtypes = {name: dtype for name, dtype in COMPACT_SCREENER_SCHEMA.items() if name in frame and name not in ('Date', 'Ticker')}
+    frame = frame.astype(dtypes)
+    if 'Ticker' in frame:
+        frame['Ticker'] = frame['Ticker'].astype('category')
+    return frame
+
+def load_screener_results(path: str, compact: bool = False) -> pd.DataFrame:
+    """Loads screener output, preferring the typed Parquet copy over the CSV when it exists."""
+    parquet_path = parquet_path_for(path)
+    if os.path.exists(parquet_path):
+        frame = pd.read_parquet(parquet_path)
+    else:
+        frame = pd.read_csv(path, parse_dates=['Date'])
+    return compact_screener_frame(frame) if compact else frame
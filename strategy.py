@@ -2,10 +2,12 @@ import backtrader as bt
 import pandas as pd
 from entry_conditions import entry_logic
 from exit_conditions import exit_logic
-from datetime import datetime, date
+from position_book import PositionBook
+from profiler import PROFILER
+from datetime import datetime, timedelta
 
 class ShortRSIStrategy(bt.Strategy):
-    params = (("ranked_stocks", None), ("config", None))
+    params = (("ranked_stocks", None), ("config", None), ("trading_start", None))
 
     def __init__(self):
         self.order = None
@@ -28,13 +30,16 @@ class ShortRSIStrategy(bt.Strategy):
             if param not in self.config:
                 raise ValueError(f"Missing required parameter in config: {param}")
         
-        # Dictionaries for position management
-        self.entry_dates = {}
-        self.entry_prices = {}
+        # Open positions with their entry, time-exit and profit-target levels
+        self.book = PositionBook(self.datas)
         
-        # ATR indicators
+        # ATR indicators; feeds with an `atr` line (dynamic universe, indicator cache) carry it precomputed
+        self.trading_start = self.params.trading_start
         self.atrs = {}
         for data in self.datas:
+            if 'atr' in data.lines.getlinealiases():
+                self.atrs[data._name] = data.lines.atr
+                continue
             self.atrs[data._name] = bt.indicators.ATR(
                 data, 
                 period=self.config['atr_period']
@@ -43,15 +48,42 @@ class ShortRSIStrategy(bt.Strategy):
         # Ensure Date column is properly converted
         self.ranked_stocks['Date'] = pd.to_datetime(self.ranked_stocks['Date']).dt.date
 
+        # Feeds by name, and each date's top ADX candidates resolved to feeds once up front
+        self.feeds_by_name = {data._name: data for data in self.datas}
+        self.daily_candidates = self.build_daily_candidates()
+
+    def build_daily_candidates(self):
+        """Maps each ranked date to the feeds of its top `daily_tickers_entry` ADX stocks, in feed order."""
+        feed_order = {data._name: i for i, data in enumerate(self.datas)}
+        candidates = {}
+        for current_date, todays_stocks in self.ranked_stocks.groupby('Date', sort=False):
+            top_stocks = todays_stocks.nlargest(self.config["daily_tickers_entry"], '7-day ADX')['Ticker']
+            names = sorted((name for name in set(top_stocks) if name in feed_order), key=feed_order.get)
+            candidates[current_date] = [self.feeds_by_name[name] for name in names]
+        return candidates
+
+    def prenext(self):
+        # With precomputed ATR lines the warm-up is tracked by trading_start, so next() cannot wait for every feed
+        if self.trading_start is not None:
+            self.next()
+
     def next(self):
-        current_date = bt.num2date(self.data.datetime[0]).date()
-        start_date = datetime.strptime(self.config["start_date"], "%Y-%m-%d").date()
-        
-        if current_date < start_date:
-            return
+        with PROFILER.phase('next'):
+            current_date = bt.num2date(self.data.datetime[0]).date()
+            start_date = datetime.strptime(self.config["start_date"], "%Y-%m-%d").date()
             
-        entry_logic(self, current_date)
-        exit_logic(self, current_date)
+            if current_date < start_date:
+                return
+
+            # Trade from the bar a full-universe run would, once every ticker's ATR is warmed up
+            if self.trading_start is not None and bt.num2date(self.datetime[0]).date() < self.trading_start:
+                return
+                
+            with PROFILER.phase('entry_logic'):
+                entry_logic(self, current_date)
+            with PROFILER.phase('exit_logic'):
+                exit_logic(self, current_date)
+        PROFILER.bar(current_date, len(self.book))
 
     def notify_order(self, order):
         if order.status in [order.Submitted, order.Accepted]:
@@ -62,8 +94,14 @@ class ShortRSIStrategy(bt.Strategy):
             
             if order.status == order.Completed:
                 if not order.isbuy():  # Short entry
-                    self.entry_dates[order.data._name] = current_date
-                    self.entry_prices[order.data._name] = order.executed.price
+                    self.book.open(
+                        order.data,
+                        entry_date=current_date,
+                        entry_price=order.executed.price,
+                        size=abs(order.executed.size),
+                        time_exit_date=current_date + timedelta(days=self.config["exit_time_days"]),
+                        profit_target_price=order.executed.price * (1 - self.config['profit_target_percent']/100)
+                    )
                     
                     # Enhanced tracking with more details
                     self.trade_tracking[order.data._name] = {
@@ -84,6 +122,7 @@ class ShortRSIStrategy(bt.Strategy):
     def notify_trade(self, trade):
         if trade.isclosed:
             self.trades.append(trade)
+            self.book.close(trade.data._name)
             
             # Store comprehensive trade information
             if trade.data._name in self.trade_tracking:
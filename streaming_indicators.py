@@ -0,0 +1,595 @@
+# streaming_indicators.py
+import os
+import math
+import numpy as np
+
+# --- Constants ---
+
+WINDOW = 20         # Rolling window for average price and dollar volume
+ATR_PERIOD = 10
+RSI_PERIOD = 3
+ADX_PERIOD = 7
+TA_EPSILON = 1e-8   # Tolerance of TA-Lib's TA_IS_ZERO
+NAN = float('nan')
+
+INDICATOR_NAMES = ['Avg Price', 'Avg Dollar Volume', 'ATR %', '3-day RSI', 'Higher Closes', '7-day ADX']
+
+
+# --- TA-Lib Compatible Helpers ---
+
+def is_zero(values):
+    """TA-Lib's TA_IS_ZERO test."""
+    return (-TA_EPSILON < values) & (values < TA_EPSILON)
+
+def true_range(high, low, prev_close):
+    """TA-Lib TRANGE: high-low widened by the gaps to the previous close (NaN gaps are ignored)."""
+    out = high - low
+    gap = np.abs(high - prev_close)
+    out = np.where(gap > out, gap, out)
+    gap = np.abs(low - prev_close)
+    return np.where(gap > out, gap, out)
+
+
+# --- Batch Screener State ---
+
+class ScreenerState:
+    """Streaming state of the screener indicators for many tickers, advanced one bar at a time.
+
+    Reproduces talib.ATR(10), talib.RSI(3), talib.ADX(7), the 20-row trailing means and the
+    consecutive-higher-close test bar by bar, including TA-Lib's handling of leading NaN rows.
+    The state is a dict of per-ticker arrays, so it can be checkpointed with `save`/`load`.
+    """
+
+    FLOAT_FIELDS = [
+        'close_1', 'close_2',
+        'atr_prev_close', 'atr_sum', 'atr',
+        'rsi_prev', 'rsi_gain', 'rsi_loss',
+        'adx_prev_high', 'adx_prev_low', 'adx_prev_close', 'adx_plus_dm', 'adx_minus_dm', 'adx_tr', 'adx_sum_dx', 'adx'
+    ]
+    COUNT_FIELDS = ['bars', 'atr_count', 'rsi_count', 'adx_count']
+
+    def __init__(self, tickers: list):
+        self.tickers = list(tickers)
+        n = len(self.tickers)
+        self.state = {name: np.full(n, np.nan) for name in self.FLOAT_FIELDS}
+        self.state.update({name: np.zeros(n, dtype=np.int64) for name in self.COUNT_FIELDS})
+        self.state['ring_close'] = np.full((n, WINDOW), np.nan)
+        self.state['ring_dollar_volume'] = np.full((n, WINDOW), np.nan)
+        self.state['last_bar'] = np.full(n, np.datetime64('NaT'), dtype='datetime64[ns]')
+        self.values = {name: np.full(n, np.nan) for name in INDICATOR_NAMES}
+        self.values['Higher Closes'] = np.zeros(n, dtype=bool)
+
+    # --- Updating ---
+
+    def update(self, high, low, close, volume, timestamp=None, rows=None):
+        """Advances the selected tickers (all by default) by one bar and refreshes `values` for them."""
+        rows = slice(None) if rows is None else rows
+        s = {name: np.array(array[rows]) for name, array in self.state.items()}
+        high, low, close, volume = (np.asarray(a, dtype=np.float64) for a in (high, low, close, volume))
+
+        # Rolling 20-row windows, kept in chronological order on read
+        position = s['bars'] % WINDOW
+        index = np.arange(len(position))
+        s['ring_close'][index, position] = close
+        s['ring_dollar_volume'][index, position] = close * volume
+        s['bars'] = s['bars'] + 1
+
+        # Two consecutive higher closes (needs three rows)
+        higher_closes = (s['bars'] >= 3) & (s['close_1'] > s['close_2']) & (close > s['close_1'])
+        s['close_2'], s['close_1'] = s['close_1'], close
+
+        atr = self._update_atr(s, high, low, close)
+        rsi = self._update_rsi(s, close)
+        adx = self._update_adx(s, high, low, close)
+
+        if timestamp is not None:
+            s['last_bar'][:] = np.datetime64(timestamp, 'ns')
+
+        for name, array in self.state.items():
+            array[rows] = s[name]
+
+        full = s['bars'] >= WINDOW
+        order = (s['bars'][:, None] + np.arange(WINDOW)) % WINDOW
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.values['Avg Price'][rows] = np.where(full, _window_nanmean(s['ring_close'], order), np.nan)
+            self.values['Avg Dollar Volume'][rows] = np.where(full, _window_nanmean(s['ring_dollar_volume'], order), np.nan)
+            self.values['ATR %'][rows] = np.where(close != 0, (atr / close) * 100, 0)
+        self.values['3-day RSI'][rows] = rsi
+        self.values['Higher Closes'][rows] = higher_closes
+        self.values['7-day ADX'][rows] = adx
+
+    @staticmethod
+    def _update_atr(s, high, low, close, period=ATR_PERIOD):
+        """Wilder ATR: SMA of the first `period` true ranges, then (prev*(p-1)+TR)/p."""
+        started = s['atr_count'] > 0
+        tr = true_range(high, low, s['atr_prev_close'])
+        step = np.where(started, s['atr_count'], 0)      # Bar offset from the first complete bar
+
+        s['atr_sum'] = np.where(started & (step <= period), np.where(step == 1, 0.0, s['atr_sum']) + tr, s['atr_sum'])
+        seeded = np.where(step == period, s['atr_sum'] / period, s['atr'])
+        s['atr'] = np.where(step > period, ((s['atr'] * (period - 1)) + tr) / period, seeded)
+
+        begins = ~started & ~(np.isnan(high) | np.isnan(low) | np.isnan(close))
+        s['atr_count'] = np.where(started | begins, s['atr_count'] + 1, 0)
+        s['atr_prev_close'] = np.where(started | begins, close, s['atr_prev_close'])
+        return np.where(started & (step >= period), s['atr'], np.nan)
+
+    @staticmethod
+    def _update_rsi(s, close, period=RSI_PERIOD):
+        """TA-Lib RSI: averages of the first `period` gains/losses, then Wilder smoothing."""
+        started = s['rsi_count'] > 0
+        step = np.where(started, s['rsi_count'], 0)
+        diff = close - s['rsi_prev']
+        falling = diff < 0
+        gain_add = np.where(falling, 0.0, diff)
+        loss_add = np.where(falling, -diff, 0.0)
+
+        first = (step == 1)
+        warmup = started & (step <= period)
+        gain = np.where(warmup, np.where(first, 0.0, s['rsi_gain']) + gain_add, s['rsi_gain'])
+        loss = np.where(warmup, np.where(first, 0.0, s['rsi_loss']) + loss_add, s['rsi_loss'])
+        gain = np.where(step == period, gain / period, gain)
+        loss = np.where(step == period, loss / period, loss)
+
+        smoothing = step > period
+        gain = np.where(smoothing, (s['rsi_gain'] * (period - 1) + gain_add) / period, gain)
+        loss = np.where(smoothing, (s['rsi_loss'] * (period - 1) + loss_add) / period, loss)
+        s['rsi_gain'], s['rsi_loss'] = gain, loss
+
+        # TA-Lib emits 0 when the averages sum to zero, and also once a NaN close has poisoned them
+        total = gain + loss
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rsi = np.where(is_zero(total) | np.isnan(total), 0.0, 100.0 * (gain / total))
+
+        begins = ~started & ~np.isnan(close)
+        s['rsi_count'] = np.where(started | begins, s['rsi_count'] + 1, 0)
+        s['rsi_prev'] = np.where(started | begins, close, s['rsi_prev'])
+        return np.where(started & (step >= period), rsi, np.nan)
+
+    @staticmethod
+    def _update_adx(s, high, low, close, period=ADX_PERIOD):
+        """TA-Lib ADX: Wilder-summed +DM/-DM/TR, DX averaged over `period` bars, then Wilder-smoothed."""
+        started = s['adx_count'] > 0
+        step = np.where(started, s['adx_count'], 0)
+
+        diff_plus = high - s['adx_prev_high']
+        diff_minus = s['adx_prev_low'] - low
+        minus_dm = (diff_minus > 0) & (diff_plus < diff_minus)
+        plus_dm = ~minus_dm & (diff_plus > 0) & (diff_plus > diff_minus)
+        tr = true_range(high, low, s['adx_prev_close'])
+
+        # Bars 1..p-1 only accumulate; later bars decay the sums first
+        first = step == 1
+        decaying = step >= period
+        mdm = np.where(first, 0.0, s['adx_minus_dm'])
+        pdm = np.where(first, 0.0, s['adx_plus_dm'])
+        mdm = np.where(decaying, mdm - mdm / period, mdm)
+        pdm = np.where(decaying, pdm - pdm / period, pdm)
+        mdm = np.where(minus_dm, mdm + diff_minus, mdm)
+        pdm = np.where(plus_dm, pdm + diff_plus, pdm)
+        prev_tr = np.where(first, 0.0, s['adx_tr'])
+        tr_sum = np.where(decaying, prev_tr - (prev_tr / period) + tr, prev_tr + tr)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            minus_di = 100.0 * (mdm / tr_sum)
+            plus_di = 100.0 * (pdm / tr_sum)
+            di_sum = minus_di + plus_di
+            dx = 100.0 * (np.abs(minus_di - plus_di) / di_sum)
+        has_dx = decaying & ~is_zero(tr_sum) & ~is_zero(di_sum)
+
+        sum_dx = np.where(step == period, 0.0, s['adx_sum_dx'])
+        sum_dx = np.where(has_dx & (step < 2 * period), sum_dx + dx, sum_dx)
+        adx = np.where(step == 2 * period - 1, sum_dx / period, s['adx'])
+        adx = np.where(has_dx & (step >= 2 * period), ((s['adx'] * (period - 1)) + dx) / period, adx)
+
+        update = started
+        s['adx_minus_dm'] = np.where(update, mdm, s['adx_minus_dm'])
+        s['adx_plus_dm'] = np.where(update, pdm, s['adx_plus_dm'])
+        s['adx_tr'] = np.where(update, tr_sum, s['adx_tr'])
+        s['adx_sum_dx'] = np.where(update, sum_dx, s['adx_sum_dx'])
+        s['adx'] = np.where(update, adx, s['adx'])
+
+        begins = ~started & ~(np.isnan(high) | np.isnan(low) | np.isnan(close))
+        moving = started | begins
+        s['adx_count'] = np.where(moving, s['adx_count'] + 1, 0)
+        s['adx_prev_high'] = np.where(moving, high, s['adx_prev_high'])
+        s['adx_prev_low'] = np.where(moving, low, s['adx_prev_low'])
+        s['adx_prev_close'] = np.where(moving, close, s['adx_prev_close'])
+        return np.where(started & (step >= 2 * period - 1), s['adx'], np.nan)
+
+    # --- Ticker Management ---
+
+    def add_tickers(self, tickers: list):
+        """Appends fresh (empty) state rows for tickers not tracked yet."""
+        known = set(self.tickers)
+        new = [ticker for ticker in tickers if ticker not in known]
+        if not new:
+            return
+        fresh = ScreenerState(new)
+        self.tickers.extend(new)
+        for name in self.state:
+            self.state[name] = np.concatenate([self.state[name], fresh.state[name]])
+        for name in self.values:
+            self.values[name] = np.concatenate([self.values[name], fresh.values[name]])
+
+    def rows_for(self, tickers: list) -> np.ndarray:
+        """Returns the state row index of each ticker."""
+        position = {ticker: i for i, ticker in enumerate(self.tickers)}
+        return np.array([position[ticker] for ticker in tickers], dtype=np.int64)
+
+    # --- Checkpointing ---
+
+    def save(self, path: str, **metadata):
+        """Atomically writes the state (plus scalar metadata such as the last processed date) to an .npz file."""
+        tmp_path = path + '.tmp.npz'
+        arrays = {f"state__{name}": array for name, array in self.state.items()}
+        arrays.update({f"values__{name}": array for name, array in self.values.items()})
+        arrays.update({f"meta__{key}": np.asarray(value) for key, value in metadata.items()})
+        np.savez(tmp_path, tickers=np.array(self.tickers, dtype=object), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """Restores a state saved with `save`, returning (state, metadata)."""
+        with np.load(path, allow_pickle=True) as checkpoint:
+            state = cls(checkpoint['tickers'].tolist())
+            metadata = {}
+            for key in checkpoint.files:
+                kind, _, name = key.partition('__')
+                if kind == 'state':
+                    state.state[name] = checkpoint[key]
+                elif kind == 'values':
+                    state.values[name] = checkpoint[key]
+                elif kind == 'meta':
+                    metadata[name] = checkpoint[key][()]
+        return state, metadata
+
+
+# --- Single-Ticker Streaming Kernels ---
+
+def _is_zero(value: float) -> bool:
+    """Scalar TA_IS_ZERO; False for NaN, as in the array version."""
+    return -TA_EPSILON < value < TA_EPSILON
+
+def _true_range(high: float, low: float, prev_close: float) -> float:
+    """Scalar TRANGE with the array version's NaN behaviour (a NaN gap never widens the range)."""
+    out = high - low
+    gap = abs(high - prev_close)
+    if gap > out:
+        out = gap
+    gap = abs(low - prev_close)
+    if gap > out:
+        out = gap
+    return out
+
+
+class WilderATR:
+    """Streaming talib.ATR: O(1) float arithmetic per `update`, NaN until `period` true ranges are in.
+
+    Leading bars with a NaN field are skipped, as TA-Lib skips leading NaN rows.
+    """
+    __slots__ = ('period', 'count', 'prev_close', 'sum', 'atr')
+
+    def __init__(self, period: int = ATR_PERIOD):
+        self.period = period
+        self.count = 0
+        self.prev_close = NAN
+        self.sum = NAN
+        self.atr = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        step = self.count
+        if not step:
+            if high != high or low != low or close != close:
+                return NAN
+            self.count = 1
+            self.prev_close = close
+            return NAN
+
+        period = self.period
+        tr = _true_range(high, low, self.prev_close)
+        if step <= period:
+            self.sum = (0.0 if step == 1 else self.sum) + tr
+            if step == period:
+                self.atr = self.sum / period
+        else:
+            self.atr = ((self.atr * (period - 1)) + tr) / period
+        self.count = step + 1
+        self.prev_close = close
+        return self.atr if step >= period else NAN
+
+
+class WilderRSI:
+    """Streaming talib.RSI: seeded with the mean gain/loss of the first `period` changes, then Wilder-smoothed."""
+    __slots__ = ('period', 'count', 'prev', 'gain', 'loss')
+
+    def __init__(self, period: int = RSI_PERIOD):
+        self.period = period
+        self.count = 0
+        self.prev = NAN
+        self.gain = NAN
+        self.loss = NAN
+
+    def update(self, close: float) -> float:
+        step = self.count
+        if not step:
+            if close != close:
+                return NAN
+            self.count = 1
+            self.prev = close
+            return NAN
+
+        period = self.period
+        diff = close - self.prev
+        if diff < 0:
+            gain_add, loss_add = 0.0, -diff
+        else:
+            gain_add, loss_add = diff, 0.0
+        if step <= period:
+            gain = (0.0 if step == 1 else self.gain) + gain_add
+            loss = (0.0 if step == 1 else self.loss) + loss_add
+            if step == period:
+                gain, loss = gain / period, loss / period
+        else:
+            gain = (self.gain * (period - 1) + gain_add) / period
+            loss = (self.loss * (period - 1) + loss_add) / period
+        self.gain, self.loss = gain, loss
+        self.count = step + 1
+        self.prev = close
+        if step < period:
+            return NAN
+
+        # TA-Lib emits 0 when the averages sum to zero, and also once a NaN close has poisoned them
+        total = gain + loss
+        return 0.0 if _is_zero(total) or total != total else 100.0 * (gain / total)
+
+
+class WilderADX:
+    """Streaming talib.ADX: Wilder-summed +DM/-DM/TR, DX averaged over `period` bars, then Wilder-smoothed."""
+    __slots__ = ('period', 'count', 'prev_high', 'prev_low', 'prev_close', 'plus_dm', 'minus_dm', 'tr', 'sum_dx', 'adx')
+
+    def __init__(self, period: int = ADX_PERIOD):
+        self.period = period
+        self.count = 0
+        self.prev_high = self.prev_low = self.prev_close = NAN
+        self.plus_dm = self.minus_dm = self.tr = self.sum_dx = self.adx = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        step = self.count
+        if not step:
+            if high != high or low != low or close != close:
+                return NAN
+            self.count = 1
+            self.prev_high, self.prev_low, self.prev_close = high, low, close
+            return NAN
+
+        period = self.period
+        diff_plus = high - self.prev_high
+        diff_minus = self.prev_low - low
+        minus_dm = diff_minus > 0 and diff_plus < diff_minus
+        plus_dm = not minus_dm and diff_plus > 0 and diff_plus > diff_minus
+        tr = _true_range(high, low, self.prev_close)
+
+        # Bars 1..p-1 only accumulate; later bars decay the sums first
+        first = step == 1
+        decaying = step >= period
+        mdm = 0.0 if first else self.minus_dm
+        pdm = 0.0 if first else self.plus_dm
+        if decaying:
+            mdm = mdm - mdm / period
+            pdm = pdm - pdm / period
+        if minus_dm:
+            mdm = mdm + diff_minus
+        if plus_dm:
+            pdm = pdm + diff_plus
+        prev_tr = 0.0 if first else self.tr
+        tr_sum = prev_tr - (prev_tr / period) + tr if decaying else prev_tr + tr
+
+        dx = None
+        if decaying and not _is_zero(tr_sum):
+            minus_di = 100.0 * (mdm / tr_sum)
+            plus_di = 100.0 * (pdm / tr_sum)
+            di_sum = minus_di + plus_di
+            if not _is_zero(di_sum):
+                dx = 100.0 * (abs(minus_di - plus_di) / di_sum)
+
+        sum_dx = 0.0 if step == period else self.sum_dx
+        if dx is not None and step < 2 * period:
+            sum_dx = sum_dx + dx
+        if step == 2 * period - 1:
+            self.adx = sum_dx / period
+        elif dx is not None and step >= 2 * period:
+            self.adx = ((self.adx * (period - 1)) + dx) / period
+
+        self.minus_dm, self.plus_dm, self.tr, self.sum_dx = mdm, pdm, tr_sum, sum_dx
+        self.count = step + 1
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        return self.adx if step >= 2 * period - 1 else NAN
+
+
+class RollingMean:
+    """Trailing mean of the last `window` values ignoring NaNs, like Series.tail(window).mean().
+
+    Keeps a running sum over a preallocated ring; the sum is rebuilt from the ring once per
+    wrap-around so rounding drift cannot build up, which keeps the amortized cost O(1).
+    """
+    __slots__ = ('window', 'ring', 'position', 'bars', 'sum', 'valid')
+
+    def __init__(self, window: int = WINDOW):
+        self.window = window
+        self.ring = [NAN] * window
+        self.position = 0
+        self.bars = 0
+        self.sum = 0.0
+        self.valid = 0
+
+    def update(self, value: float) -> float:
+        ring = self.ring
+        old = ring[self.position]
+        if old == old:
+            self.sum -= old
+            self.valid -= 1
+        ring[self.position] = value
+        if value == value:
+            self.sum += value
+            self.valid += 1
+        self.bars += 1
+        self.position += 1
+        if self.position == self.window:
+            self.position = 0
+            self.sum = math.fsum(x for x in ring if x == x)
+        if self.bars < self.window or not self.valid:
+            return NAN
+        return self.sum / self.valid
+
+
+class HigherCloseCount:
+    """Number of consecutive closes above the previous close (2 or more is the screener's 'Higher Closes')."""
+    __slots__ = ('prev', 'count')
+
+    def __init__(self):
+        self.prev = NAN
+        self.count = 0
+
+    def update(self, close: float) -> int:
+        self.count = self.count + 1 if close > self.prev else 0
+        self.prev = close
+        return self.count
+
+
+class TickerIndicators:
+    """All screener indicators of one ticker, advanced one bar at a time."""
+    __slots__ = ('atr', 'rsi', 'adx', 'avg_price', 'avg_dollar_volume', 'higher_closes')
+
+    def __init__(self):
+        self.atr = WilderATR(ATR_PERIOD)
+        self.rsi = WilderRSI(RSI_PERIOD)
+        self.adx = WilderADX(ADX_PERIOD)
+        self.avg_price = RollingMean(WINDOW)
+        self.avg_dollar_volume = RollingMean(WINDOW)
+        self.higher_closes = HigherCloseCount()
+
+    def update(self, high: float, low: float, close: float, volume: float) -> tuple:
+        """Returns (Avg Price, Avg Dollar Volume, ATR %, 3-day RSI, Higher Closes, 7-day ADX) after the bar."""
+        atr = self.atr.update(high, low, close)
+        return (
+            self.avg_price.update(close),
+            self.avg_dollar_volume.update(close * volume),
+            (atr / close) * 100 if close != 0 else 0,
+            self.rsi.update(close),
+            self.higher_closes.update(close) >= 2,
+            self.adx.update(high, low, close)
+        )
+
+
+def streaming_indicator_arrays(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> dict:
+    """Whole-history screener indicators from the streaming kernels, for use where TA-Lib is not installed."""
+    n = len(close)
+    values = {name: np.empty(n) for name in INDICATOR_NAMES}
+    values['Higher Closes'] = np.empty(n, dtype=bool)
+    columns = [values[name] for name in INDICATOR_NAMES]
+    kernels = TickerIndicators()
+    for i, bar in enumerate(zip(high.tolist(), low.tolist(), close.tolist(), volume.tolist())):
+        for column, value in zip(columns, kernels.update(*bar)):
+            column[i] = value
+    return values
+
+
+# --- Batch Kernels ---
+
+class BatchKernel:
+    """Advances one indicator for many tickers at once, reusing ScreenerState's vectorized update rules."""
+    FIELDS = ()
+    COUNT = None
+
+    def __init__(self, n: int, period: int):
+        self.period = period
+        self.state = {name: np.full(n, np.nan) for name in self.FIELDS}
+        self.state[self.COUNT] = np.zeros(n, dtype=np.int64)
+
+
+class BatchWilderATR(BatchKernel):
+    FIELDS = ('atr_prev_close', 'atr_sum', 'atr')
+    COUNT = 'atr_count'
+
+    def __init__(self, n: int, period: int = ATR_PERIOD):
+        super().__init__(n, period)
+
+    def update(self, high, low, close) -> np.ndarray:
+        return ScreenerState._update_atr(self.state, high, low, close, self.period)
+
+
+class BatchWilderRSI(BatchKernel):
+    FIELDS = ('rsi_prev', 'rsi_gain', 'rsi_loss')
+    COUNT = 'rsi_count'
+
+    def __init__(self, n: int, period: int = RSI_PERIOD):
+        super().__init__(n, period)
+
+    def update(self, close) -> np.ndarray:
+        return ScreenerState._update_rsi(self.state, close, self.period)
+
+
+class BatchWilderADX(BatchKernel):
+    FIELDS = ('adx_prev_high', 'adx_prev_low', 'adx_prev_close', 'adx_plus_dm', 'adx_minus_dm', 'adx_tr', 'adx_sum_dx', 'adx')
+    COUNT = 'adx_count'
+
+    def __init__(self, n: int, period: int = ADX_PERIOD):
+        super().__init__(n, period)
+
+    def update(self, high, low, close) -> np.ndarray:
+        return ScreenerState._update_adx(self.state, high, low, close, self.period)
+
+
+class BatchRollingMean:
+    """RollingMean for many tickers: running sums and valid counts over a (tickers x window) ring."""
+
+    def __init__(self, n: int, window: int = WINDOW):
+        self.window = window
+        self.ring = np.full((n, window), np.nan)
+        self.sum = np.zeros(n)
+        self.valid = np.zeros(n, dtype=np.int64)
+        self.bars = 0
+
+    def update(self, values) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        position = self.bars % self.window
+        old = self.ring[:, position]
+        old_valid = ~np.isnan(old)
+        new_valid = ~np.isnan(values)
+        self.sum += np.where(new_valid, values, 0.0) - np.where(old_valid, old, 0.0)
+        self.valid += new_valid.astype(np.int64) - old_valid
+        self.ring[:, position] = values
+        self.bars += 1
+        if position == self.window - 1:
+            # Rebuild the sums once per wrap-around so rounding drift cannot build up
+            self.sum = np.nansum(self.ring, axis=1)
+        if self.bars < self.window:
+            return np.full(len(values), np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.valid > 0, self.sum / self.valid, np.nan)
+
+
+class BatchHigherCloseCount:
+    """HigherCloseCount for many tickers."""
+
+    def __init__(self, n: int):
+        self.prev = np.full(n, np.nan)
+        self.count = np.zeros(n, dtype=np.int64)
+
+    def update(self, close) -> np.ndarray:
+        close = np.asarray(close, dtype=np.float64)
+        self.count = np.where(close > self.prev, self.count + 1, 0)
+        self.prev = close
+        return self.count
+
+
+# --- Validation ---
+
+def _window_nanmean(ring: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """Mean of each ring buffer row in chronological order, ignoring NaNs like Series.mean()."""
+    window = np.take_along_axis(ring, order, axis=1)
+    missing = np.isnan(window)
+    counts = (~missing).sum(axis=1)
+    sums = np.where(missing, 0.0, window).sum(axis=1)
+    return np.where(counts > 0, sums / counts, np.nan)
@@ -0,0 +1,33 @@
+# conftest.py
+import os
+import sys
+import pytest
+import pandas as pd
+
+# The modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import generate_ohlcv, generate_ranked, BENCHMARK_CONFIG
+
+# --- Fixtures ---
+
+N_TICKERS = 30
+N_DAYS = 120
+
+
+@pytest.fixture(scope="session")
+def ohlcv() -> pd.DataFrame:
+    """Deterministic long-format bars for a small universe, as in historical_data_*.csv."""
+    return generate_ohlcv(N_TICKERS, N_DAYS)
+
+@pytest.fixture
+def ranked(ohlcv) -> pd.DataFrame:
+    """A stocks_ranked frame for the bars, with dates converted the way backtest.py loads them."""
+    ranked = generate_ranked(ohlcv)
+    ranked['Date'] = pd.to_datetime(ranked['Date']).dt.date
+    return ranked
+
+@pytest.fixture
+def config() -> dict:
+    """Backtest config over the fixture bars, leaving the first weeks for the ATR warm-up."""
+    return dict(BENCHMARK_CONFIG, start_date="2020-02-03", end_date="2020-06-01")
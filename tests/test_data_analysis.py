@@ -0,0 +1,15 @@
+# test_data_analysis.py
+import data_analysis
+from data_analysis import fetch_data
+
+
+def test_fetch_data_with_cold_offline_cache_returns_empty_panel(config, tmp_path):
+    config = dict(config, use_download_cache=True, download_cache_dir=str(tmp_path / "cache"), offline=True)
+    stock_dfs = fetch_data(["T00000", "T00001"], config)
+    assert stock_dfs.empty
+    assert len(stock_dfs) == 0
+
+def test_fetch_data_with_failed_download_returns_empty_panel(config, monkeypatch):
+    monkeypatch.setattr(data_analysis, "download_symbols", lambda symbols, start, end: {})
+    stock_dfs = fetch_data(["T00000"], dict(config, use_download_cache=False))
+    assert stock_dfs.empty
@@ -0,0 +1,32 @@
+# test_numpy_engine.py
+import numpy as np
+import pytest
+import pandas as pd
+import backtrader as bt
+from aligned_panel import AlignedPanel
+from numpy_engine import NumpyBacktest
+from backtest import run_backtest
+from create_reports import collect_trades
+from equity_recorder import EQUITY_FIELDS
+
+
+def test_numpy_backtest_runs_end_to_end(ohlcv, ranked, config):
+    strategy = NumpyBacktest(AlignedPanel.from_long(ohlcv), ranked, dict(config, engine="numpy")).run(verbose=False)
+
+    equity = strategy.recorder.to_frame()
+    assert list(equity.columns) == EQUITY_FIELDS
+    assert [day.date() for day in equity.index] == strategy.dates
+    assert strategy.trades
+    assert np.isclose(equity['Value'].iloc[-1], strategy.broker.getvalue())
+
+
+@pytest.mark.parametrize("array_feeds", [True, False])
+def test_numpy_engine_matches_backtrader(ohlcv, ranked, config, array_feeds):
+    config = dict(config, array_feeds=array_feeds)
+    numpy_run = run_backtest(bt.Cerebro(), AlignedPanel.from_long(ohlcv), ranked.copy(), dict(config, engine="numpy"))[0]
+    cerebro_run = run_backtest(bt.Cerebro(), AlignedPanel.from_long(ohlcv), ranked.copy(), dict(config, engine="backtrader"))[0]
+
+    numpy_trades = collect_trades(numpy_run)
+    assert not numpy_trades.empty
+    pd.testing.assert_frame_equal(numpy_trades, collect_trades(cerebro_run))
+    assert numpy_run.broker.getvalue() == cerebro_run.broker.getvalue()
@@ -0,0 +1,24 @@
+# test_ohlcv_store.py
+import os
+from ohlcv_store import convert_csv_to_store, store_is_current
+from data_analysis import load_data_from_csv
+
+
+def test_store_is_rebuilt_when_the_csv_changes(ohlcv, config, tmp_path):
+    csv_path = str(tmp_path / "historical.csv")
+    store_path = str(tmp_path / "historical.store")
+    ohlcv.to_csv(csv_path, index=False)
+    convert_csv_to_store(csv_path, store_path)
+    assert store_is_current(store_path, csv_path)
+
+    # Regenerate the CSV with fewer tickers
+    tickers = ohlcv['Ticker'].unique()
+    ohlcv[ohlcv['Ticker'].isin(tickers[:3])].to_csv(csv_path, index=False)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not store_is_current(store_path, csv_path)
+
+    config = dict(config, use_csv_data=True, csv_data_path=csv_path, ohlcv_store_path=store_path)
+    panel = load_data_from_csv(list(tickers), config)
+    assert panel.tickers == list(tickers[:3])
+    assert store_is_current(store_path, csv_path)
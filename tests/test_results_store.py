@@ -0,0 +1,54 @@
+# test_results_store.py
+import os
+import pandas as pd
+from aligned_panel import AlignedPanel
+from numpy_engine import NumpyBacktest
+from create_reports import report_data, write_reports
+from position_recorder import positions_frame
+from results_store import ResultsStore
+
+
+def test_stored_run_replays_reports_with_positions(ohlcv, ranked, config, tmp_path, monkeypatch):
+    config = dict(config, engine="numpy")
+    strategy = NumpyBacktest(AlignedPanel.from_long(ohlcv), ranked, config).run(verbose=False)
+    trades_df, equity, metrics = report_data(config, strategy)
+    positions = positions_frame(strategy)
+    assert not positions.empty
+
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    store.save("run", config, trades_df, equity, metrics, positions)
+    stored_trades, stored_equity, stored_metrics, stored_positions = store.load("run")
+
+    assert stored_metrics == metrics
+    pd.testing.assert_frame_equal(stored_equity, equity, check_freq=False)
+    pd.testing.assert_frame_equal(stored_positions, positions, check_categorical=False)
+    assert len(stored_trades) == len(trades_df)
+
+    monkeypatch.chdir(tmp_path)
+    write_reports(config, stored_trades, stored_equity, stored_metrics, positions=stored_positions)
+    suffix = f"{config['start_date']}_to_{config['end_date']}"
+    assert os.path.exists(f"reports/positions_{suffix}.parquet")
+    assert len(pd.read_parquet(f"reports/positions_{suffix}.parquet")) == len(positions)
+
+    best = store.best_runs("Sharpe Ratio", {"exit_time_days": config["exit_time_days"]})
+    assert list(best.index) == ["run"]
+    store.close()
+
+def test_identical_rerun_on_download_cache_is_replayed(ohlcv, ranked, config, tmp_path, monkeypatch):
+    import download_cache
+    from benchmark import PanelProvider
+    from backtest import run_or_replay
+
+    # The first run fills an empty download cache, which rewrites its coverage file
+    panel = AlignedPanel.from_long(ohlcv)
+    monkeypatch.setattr(download_cache, "YFinanceProvider", lambda: PanelProvider(panel))
+    ranked_path = str(tmp_path / "ranked.csv")
+    ranked.to_csv(ranked_path, index=False)
+    config = dict(config, engine="numpy", use_download_cache=True, download_cache_dir=str(tmp_path / "cache"),
+                  results_store_path=str(tmp_path / "results.sqlite"))
+    monkeypatch.chdir(tmp_path)
+
+    assert not run_or_replay(config, ranked.copy(), ranked_path)
+    assert run_or_replay(config, ranked.copy(), ranked_path)
+    assert not run_or_replay(config, ranked.copy(), ranked_path, rerun=True)
+    assert run_or_replay(config, ranked.copy(), ranked_path)
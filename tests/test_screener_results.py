@@ -0,0 +1,71 @@
+# test_screener_results.py
+import numpy as np
+import pandas as pd
+from aligned_panel import AlignedPanel
+import ranked_filtered_tickers
+from ranked_filtered_tickers import process_stock_data
+from screener_results import CompactColumnarBuffer, SCREENER_SCHEMA, make_sinks, load_screener_results
+
+INDICATORS = ['Avg Price', 'Avg Dollar Volume', 'ATR %', '3-day RSI', '7-day ADX']
+
+
+def test_compact_buffer_keeps_full_precision():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        'Date': pd.bdate_range("2020-01-01", periods=10).astype('datetime64[ns]'),
+        'Ticker': [f"T{i % 3}" for i in range(10)],
+        **{name: rng.uniform(1, 1e8, 10) for name in INDICATORS},
+        'Higher Closes': True, 'Pass Base': True, 'Pass All': False
+    }, columns=list(SCREENER_SCHEMA))
+    buffer = CompactColumnarBuffer(batch_size=4)
+    buffer.extend(frame)
+
+    decoded = buffer.to_frame()
+    assert (decoded['Ticker'].astype(str) == frame['Ticker']).all()
+    pd.testing.assert_frame_equal(decoded.drop(columns='Ticker'), frame.drop(columns='Ticker'))
+
+def test_ranked_output_matches_all_data(ohlcv, tmp_path):
+    panel = AlignedPanel.from_long(ohlcv)
+    dates = panel.index
+    all_path, ranked_path = tmp_path / "all.csv", tmp_path / "ranked.csv"
+    process_stock_data(panel.tickers, dates[20].to_pydatetime(), dates[-1].to_pydatetime(), str(all_path), str(ranked_path),
+                       panel, vectorized=True)
+
+    all_data = pd.read_csv(all_path)
+    ranked = pd.read_csv(ranked_path)
+    assert not ranked.empty
+    merged = ranked.merge(all_data, on=['Date', 'Ticker'], suffixes=('', ' all'))
+    assert len(merged) == len(ranked)
+    for name in INDICATORS:
+        assert (merged[name] == merged[f"{name} all"]).all(), name
+
+def test_csv_only_output_replaces_an_older_parquet_copy(ranked, tmp_path):
+    path = str(tmp_path / "stocks_ranked.csv")
+    for output_format, rows in (('both', ranked), ('csv', ranked.head(5))):
+        for sink in make_sinks(path, output_format):
+            sink.write(rows)
+            sink.close()
+
+    assert not (tmp_path / "stocks_ranked.parquet").exists()
+    assert len(load_screener_results(path)) == 5
+
+def test_memory_budget_screens_each_ticker_once(ohlcv, tmp_path, monkeypatch):
+    panel = AlignedPanel.from_long(ohlcv)
+    start, end = panel.index[20].to_pydatetime(), panel.index[-1].to_pydatetime()
+    screened = []
+    screen_ticker_arrays = ranked_filtered_tickers.screen_ticker_arrays
+    def counting(*args, **kwargs):
+        screened.append(args[5])
+        return screen_ticker_arrays(*args, **kwargs)
+    monkeypatch.setattr(ranked_filtered_tickers, 'screen_ticker_arrays', counting)
+
+    outputs = {}
+    for budget in (None, 0.25):
+        screened.clear()
+        paths = tmp_path / f"all_{budget}.csv", tmp_path / f"ranked_{budget}.csv"
+        process_stock_data(panel.tickers, start, end, *map(str, paths), panel, vectorized=True, memory_budget_mb=budget)
+        assert sorted(screened) == sorted(panel.tickers)
+        outputs[budget] = [pd.read_csv(path) for path in paths]
+
+    for unbudgeted, budgeted in zip(outputs[None], outputs[0.25]):
+        pd.testing.assert_frame_equal(budgeted, unbudgeted)
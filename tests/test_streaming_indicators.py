@@ -0,0 +1,87 @@
+# test_streaming_indicators.py
+import numpy as np
+import pandas as pd
+import pytest
+from streaming_indicators import (
+    WilderATR, WilderRSI, WilderADX, BatchWilderATR, BatchWilderRSI, BatchWilderADX, BatchRollingMean,
+    BatchHigherCloseCount, streaming_indicator_arrays, ATR_PERIOD, RSI_PERIOD, ADX_PERIOD, WINDOW
+)
+
+talib = pytest.importorskip("talib")
+
+N_TICKERS = 12
+N_BARS = 300
+TOLERANCE = 1e-6
+
+# --- Fixtures ---
+
+@pytest.fixture(scope="module")
+def bars() -> tuple:
+    """(high, low, close, volume) arrays of shape (bar, ticker); ticker i starts with i % 6 NaN rows."""
+    rng = np.random.default_rng(0)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, (N_BARS, N_TICKERS)), axis=0))
+    high = close * (1 + np.abs(rng.normal(0, 0.01, close.shape)))
+    low = close * (1 - np.abs(rng.normal(0, 0.01, close.shape)))
+    volume = rng.lognormal(14, 0.5, close.shape)
+    for i in range(N_TICKERS):
+        for field in (high, low, close, volume):
+            field[:i % 6, i] = np.nan
+    return high, low, close, volume
+
+def expected(h, l, c) -> dict:
+    """TA-Lib and pandas values the kernels reproduce, for one ticker."""
+    return {
+        'atr': talib.ATR(h, l, c, timeperiod=ATR_PERIOD),
+        'rsi': talib.RSI(c, timeperiod=RSI_PERIOD),
+        'adx': talib.ADX(h, l, c, timeperiod=ADX_PERIOD),
+        'avg_price': np.r_[np.full(WINDOW - 1, np.nan), pd.Series(c).rolling(WINDOW, min_periods=1).mean().values[WINDOW - 1:]],
+        'higher_closes': np.r_[False, False, (c[1:-1] > c[:-2]) & (c[2:] > c[1:-1])]
+    }
+
+def assert_matches(actual, wanted, label):
+    np.testing.assert_allclose(actual, wanted, rtol=0, atol=TOLERANCE, equal_nan=True, err_msg=label)
+
+
+# --- Tests ---
+
+@pytest.mark.parametrize("name, kernel, fields", [
+    ('atr', WilderATR, 3), ('rsi', WilderRSI, 1), ('adx', WilderADX, 3)
+])
+def test_single_ticker_kernels_match_talib(bars, name, kernel, fields):
+    high, low, close, _ = bars
+    for i in range(N_TICKERS):
+        h, l, c = high[:, i], low[:, i], close[:, i]
+        streamer = kernel()
+        inputs = (h, l, c) if fields == 3 else (c,)
+        streamed = np.array([streamer.update(*bar) for bar in zip(*(field.tolist() for field in inputs))])
+        assert_matches(streamed, expected(h, l, c)[name], f"{name} ticker {i}")
+
+def test_batch_kernels_match_talib(bars):
+    high, low, close, _ = bars
+    kernels = {
+        'atr': BatchWilderATR(N_TICKERS), 'rsi': BatchWilderRSI(N_TICKERS), 'adx': BatchWilderADX(N_TICKERS),
+        'avg_price': BatchRollingMean(N_TICKERS), 'higher_closes': BatchHigherCloseCount(N_TICKERS)
+    }
+    out = {name: np.empty(close.shape) for name in kernels}
+    for t in range(N_BARS):
+        out['atr'][t] = kernels['atr'].update(high[t], low[t], close[t])
+        out['rsi'][t] = kernels['rsi'].update(close[t])
+        out['adx'][t] = kernels['adx'].update(high[t], low[t], close[t])
+        out['avg_price'][t] = kernels['avg_price'].update(close[t])
+        out['higher_closes'][t] = kernels['higher_closes'].update(close[t]) >= 2
+
+    for i in range(N_TICKERS):
+        for name, wanted in expected(high[:, i], low[:, i], close[:, i]).items():
+            assert_matches(out[name][:, i], wanted.astype(float), f"batch {name} ticker {i}")
+
+def test_streaming_indicator_arrays_match_talib(bars):
+    for i in range(N_TICKERS):
+        h, l, c, v = (field[:, i] for field in bars)
+        values = streaming_indicator_arrays(h, l, c, v)
+        wanted = expected(h, l, c)
+        with np.errstate(invalid='ignore'):
+            assert_matches(values['ATR %'] * c / 100, wanted['atr'], f"ATR % ticker {i}")
+        assert_matches(values['3-day RSI'], wanted['rsi'], f"RSI ticker {i}")
+        assert_matches(values['7-day ADX'], wanted['adx'], f"ADX ticker {i}")
+        assert_matches(values['Avg Price'], wanted['avg_price'], f"Avg Price ticker {i}")
+        assert (values['Higher Closes'] == wanted['higher_closes']).all(), i
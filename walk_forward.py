@@ -0,0 +1,219 @@
+# walk_forward.py
+import os
+import json
+import argparse
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
+from data_analysis import fetch_data
+from create_reports import collect_trades, calculate_metrics, format_metrics
+from parameter_sweep import init_worker, backtest_combination, results_row, expand_grid, is_feasible, DEFAULT_GRID_PATH
+from screener_results import load_screener_results
+from equity_recorder import equity_frame
+
+# --- Constants ---
+
+DATE_FORMAT = "%Y-%m-%d"
+DEFAULT_OBJECTIVE = "Total Portfolio P/L"
+REPORTS_DIR = "reports"
+
+
+# --- Windows ---
+
+def make_windows(start_date: str, end_date: str, train_months: int, test_months: int) -> list:
+    """Rolls (train_start, train_end, test_start, test_end) windows forward by the test length; ends are inclusive."""
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+    windows = []
+    test_start = start + pd.DateOffset(months=train_months)
+    while test_start <= end:
+        train_start = test_start - pd.DateOffset(months=train_months)
+        next_start = test_start + pd.DateOffset(months=test_months)
+        test_end = min(next_start - pd.Timedelta(days=1), end)
+        windows.append(tuple(
+            d.strftime(DATE_FORMAT) for d in (train_start, test_start - pd.Timedelta(days=1), test_start, test_end)
+        ))
+        test_start = next_start
+    return windows
+
+def evaluation_key(params: dict) -> tuple:
+    """Memo key of an evaluation: its window dates and parameters."""
+    return tuple(sorted(params.items()))
+
+
+# --- Evaluation ---
+
+def equity_curve(strategy) -> pd.Series:
+    """Daily portfolio value of a finished backtest from either engine."""
+    if hasattr(strategy, 'equity_curve'):
+        return strategy.equity_curve()
+    return equity_frame(strategy)['Value'].rename('Equity')
+
+def evaluate(params: dict, engine: str = 'numpy') -> tuple:
+    """Worker entry point: backtests one window (start_date/end_date are in params); returns (row, trades, equity)."""
+    config, strategy = backtest_combination(params, engine)
+    trades_df = collect_trades(strategy)
+    return results_row(params, config, strategy, trades_df), trades_df, equity_curve(strategy)
+
+def evaluate_all(tasks: list, evaluations: dict, executor=None, engine: str = 'numpy', desc: str = "Evaluating"):
+    """Runs every task not already in `evaluations`, concurrently when an executor is given.
+
+    Identical (window, parameters) tasks run once; results are memoized in `evaluations` by evaluation_key.
+    """
+    missing = {}
+    for params in tasks:
+        key = evaluation_key(params)
+        if key not in evaluations:
+            missing.setdefault(key, params)
+    print(f"{desc}: {len(tasks)} evaluations, {len(tasks) - len(missing)} memoized")
+
+    if executor is None:
+        for key, params in tqdm(missing.items(), desc=desc):
+            evaluations[key] = evaluate(params, engine)
+        return
+    futures = {executor.submit(evaluate, params, engine): key for key, params in missing.items()}
+    for future in tqdm(as_completed(futures), total=len(futures), desc=desc):
+        evaluations[futures[future]] = future.result()
+
+
+# --- Walk-Forward ---
+
+def choose_parameters(rows: list, objective: str):
+    """Returns the row with the best objective among runs that traded and were not rejected (first wins ties)."""
+    best = None
+    for row in rows:
+        if row["Rejected"] or not row["Number of Trades"]:
+            continue
+        if best is None or row[objective] > best[objective]:
+            best = row
+    return best
+
+def run_walk_forward(stock_dfs: dict, ranked_stocks: pd.DataFrame, config: dict, grid: dict, train_months: int = 12,
+                     test_months: int = 3, workers: int = 1, engine: str = 'numpy', objective: str = DEFAULT_OBJECTIVE,
+                     evaluations: dict = None) -> dict:
+    """Optimizes the grid on each rolling train window and backtests the winner on the following test window.
+
+    All windows of a phase run concurrently on one process pool. Pass the same `evaluations` dict to later
+    calls to reuse their backtests. Returns the per-window table plus the stitched out-of-sample trades,
+    equity and metrics.
+    """
+    evaluations = {} if evaluations is None else evaluations
+    windows = make_windows(config["start_date"], config["end_date"], train_months, test_months)
+    combinations = [params for params in expand_grid(grid) if is_feasible(dict(config, **params))]
+    print(f"Walk-forward over {len(windows)} windows with {len(combinations)} parameter combinations each")
+
+    def train_task(window, params):
+        return dict(params, start_date=window[0], end_date=window[1])
+
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(stock_dfs, ranked_stocks, config))
+    else:
+        init_worker(stock_dfs, ranked_stocks, config)
+    try:
+        # In-sample: every window's grid, window by window so each worker reuses its prepared market
+        train_tasks = [train_task(window, params) for window in windows for params in combinations]
+        evaluate_all(train_tasks, evaluations, executor, engine, desc="In-sample")
+
+        chosen = {}
+        for window in windows:
+            rows = [evaluations[evaluation_key(train_task(window, params))][0] for params in combinations]
+            best = choose_parameters(rows, objective)
+            if best is not None:
+                chosen[window] = {name: best[name] for name in grid}
+
+        # Out-of-sample: each window's winning parameters on its test dates
+        test_tasks = [dict(params, start_date=window[2], end_date=window[3]) for window, params in chosen.items()]
+        evaluate_all(test_tasks, evaluations, executor, engine, desc="Out-of-sample")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return stitch_results(config, windows, chosen, evaluations, objective)
+
+def stitch_results(config: dict, windows: list, chosen: dict, evaluations: dict, objective: str) -> dict:
+    """Chains the test windows into one out-of-sample run, compounding each window's equity onto the last."""
+    capital = config["capital"]
+    equity = capital
+    window_rows, trades, curves = [], [], []
+    for number, window in enumerate(windows, start=1):
+        row = {'Window': number, 'Train Start': window[0], 'Train End': window[1], 'Test Start': window[2], 'Test End': window[3]}
+        params = chosen.get(window)
+        if params is None:
+            window_rows.append(row)
+            continue
+
+        train_row = evaluations[evaluation_key(dict(params, start_date=window[0], end_date=window[1]))][0]
+        test_row, test_trades, test_equity = evaluations[evaluation_key(dict(params, start_date=window[2], end_date=window[3]))]
+        row.update(params)
+        row.update({
+            f'Train {objective}': train_row[objective],
+            'Test P/L': test_row["Total Portfolio P/L"],
+            'Test Trades': test_row["Number of Trades"]
+        })
+        window_rows.append(row)
+
+        if not test_trades.empty:
+            trades.append(test_trades.assign(Window=number))
+        if not test_equity.empty:
+            scaled = test_equity / capital * equity
+            curves.append(pd.DataFrame({'Window': number, 'Equity': scaled}))
+            equity = scaled.iloc[-1]
+
+    trades_df = pd.concat(trades, ignore_index=True) if trades else pd.DataFrame()
+    equity_df = pd.concat(curves) if curves else pd.DataFrame(columns=['Window', 'Equity'])
+    equity_df.index.name = 'Date'
+    stitched = equity_df[['Equity']].rename(columns={'Equity': 'Value'})
+    metrics = calculate_metrics(config, None, trades_df, final_value=equity, equity=stitched) if not trades_df.empty else {}
+    return {'windows': pd.DataFrame(window_rows), 'trades': trades_df, 'equity': equity_df, 'metrics': metrics}
+
+def save_walk_forward_reports(results: dict, reports_dir: str = REPORTS_DIR):
+    """Writes the window table, stitched trades and equity, and the combined performance report."""
+    os.makedirs(reports_dir, exist_ok=True)
+    results['windows'].to_csv(os.path.join(reports_dir, "walk_forward_windows.csv"), index=False)
+    results['trades'].to_csv(os.path.join(reports_dir, "walk_forward_trades.csv"), index=False)
+    results['equity'].to_csv(os.path.join(reports_dir, "walk_forward_equity.csv"))
+
+    report_path = os.path.join(reports_dir, "walk_forward_report.txt")
+    with open(report_path, 'w') as report_file:
+        report_file.write("Walk-Forward Out-of-Sample Performance Report\n")
+        report_file.write("---------------------------------------\n\n")
+        for metric, value in format_metrics(results['metrics']).items():
+            report_file.write(f"{metric}: {value}\n")
+        report_file.write("\n")
+        report_file.write(results['windows'].to_string(index=False))
+        report_file.write("\n")
+    print(f"\nWalk-forward reports saved to {reports_dir}")
+
+
+# --- Main Execution ---
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Walk-forward optimization of the strategy parameters")
+    parser.add_argument("--grid", default=DEFAULT_GRID_PATH, help="JSON parameter grid, as for parameter_sweep.py")
+    parser.add_argument("--train-months", type=int, default=12, help="Length of each in-sample window")
+    parser.add_argument("--test-months", type=int, default=3, help="Length of each out-of-sample window and the roll step")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--engine", default="numpy", choices=["numpy", "backtrader"], help="Backtest engine for each evaluation")
+    parser.add_argument("--objective", default=DEFAULT_OBJECTIVE, help="Metric maximized on each train window")
+    args = parser.parse_args()
+
+    with open("source/config.json") as f:
+        config = json.load(f)
+    with open(args.grid) as f:
+        grid = json.load(f)
+
+    ranked_stocks = load_screener_results("data/stocks_ranked.csv")
+    ranked_stocks['Date'] = pd.to_datetime(ranked_stocks['Date']).dt.date
+    symbols = ranked_stocks['Ticker'].unique().tolist()
+    stock_dfs = fetch_data(symbols, config)
+
+    results = run_walk_forward(stock_dfs, ranked_stocks, config, grid, train_months=args.train_months,
+                               test_months=args.test_months, workers=args.workers, engine=args.engine,
+                               objective=args.objective)
+    save_walk_forward_reports(results)
+
+    print("\nOut-of-Sample Performance Metrics:")
+    for metric, value in format_metrics(results['metrics']).items():
+        print(f"{metric}: {value}")